@@ -0,0 +1 @@
+window.DIRECTUS_EXTENSIONS_INDEX = JSON.parse("{\"version\":2,\"fields\":[\"id\",\"name\",\"type\",\"description\",\"author\",\"version\",\"downloads\",\"lastUpdated\",\"sandbox\"],\"types\":[\"display\",\"interface\",\"layout\",\"operation\",\"panel\",\"theme\"],\"docs\":[[\"directus-extension-computed-interface\",\"Computed Interface\",1,\"Automatically calculate field values based on other fields with support for templating and arithmetic operations.\",\"rezo-zero\",\"1.2.0\",12543,\"2024-12-15\",1],[\"directus-extension-simple-currency\",\"Simple Currency Field\",1,\"A simple and efficient way to handle currency fields with multiple locale support.\",\"joggienl\",\"1.0.4\",8234,\"2024-12-10\",1],[\"directus-extension-gantt-layout\",\"Gantt Chart Layout\",2,\"Display your data as a Gantt chart for project management and timeline visualization.\",\"directus-community\",\"2.1.0\",15678,\"2024-12-12\",0],[\"directus-extension-pdf-viewer\",\"PDF Viewer Display\",0,\"View PDF files directly in the Data Studio without downloading them.\",\"community-dev\",\"1.3.2\",9876,\"2024-12-08\",1],[\"directus-extension-url-preview\",\"URL Preview Interface\",1,\"Generate live previews of URLs and web pages directly in your forms.\",\"web-tools\",\"1.1.0\",6543,\"2024-12-05\",1],[\"directus-extension-dark-theme\",\"Professional Dark Theme\",5,\"A sleek dark theme for the Directus Data Studio with customizable accent colors.\",\"theme-studio\",\"2.0.1\",23456,\"2024-12-14\",0],[\"directus-extension-charts-panel\",\"Advanced Charts Panel\",4,\"Create beautiful charts and graphs for your Insights dashboards with Chart.js integration.\",\"data-viz\",\"1.4.0\",18765,\"2024-12-11\",1],[\"directus-extension-backup-operation\",\"Database Backup Operation\",3,\"Automated database backup operation for Flow automation workflows.\",\"backup-tools\",\"1.0.3\",4321,\"2024-12-09\",0]],\"terms\":{\"accent\":[5],\"advanced\":[6],\"and\":[0,1,1,2,2],\"arithmetic\":[0],\"as\":[2],\"automated\":[7],\"automatically\":[0],\"automation\":[7],\"backup\":[7],\"based\":[0],\"beautiful\":[6],\"calculate\":[0],\"chart\":[2,4],\"charts\":[6],\"colors\":[5],\"community\":[2,1],\"computed\":[0],\"create\":[6],\"currency\":[1],\"customizable\":[5],\"dark\":[5],\"dashboards\":[6],\"data\":[2,1,2,1],\"database\":[7],\"dev\":[3],\"directly\":[3,1],\"directus\":[0,1,1,1,1,1,1,1],\"display\":[2,1],\"downloading\":[3],\"efficient\":[1],\"extension\":[0,1,1,1,1,1,1,1],\"field\":[0,1],\"fields\":[0,1],\"files\":[3],\"flow\":[7],\"for\":[0,2,3,1,1],\"forms\":[4],\"gantt\":[2],\"generate\":[4],\"graphs\":[6],\"handle\":[1],\"in\":[3,1],\"insights\":[6],\"integration\":[6],\"interface\":[0,1,3],\"joggienl\":[1],\"js\":[6],\"layout\":[2],\"live\":[4],\"locale\":[1],\"management\":[2],\"multiple\":[1],\"of\":[4],\"on\":[0],\"operation\":[7],\"operations\":[0],\"other\":[0],\"pages\":[4],\"panel\":[6],\"pdf\":[3],\"preview\":[4],\"previews\":[4],\"professional\":[5],\"project\":[2],\"rezo\":[0],\"simple\":[1],\"sleek\":[5],\"studio\":[3,2],\"support\":[0,1],\"templating\":[0],\"the\":[3,2],\"them\":[3],\"theme\":[5],\"timeline\":[2],\"to\":[1],\"tools\":[4,3],\"url\":[4],\"urls\":[4],\"values\":[0],\"view\":[3],\"viewer\":[3],\"visualization\":[2],\"viz\":[6],\"way\":[1],\"web\":[4],\"with\":[0,1,4,1],\"without\":[3],\"workflows\":[7],\"your\":[2,2,2],\"zero\":[0]},\"orders\":{\"recent\":[0,5,2,6,1,7,3,4],\"downloads\":[5,6,2,0,3,1,4,7]}}");
@@ -1,7 +1,214 @@
-# Let's create a demo search feature for Directus marketplace extensions
-# This will be a simple HTML/JavaScript demo that shows the concept
+# Generates the Directus extensions search demo: an HTML page plus a
+# prebuilt client-side search index it loads next to it.
+#
+#   python script.py [catalog-snapshot.json]
+#
+# The snapshot is the catalog document written by scripts/catalog_crawler.py
+# (the same format the Worker keeps in KV under catalog:entries). Without
+# one, the index is built from a handful of sample extensions.
+#
+# The index holds the extensions as compact rows, a term -> postings map
+# (delta-encoded extension ids) and the ids presorted for each sort option,
+# so the page never filters or sorts the whole list while the user types.
+# Crawled snapshots carry no download counts; their index leaves out the
+# downloads order and the page drops the sort options that need it.
 
-# First, let's create the main demo files
+import json
+import re
+import sys
+
+INDEX_VERSION = 2
+INDEX_FILE = 'directus_extensions_index.js'
+PAGE_FILE = 'directus_extensions_search_demo.html'
+# Must match the page's tokenize()
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+MIN_TERM_LENGTH = 2
+MAX_DESCRIPTION_CHARS = 300
+
+# Used when no catalog snapshot is given
+sample_extensions = [
+    {
+        'id': 'directus-extension-computed-interface',
+        'name': 'Computed Interface',
+        'type': 'interface',
+        'description': 'Automatically calculate field values based on other fields with support for templating and arithmetic operations.',
+        'author': 'rezo-zero',
+        'version': '1.2.0',
+        'downloads': 12543,
+        'lastUpdated': '2024-12-15',
+        'sandbox': True
+    },
+    {
+        'id': 'directus-extension-simple-currency',
+        'name': 'Simple Currency Field',
+        'type': 'interface',
+        'description': 'A simple and efficient way to handle currency fields with multiple locale support.',
+        'author': 'joggienl',
+        'version': '1.0.4',
+        'downloads': 8234,
+        'lastUpdated': '2024-12-10',
+        'sandbox': True
+    },
+    {
+        'id': 'directus-extension-gantt-layout',
+        'name': 'Gantt Chart Layout',
+        'type': 'layout',
+        'description': 'Display your data as a Gantt chart for project management and timeline visualization.',
+        'author': 'directus-community',
+        'version': '2.1.0',
+        'downloads': 15678,
+        'lastUpdated': '2024-12-12',
+        'sandbox': False
+    },
+    {
+        'id': 'directus-extension-pdf-viewer',
+        'name': 'PDF Viewer Display',
+        'type': 'display',
+        'description': 'View PDF files directly in the Data Studio without downloading them.',
+        'author': 'community-dev',
+        'version': '1.3.2',
+        'downloads': 9876,
+        'lastUpdated': '2024-12-08',
+        'sandbox': True
+    },
+    {
+        'id': 'directus-extension-url-preview',
+        'name': 'URL Preview Interface',
+        'type': 'interface',
+        'description': 'Generate live previews of URLs and web pages directly in your forms.',
+        'author': 'web-tools',
+        'version': '1.1.0',
+        'downloads': 6543,
+        'lastUpdated': '2024-12-05',
+        'sandbox': True
+    },
+    {
+        'id': 'directus-extension-dark-theme',
+        'name': 'Professional Dark Theme',
+        'type': 'theme',
+        'description': 'A sleek dark theme for the Directus Data Studio with customizable accent colors.',
+        'author': 'theme-studio',
+        'version': '2.0.1',
+        'downloads': 23456,
+        'lastUpdated': '2024-12-14',
+        'sandbox': False
+    },
+    {
+        'id': 'directus-extension-charts-panel',
+        'name': 'Advanced Charts Panel',
+        'type': 'panel',
+        'description': 'Create beautiful charts and graphs for your Insights dashboards with Chart.js integration.',
+        'author': 'data-viz',
+        'version': '1.4.0',
+        'downloads': 18765,
+        'lastUpdated': '2024-12-11',
+        'sandbox': True
+    },
+    {
+        'id': 'directus-extension-backup-operation',
+        'name': 'Database Backup Operation',
+        'type': 'operation',
+        'description': 'Automated database backup operation for Flow automation workflows.',
+        'author': 'backup-tools',
+        'version': '1.0.3',
+        'downloads': 4321,
+        'lastUpdated': '2024-12-09',
+        'sandbox': False
+    }
+]
+
+
+def display_name(package_name):
+    # "@scope/directus-extension-gantt-layout" -> "Gantt Layout"
+    base = package_name.split('/')[-1]
+    base = re.sub(r'^directus-(extension-)?', '', base)
+    return ' '.join(word.capitalize() for word in re.split(r'[-_]+', base) if word) or package_name
+
+
+def from_catalog_entry(entry):
+    meta = entry.get('extension') or {}
+    return {
+        'id': entry['name'],
+        'name': display_name(entry['name']),
+        'type': meta.get('type') or 'unknown',
+        'description': entry.get('description') or '',
+        'author': (entry.get('publisher') or {}).get('username') or '',
+        'version': entry.get('version') or '',
+        # None when the snapshot has no count, so it isn't mistaken for zero downloads
+        'downloads': (entry.get('downloads') or {}).get('monthly'),
+        'lastUpdated': (entry.get('date') or '')[:10],
+        'sandbox': bool(meta.get('sandbox')),
+        'keywords': entry.get('keywords') or []
+    }
+
+
+def load_extensions(argv):
+    if len(argv) < 2:
+        return sample_extensions
+    with open(argv[1]) as f:
+        snapshot = json.load(f)
+    return [from_catalog_entry(entry) for entry in snapshot['entries'].values()]
+
+
+def terms_of(extension):
+    text = ' '.join([
+        extension['id'],
+        extension['name'],
+        extension['type'],
+        extension['description'],
+        extension['author'],
+        ' '.join(extension.get('keywords', []))
+    ]).lower()
+    return {term for term in TOKEN_PATTERN.findall(text) if len(term) >= MIN_TERM_LENGTH}
+
+
+def build_index(extensions):
+    types = sorted({extension['type'] for extension in extensions})
+    type_ids = {name: number for number, name in enumerate(types)}
+
+    # Rows instead of objects: field names would otherwise repeat for every extension
+    docs = [[
+        extension['id'],
+        extension['name'],
+        type_ids[extension['type']],
+        extension['description'][:MAX_DESCRIPTION_CHARS],
+        extension['author'],
+        extension['version'],
+        extension['downloads'],
+        extension['lastUpdated'],
+        1 if extension['sandbox'] else 0
+    ] for extension in extensions]
+
+    postings = {}
+    for doc_id, extension in enumerate(extensions):
+        for term in terms_of(extension):
+            postings.setdefault(term, []).append(doc_id)
+
+    # Ids ascend within each posting list, so gaps are small numbers
+    terms = {}
+    for term in sorted(postings):
+        ids = postings[term]
+        terms[term] = [ids[0]] + [b - a for a, b in zip(ids, ids[1:])]
+
+    orders = {
+        'recent': sorted(range(len(docs)), key=lambda i: (docs[i][7], docs[i][6] or 0), reverse=True)
+    }
+    # Sorting by counts nobody has would silently turn into name order
+    if any(doc[6] is not None for doc in docs):
+        orders['downloads'] = sorted(range(len(docs)), key=lambda i: (-(docs[i][6] or 0), docs[i][0]))
+
+    return {
+        'version': INDEX_VERSION,
+        'fields': ['id', 'name', 'type', 'description', 'author', 'version', 'downloads', 'lastUpdated', 'sandbox'],
+        'types': types,
+        'docs': docs,
+        'terms': terms,
+        'orders': orders
+    }
+
+
+# The page: loads the index through a script tag (so it also works from
+# file://), searches as you type and renders only the rows in view
 demo_html = """<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -33,6 +240,7 @@ demo_html = """<!DOCTYPE html>
         }
         .search-input {
             width: 100%;
+            box-sizing: border-box;
             padding: 12px;
             border: 2px solid #e2e8f0;
             border-radius: 8px;
@@ -47,7 +255,7 @@ demo_html = """<!DOCTYPE html>
             display: flex;
             gap: 1rem;
             flex-wrap: wrap;
-            margin-bottom: 1rem;
+            align-items: center;
         }
         .filter-select {
             padding: 8px 12px;
@@ -55,18 +263,10 @@ demo_html = """<!DOCTYPE html>
             border-radius: 6px;
             background: white;
         }
-        .search-button {
-            background: #6644ff;
-            color: white;
-            padding: 12px 24px;
-            border: none;
-            border-radius: 8px;
-            font-size: 16px;
-            cursor: pointer;
-            transition: all 0.2s;
-        }
-        .search-button:hover {
-            background: #5a3de8;
+        .result-count {
+            margin-left: auto;
+            color: #718096;
+            font-size: 0.875rem;
         }
         .results-container {
             background: white;
@@ -74,22 +274,35 @@ demo_html = """<!DOCTYPE html>
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
             overflow: hidden;
         }
+        .results-viewport {
+            height: 70vh;
+            overflow-y: auto;
+            position: relative;
+        }
+        .results-spacer {
+            position: relative;
+        }
         .extension-card {
-            padding: 1.5rem;
+            position: absolute;
+            left: 0;
+            right: 0;
+            height: 140px;
+            box-sizing: border-box;
+            padding: 1.25rem 1.5rem;
             border-bottom: 1px solid #e2e8f0;
-            transition: background-color 0.2s;
+            overflow: hidden;
         }
         .extension-card:hover {
             background-color: #f8f9fa;
         }
-        .extension-card:last-child {
-            border-bottom: none;
-        }
         .extension-title {
             font-size: 1.25rem;
             font-weight: 600;
             color: #1a202c;
             margin-bottom: 0.5rem;
+            white-space: nowrap;
+            overflow: hidden;
+            text-overflow: ellipsis;
         }
         .extension-type {
             display: inline-block;
@@ -100,9 +313,16 @@ demo_html = """<!DOCTYPE html>
             font-size: 0.875rem;
             margin-right: 0.5rem;
         }
+        .extension-type.sandboxed {
+            background: #c6f6d5;
+            color: #22543d;
+        }
         .extension-description {
             color: #718096;
             margin: 0.5rem 0;
+            white-space: nowrap;
+            overflow: hidden;
+            text-overflow: ellipsis;
         }
         .extension-meta {
             font-size: 0.875rem;
@@ -120,7 +340,7 @@ demo_html = """<!DOCTYPE html>
             color: #c53030;
             padding: 1rem;
             border-radius: 8px;
-            margin-bottom: 1rem;
+            margin: 1rem;
         }
         .demo-note {
             background: #fff3cd;
@@ -139,212 +359,275 @@ demo_html = """<!DOCTYPE html>
     </div>
 
     <div class="demo-note">
-        <strong>Demo Note:</strong> This is a demonstration of how to build a search feature for Directus marketplace extensions. 
-        In a real implementation, you would integrate this with the actual Directus Extensions Registry API.
+        <strong>Demo Note:</strong> This page searches a prebuilt index of the extension catalog entirely in the browser.
+        Regenerate it from a catalog snapshot with <code>python script.py catalog-snapshot.json</code>.
     </div>
 
     <div class="search-container">
-        <input type="text" id="searchInput" class="search-input" placeholder="Search extensions (e.g., 'interface', 'display', 'theme')..." />
-        
+        <input type="text" id="searchInput" class="search-input" placeholder="Search extensions (e.g., 'interface', 'display', 'theme')..." autocomplete="off" />
+
         <div class="filters">
             <select id="typeFilter" class="filter-select">
                 <option value="">All Types</option>
-                <option value="interface">Interface</option>
-                <option value="display">Display</option>
-                <option value="layout">Layout</option>
-                <option value="module">Module</option>
-                <option value="panel">Panel</option>
-                <option value="theme">Theme</option>
-                <option value="hook">Hook</option>
-                <option value="endpoint">Endpoint</option>
-                <option value="operation">Operation</option>
             </select>
-            
+
             <select id="sortFilter" class="filter-select">
                 <option value="popular">Most Popular</option>
                 <option value="recent">Most Recent</option>
                 <option value="downloads">Most Downloads</option>
             </select>
-        </div>
 
-        <button id="searchButton" class="search-button">Search Extensions</button>
+            <span id="resultCount" class="result-count"></span>
+        </div>
     </div>
 
     <div class="results-container">
-        <div id="resultsContent">
-            <div class="loading">Click "Search Extensions" to start searching...</div>
+        <div id="resultsViewport" class="results-viewport">
+            <div id="resultsSpacer" class="results-spacer"></div>
         </div>
     </div>
 
+    <script src="INDEX_FILE"></script>
     <script>
-        // Demo data that simulates what the registry API would return
-        const sampleExtensions = [
-            {
-                id: 'directus-extension-computed-interface',
-                name: 'Computed Interface',
-                type: 'interface',
-                description: 'Automatically calculate field values based on other fields with support for templating and arithmetic operations.',
-                author: 'rezo-zero',
-                version: '1.2.0',
-                downloads: 12543,
-                lastUpdated: '2024-12-15',
-                sandbox: true
-            },
-            {
-                id: 'directus-extension-simple-currency',
-                name: 'Simple Currency Field',
-                type: 'interface',
-                description: 'A simple and efficient way to handle currency fields with multiple locale support.',
-                author: 'joggienl',
-                version: '1.0.4',
-                downloads: 8234,
-                lastUpdated: '2024-12-10',
-                sandbox: true
-            },
-            {
-                id: 'directus-extension-gantt-layout',
-                name: 'Gantt Chart Layout',
-                type: 'layout',
-                description: 'Display your data as a Gantt chart for project management and timeline visualization.',
-                author: 'directus-community',
-                version: '2.1.0',
-                downloads: 15678,
-                lastUpdated: '2024-12-12',
-                sandbox: false
-            },
-            {
-                id: 'directus-extension-pdf-viewer',
-                name: 'PDF Viewer Display',
-                type: 'display',
-                description: 'View PDF files directly in the Data Studio without downloading them.',
-                author: 'community-dev',
-                version: '1.3.2',
-                downloads: 9876,
-                lastUpdated: '2024-12-08',
-                sandbox: true
-            },
-            {
-                id: 'directus-extension-url-preview',
-                name: 'URL Preview Interface',
-                type: 'interface',
-                description: 'Generate live previews of URLs and web pages directly in your forms.',
-                author: 'web-tools',
-                version: '1.1.0',
-                downloads: 6543,
-                lastUpdated: '2024-12-05',
-                sandbox: true
-            },
-            {
-                id: 'directus-extension-dark-theme',
-                name: 'Professional Dark Theme',
-                type: 'theme',
-                description: 'A sleek dark theme for the Directus Data Studio with customizable accent colors.',
-                author: 'theme-studio',
-                version: '2.0.1',
-                downloads: 23456,
-                lastUpdated: '2024-12-14',
-                sandbox: false
-            },
-            {
-                id: 'directus-extension-charts-panel',
-                name: 'Advanced Charts Panel',
-                type: 'panel',
-                description: 'Create beautiful charts and graphs for your Insights dashboards with Chart.js integration.',
-                author: 'data-viz',
-                version: '1.4.0',
-                downloads: 18765,
-                lastUpdated: '2024-12-11',
-                sandbox: true
-            },
-            {
-                id: 'directus-extension-backup-operation',
-                name: 'Database Backup Operation',
-                type: 'operation',
-                description: 'Automated database backup operation for Flow automation workflows.',
-                author: 'backup-tools',
-                version: '1.0.3',
-                downloads: 4321,
-                lastUpdated: '2024-12-09',
-                sandbox: false
+        const ROW_HEIGHT = 140;
+        // Rows rendered above and below the visible ones
+        const OVERSCAN = 4;
+        const DEBOUNCE_MS = 120;
+        // Ids of the sort order checked per slice before yielding to the browser
+        const SLICE_SIZE = 5000;
+        const MIN_TERM_LENGTH = 2;
+        const SORT_ORDERS = { popular: 'downloads', downloads: 'downloads', recent: 'recent' };
+
+        const index = window.DIRECTUS_EXTENSIONS_INDEX;
+        const viewport = document.getElementById('resultsViewport');
+        const spacer = document.getElementById('resultsSpacer');
+        const resultCount = document.getElementById('resultCount');
+
+        let termList = [];
+        let postings = new Map();
+        // Matching ids in sort order, filled in slices by the current search
+        let results = [];
+        let searchGeneration = 0;
+        let searching = false;
+        let renderedRange = null;
+
+        function tokenize(text) {
+            return text.toLowerCase().split(/[^a-z0-9]+/).filter(Boolean);
+        }
+
+        function decodePostings(gaps) {
+            const ids = new Uint32Array(gaps.length);
+            let id = 0;
+            for (let i = 0; i < gaps.length; i++) {
+                id += gaps[i];
+                ids[i] = id;
+            }
+            return ids;
+        }
+
+        // First position in the sorted term list not below value
+        function lowerBound(value) {
+            let low = 0;
+            let high = termList.length;
+            while (low < high) {
+                const mid = (low + high) >> 1;
+                if (termList[mid] < value) {
+                    low = mid + 1;
+                } else {
+                    high = mid;
+                }
             }
-        ];
+            return low;
+        }
 
-        // Search functionality
-        function searchExtensions() {
-            const searchTerm = document.getElementById('searchInput').value.toLowerCase();
-            const typeFilter = document.getElementById('typeFilter').value;
-            const sortFilter = document.getElementById('sortFilter').value;
-            const resultsContent = document.getElementById('resultsContent');
-
-            // Show loading state
-            resultsContent.innerHTML = '<div class="loading">Searching extensions...</div>';
-
-            // Simulate API delay
-            setTimeout(() => {
-                let filteredExtensions = sampleExtensions.filter(ext => {
-                    const matchesSearch = searchTerm === '' || 
-                        ext.name.toLowerCase().includes(searchTerm) ||
-                        ext.description.toLowerCase().includes(searchTerm) ||
-                        ext.type.toLowerCase().includes(searchTerm);
-                    
-                    const matchesType = typeFilter === '' || ext.type === typeFilter;
-                    
-                    return matchesSearch && matchesType;
-                });
-
-                // Sort results
-                filteredExtensions.sort((a, b) => {
-                    switch (sortFilter) {
-                        case 'popular':
-                        case 'downloads':
-                            return b.downloads - a.downloads;
-                        case 'recent':
-                            return new Date(b.lastUpdated) - new Date(a.lastUpdated);
-                        default:
-                            return b.downloads - a.downloads;
+        // Extensions matching one query token: whole terms for finished words,
+        // every term starting with the token for the word being typed
+        function matchToken(token, isPrefix) {
+            const mask = new Uint8Array(index.docs.length);
+            if (isPrefix) {
+                for (let i = lowerBound(token); i < termList.length && termList[i].startsWith(token); i++) {
+                    for (const id of postings.get(termList[i])) {
+                        mask[id] = 1;
                     }
-                });
+                }
+            } else if (postings.has(token)) {
+                for (const id of postings.get(token)) {
+                    mask[id] = 1;
+                }
+            }
+            return mask;
+        }
 
-                // Display results
-                if (filteredExtensions.length === 0) {
-                    resultsContent.innerHTML = '<div class="loading">No extensions found matching your criteria.</div>';
+        // Null means every extension matches
+        function matchQuery(query) {
+            const tokens = tokenize(query);
+            const typing = /[a-z0-9]$/i.test(query);
+            let mask = null;
+            tokens.forEach((token, position) => {
+                const isPrefix = typing && position === tokens.length - 1;
+                if (!isPrefix && token.length < MIN_TERM_LENGTH) {
+                    return;
+                }
+                const tokenMask = matchToken(token, isPrefix);
+                if (mask === null) {
+                    mask = tokenMask;
                 } else {
-                    resultsContent.innerHTML = filteredExtensions.map(ext => `
-                        <div class="extension-card">
-                            <div class="extension-title">${ext.name}</div>
-                            <div>
-                                <span class="extension-type">${ext.type}</span>
-                                ${ext.sandbox ? '<span class="extension-type" style="background: #c6f6d5; color: #22543d;">Sandboxed</span>' : ''}
-                            </div>
-                            <div class="extension-description">${ext.description}</div>
-                            <div class="extension-meta">
-                                <span>by ${ext.author}</span>
-                                <span>v${ext.version}</span>
-                                <span>${ext.downloads.toLocaleString()} downloads</span>
-                                <span>Updated ${ext.lastUpdated}</span>
-                            </div>
-                        </div>
-                    `).join('');
+                    for (let i = 0; i < mask.length; i++) {
+                        mask[i] &= tokenMask[i];
+                    }
                 }
-            }, 500);
+            });
+            return mask;
+        }
+
+        function search() {
+            const generation = ++searchGeneration;
+            const mask = matchQuery(document.getElementById('searchInput').value);
+            const typeFilter = document.getElementById('typeFilter').value;
+            const typeId = typeFilter === '' ? -1 : index.types.indexOf(typeFilter);
+            const order = index.orders[SORT_ORDERS[document.getElementById('sortFilter').value]];
+
+            results = [];
+            viewport.scrollTop = 0;
+            let position = 0;
+
+            // Walk the presorted order a slice at a time, showing matches as they are found
+            const step = () => {
+                if (generation !== searchGeneration) {
+                    return;
+                }
+                const end = Math.min(position + SLICE_SIZE, order.length);
+                for (; position < end; position++) {
+                    const id = order[position];
+                    if ((mask === null || mask[id]) && (typeId === -1 || index.docs[id][2] === typeId)) {
+                        results.push(id);
+                    }
+                }
+                const done = position >= order.length;
+                searching = !done;
+                resultCount.textContent = `${results.length.toLocaleString()}${done ? '' : '+'} of ${index.docs.length.toLocaleString()} extensions`;
+                renderedRange = null;
+                render();
+                if (!done) {
+                    setTimeout(step, 0);
+                }
+            };
+            step();
+        }
+
+        function escapeHtml(value) {
+            return String(value).replace(/[&<>"']/g, char => ({
+                '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+            })[char]);
+        }
+
+        function renderCard(id, row) {
+            const [packageName, name, typeId, description, author, version, downloads, lastUpdated, sandbox] = index.docs[id];
+            return `
+                <div class="extension-card" style="top: ${row * ROW_HEIGHT}px" title="${escapeHtml(packageName)}">
+                    <div class="extension-title">${escapeHtml(name)}</div>
+                    <div>
+                        <span class="extension-type">${escapeHtml(index.types[typeId])}</span>
+                        ${sandbox ? '<span class="extension-type sandboxed">Sandboxed</span>' : ''}
+                    </div>
+                    <div class="extension-description">${escapeHtml(description)}</div>
+                    <div class="extension-meta">
+                        <span>by ${escapeHtml(author)}</span>
+                        <span>v${escapeHtml(version)}</span>
+                        ${downloads === null ? '' : `<span>${downloads.toLocaleString()} downloads</span>`}
+                        <span>Updated ${escapeHtml(lastUpdated)}</span>
+                    </div>
+                </div>
+            `;
+        }
+
+        // Only the rows in view (plus overscan) exist in the DOM
+        function render() {
+            if (results.length === 0) {
+                spacer.style.height = 'auto';
+                spacer.innerHTML = searching
+                    ? '<div class="loading">Searching extensions...</div>'
+                    : '<div class="loading">No extensions found matching your criteria.</div>';
+                return;
+            }
+            spacer.style.height = `${results.length * ROW_HEIGHT}px`;
+
+            const first = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+            const last = Math.min(results.length, Math.ceil((viewport.scrollTop + viewport.clientHeight) / ROW_HEIGHT) + OVERSCAN);
+            if (renderedRange && renderedRange[0] === first && renderedRange[1] === last) {
+                return;
+            }
+            renderedRange = [first, last];
+
+            let html = '';
+            for (let row = first; row < last; row++) {
+                html += renderCard(results[row], row);
+            }
+            spacer.innerHTML = html;
+        }
+
+        function debounce(callback, delay) {
+            let timer;
+            return () => {
+                clearTimeout(timer);
+                timer = setTimeout(callback, delay);
+            };
         }
 
-        // Event listeners
-        document.getElementById('searchButton').addEventListener('click', searchExtensions);
-        document.getElementById('searchInput').addEventListener('keypress', (e) => {
-            if (e.key === 'Enter') {
-                searchExtensions();
+        if (!index || index.version !== INDEX_VERSION) {
+            spacer.innerHTML = '<div class="error">Search index not found. Run <code>python script.py</code> to generate INDEX_FILE next to this page.</div>';
+        } else {
+            termList = Object.keys(index.terms).sort();
+            for (const term of termList) {
+                postings.set(term, decodePostings(index.terms[term]));
+            }
+
+            // Without download counts the index has no order for the popularity sorts
+            const sortFilter = document.getElementById('sortFilter');
+            for (const option of [...sortFilter.options]) {
+                if (!index.orders[SORT_ORDERS[option.value]]) {
+                    option.remove();
+                }
+            }
+
+            const typeFilter = document.getElementById('typeFilter');
+            for (const type of index.types) {
+                const option = document.createElement('option');
+                option.value = type;
+                option.textContent = type.charAt(0).toUpperCase() + type.slice(1);
+                typeFilter.appendChild(option);
             }
-        });
 
-        // Initial search
-        searchExtensions();
+            // Event listeners
+            document.getElementById('searchInput').addEventListener('input', debounce(search, DEBOUNCE_MS));
+            document.getElementById('searchInput').addEventListener('keydown', (e) => {
+                if (e.key === 'Enter') {
+                    search();
+                }
+            });
+            typeFilter.addEventListener('change', search);
+            sortFilter.addEventListener('change', search);
+            viewport.addEventListener('scroll', () => requestAnimationFrame(render), { passive: true });
+
+            // Initial search
+            search();
+        }
     </script>
 </body>
-</html>"""
+</html>""".replace('INDEX_FILE', INDEX_FILE).replace('INDEX_VERSION', str(INDEX_VERSION))
+
+extensions = load_extensions(sys.argv)
+index = build_index(extensions)
+
+# A script that assigns the index, rather than a JSON file, so the page works without a web server.
+# Parsing a JSON string is also faster than evaluating the same data as an object literal.
+with open(INDEX_FILE, 'w') as f:
+    f.write('window.DIRECTUS_EXTENSIONS_INDEX = JSON.parse(')
+    f.write(json.dumps(json.dumps(index, separators=(',', ':'))))
+    f.write(');\n')
 
-# Save the demo HTML file
-with open('directus_extensions_search_demo.html', 'w') as f:
+with open(PAGE_FILE, 'w') as f:
     f.write(demo_html)
 
-print("Demo HTML file created: directus_extensions_search_demo.html")
\ No newline at end of file
+print(f"Search index created: {INDEX_FILE} ({len(extensions)} extensions, {len(index['terms'])} terms)")
+print(f"Demo HTML file created: {PAGE_FILE}")
@@ -0,0 +1,163 @@
+#!/usr/bin/env node
+
+/**
+ * Startup benchmark
+ * Bundles the worker with code splitting, so lazily imported paths (admin,
+ * monitoring, catalog sync) land in their own chunks, then checks the size
+ * of what a cold isolate loads - the entry chunk and the chunks it imports
+ * statically - and the time a fresh process takes to evaluate it and
+ * answer /health and an MCP tools/list call against fixed budgets. Exits
+ * non-zero when a budget is exceeded.
+ *
+ * Usage: npm run bench:startup [-- --runs 20 --max-gzip-kb 40 --max-startup-ms 25]
+ */
+
+import { build } from 'esbuild';
+import { execFileSync } from 'node:child_process';
+import { mkdtempSync, readFileSync, rmSync } from 'node:fs';
+import { tmpdir } from 'node:os';
+import { join, resolve } from 'node:path';
+import { gzipSync } from 'node:zlib';
+
+const DEFAULTS = {
+  runs: 20,
+  // Compressed size of the entry chunk and its static imports, which is
+  // what the runtime loads per isolate
+  maxGzipKb: 40,
+  // Median time to evaluate the entry and answer /health in a fresh process
+  maxStartupMs: 25
+};
+
+function parseArgs(argv) {
+  const options = { ...DEFAULTS };
+  for (let i = 0; i < argv.length; i += 2) {
+    const key = argv[i].replace(/^--/, '').replace(/-([a-z])/g, (_, c) => c.toUpperCase());
+    if (!(key in options)) {
+      throw new Error(`Unknown option: ${argv[i]}`);
+    }
+    options[key] = Number(argv[i + 1]);
+  }
+  return options;
+}
+
+// Runs in a child process so every sample is a genuinely cold module graph
+const PROBE = `
+const report = console.log.bind(console);
+console.log = console.error = () => {};
+const start = performance.now();
+const { default: worker } = await import(process.argv[1]);
+const loaded = performance.now();
+const health = await worker.fetch(new Request('https://bench.local/health'), {});
+await health.text();
+const done = performance.now();
+const toolsList = await worker.fetch(new Request('https://bench.local/mcp', {
+  method: 'POST',
+  headers: { 'Content-Type': 'application/json', 'Accept': 'application/json, text/event-stream' },
+  body: JSON.stringify({ jsonrpc: '2.0', id: 1, method: 'tools/list' })
+}), {});
+const tools = await toolsList.text();
+if (!toolsList.ok || !tools.includes('search_extensions')) {
+  throw new Error('tools/list failed: ' + toolsList.status + ' ' + tools.slice(0, 200));
+}
+const listed = performance.now();
+report(JSON.stringify({ load: loaded - start, firstResponse: done - start, toolsList: listed - done }));
+`;
+
+/**
+ * Output files loaded with the entry: the entry chunk plus everything it
+ * reaches through static imports (dynamic imports are left out)
+ */
+function startupFiles(metafile, entry) {
+  const files = new Set();
+  const visit = file => {
+    if (files.has(file)) {
+      return;
+    }
+    files.add(file);
+    for (const imported of metafile.outputs[file].imports) {
+      if (imported.kind === 'import-statement' && !imported.external) {
+        visit(imported.path);
+      }
+    }
+  };
+  visit(entry);
+  return [...files];
+}
+
+function median(values) {
+  const sorted = [...values].sort((a, b) => a - b);
+  const middle = Math.floor(sorted.length / 2);
+  return sorted.length % 2 ? sorted[middle] : (sorted[middle - 1] + sorted[middle]) / 2;
+}
+
+async function main() {
+  const options = parseArgs(process.argv.slice(2));
+  const outdir = mkdtempSync(join(tmpdir(), 'bench-startup-'));
+
+  try {
+    const { metafile } = await build({
+      entryPoints: { worker: 'src/index.ts' },
+      outdir,
+      outExtension: { '.js': '.mjs' },
+      bundle: true,
+      splitting: true,
+      metafile: true,
+      format: 'esm',
+      target: 'es2022',
+      platform: 'neutral',
+      // Runtime built-ins (nodejs_compat), as wrangler leaves them
+      external: ['node:*'],
+      minify: true,
+      logLevel: 'warning'
+    });
+
+    const outputs = Object.keys(metafile.outputs).filter(file => file.endsWith('.mjs'));
+    const entry = outputs.find(file => metafile.outputs[file].entryPoint);
+    const outfile = resolve(entry);
+    const startup = startupFiles(metafile, entry);
+    const startupBytes = startup.map(file => readFileSync(file));
+    const bundleKb = startupBytes.reduce((total, bytes) => total + bytes.byteLength, 0) / 1024;
+    const gzipKb = startupBytes.reduce((total, bytes) => total + gzipSync(bytes).byteLength, 0) / 1024;
+    const totalKb = outputs.reduce((total, file) => total + readFileSync(file).byteLength, 0) / 1024;
+
+    const samples = [];
+    for (let i = 0; i < options.runs; i++) {
+      const output = execFileSync(process.execPath, ['--input-type=module', '-e', PROBE, outfile], {
+        encoding: 'utf8'
+      });
+      samples.push(JSON.parse(output.trim().split('\n').pop()));
+    }
+
+    const load = median(samples.map(sample => sample.load));
+    const firstResponse = median(samples.map(sample => sample.firstResponse));
+    const toolsList = median(samples.map(sample => sample.toolsList));
+
+    console.log(`Startup chunks:       ${startup.length} of ${outputs.length} (${totalKb.toFixed(1)} KiB in all)`);
+    console.log(`Startup size:         ${bundleKb.toFixed(1)} KiB (${gzipKb.toFixed(1)} KiB gzip)`);
+    console.log(`Module evaluation:    ${load.toFixed(2)} ms (median of ${options.runs})`);
+    console.log(`First /health reply:  ${firstResponse.toFixed(2)} ms (median of ${options.runs})`);
+    console.log(`Then tools/list:      ${toolsList.toFixed(2)} ms (median of ${options.runs})`);
+
+    const failures = [];
+    if (gzipKb > options.maxGzipKb) {
+      failures.push(`startup chunks are ${gzipKb.toFixed(1)} KiB gzip, budget ${options.maxGzipKb} KiB`);
+    }
+    if (firstResponse > options.maxStartupMs) {
+      failures.push(`startup takes ${firstResponse.toFixed(2)} ms, budget ${options.maxStartupMs} ms`);
+    }
+
+    if (failures.length > 0) {
+      console.error(`\nStartup budget exceeded:\n  ${failures.join('\n  ')}`);
+      process.exitCode = 1;
+    } else {
+      console.log('\nWithin startup budget');
+    }
+  } finally {
+    rmSync(outdir, { recursive: true, force: true });
+  }
+}
+
+main().catch(error => {
+  console.error('Startup benchmark failed:', error);
+  process.exit(1);
+});
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Catalog crawler
+
+Builds a full Directus extension catalog snapshot from the npm registry:
+pages through `keywords:<keyword>` search results, fetches each matching
+packument with bounded concurrency and a request-rate cap, and writes the
+result in the Worker's catalog format (see src/services/catalog.ts) so it
+can be loaded into KV in one write:
+
+    wrangler kv:key put --binding CACHE catalog:entries --path catalog-snapshot.json
+
+Progress is checkpointed as it goes; rerunning after a crash or Ctrl-C
+resumes from the last checkpoint instead of starting over. Point
+--registry and --search-url at a local registry stand-in (e.g. Verdaccio)
+to run it offline.
+
+Requires aiohttp (pip install aiohttp).
+
+Usage: python scripts/catalog_crawler.py [--output catalog-snapshot.json]
+           [--keyword directus-extension] [--concurrency 8] [--rate 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import quote
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - depends on the environment
+    sys.exit("catalog_crawler.py needs aiohttp: pip install aiohttp")
+
+# Must match CatalogService.SCHEMA_VERSION in src/services/catalog.ts
+SCHEMA_VERSION = 3
+CHECKPOINT_VERSION = 1
+USER_AGENT = "directus-marketplace-search-mcp/1.0.0 (catalog crawler)"
+
+# npm search returns at most 250 results per page
+SEARCH_PAGE_SIZE = 250
+# Packuments fetched between checkpoint writes
+CHECKPOINT_EVERY = 50
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+EXTENSION_KEYWORD_MARKERS = ("directus-extension", "directus-custom", "directus-theme")
+EXTENSION_NAME_MARKERS = ("extension", "interface", "display", "layout", "panel", "module", "hook", "theme")
+
+
+@dataclass
+class Checkpoint:
+    """Crawl progress, persisted after every search page and every few packuments"""
+
+    keywords: list[str]
+    # Next search offset per keyword; a keyword is done once it is absent from pending
+    search_offsets: dict[str, int] = field(default_factory=dict)
+    pending_keywords: list[str] = field(default_factory=list)
+    # Every package name seen in search results, in discovery order
+    names: list[str] = field(default_factory=list)
+    # Mapped catalog entry per fetched package; None for packages that aren't extensions
+    entries: dict[str, Optional[dict[str, Any]]] = field(default_factory=dict)
+
+    @classmethod
+    def fresh(cls, keywords: list[str]) -> "Checkpoint":
+        return cls(keywords=keywords, search_offsets={k: 0 for k in keywords}, pending_keywords=list(keywords))
+
+    @classmethod
+    def load(cls, path: Path, keywords: list[str]) -> "Checkpoint":
+        if not path.exists():
+            return cls.fresh(keywords)
+        data = json.loads(path.read_text())
+        if data.get("version") != CHECKPOINT_VERSION or data.get("keywords") != keywords:
+            print(f"Ignoring checkpoint {path}: it was written for a different crawl", file=sys.stderr)
+            return cls.fresh(keywords)
+        return cls(
+            keywords=data["keywords"],
+            search_offsets=data["search_offsets"],
+            pending_keywords=data["pending_keywords"],
+            names=data["names"],
+            entries=data["entries"],
+        )
+
+    def save(self, path: Path) -> None:
+        write_json_atomic(
+            path,
+            {
+                "version": CHECKPOINT_VERSION,
+                "keywords": self.keywords,
+                "search_offsets": self.search_offsets,
+                "pending_keywords": self.pending_keywords,
+                "names": self.names,
+                "entries": self.entries,
+            },
+        )
+
+
+class RateLimiter:
+    """Spaces request starts so no more than `rate` begin per second"""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def back_off(self, seconds: float) -> None:
+        """Push every future request back, e.g. after a 429 with Retry-After"""
+        self.next_slot = max(self.next_slot, time.monotonic() + seconds)
+
+
+class RegistryClient:
+    """Pooled HTTP client with a request-rate cap and retries on transient errors"""
+
+    def __init__(self, session: aiohttp.ClientSession, registry: str, search_url: str, rate: float, retries: int) -> None:
+        self.session = session
+        self.registry = registry.rstrip("/")
+        self.search_url = search_url
+        self.limiter = RateLimiter(rate)
+        self.retries = retries
+
+    async def search(self, keyword: str, offset: int) -> dict[str, Any]:
+        params = {"text": f"keywords:{keyword}", "size": str(SEARCH_PAGE_SIZE), "from": str(offset)}
+        data = await self.get_json(self.search_url, params)
+        if data is None:
+            raise RuntimeError(f"Search endpoint {self.search_url} returned 404")
+        return data
+
+    async def packument(self, name: str) -> Optional[dict[str, Any]]:
+        # Scoped names keep their "@" but the slash must be escaped
+        return await self.get_json(f"{self.registry}/{quote(name, safe='@')}")
+
+    async def get_json(self, url: str, params: Optional[dict[str, str]] = None) -> Optional[dict[str, Any]]:
+        """GET a JSON document; None on 404. Retries 429/5xx and connection errors with backoff."""
+        for attempt in range(self.retries + 1):
+            await self.limiter.wait()
+            try:
+                async with self.session.get(url, params=params) as response:
+                    if response.status == 404:
+                        return None
+                    if response.status in RETRY_STATUSES and attempt < self.retries:
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        delay = retry_after if retry_after is not None else backoff(attempt)
+                        if response.status == 429:
+                            self.limiter.back_off(delay)
+                        await asyncio.sleep(delay)
+                        continue
+                    response.raise_for_status()
+                    return await response.json(content_type=None)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= self.retries:
+                    raise
+                await asyncio.sleep(backoff(attempt))
+        raise RuntimeError(f"Giving up on {url} after {self.retries + 1} attempts")
+
+
+def backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter, capped at 30 seconds"""
+    return random.uniform(0, min(30.0, 0.5 * 2**attempt))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def is_directus_extension(name: str, keywords: list[str]) -> bool:
+    """Same test as isDirectusExtension in src/utils/extensions.ts"""
+    if any(marker in keyword for keyword in keywords for marker in EXTENSION_KEYWORD_MARKERS):
+        return True
+    return "directus" in name and any(marker in name for marker in EXTENSION_NAME_MARKERS)
+
+
+def extension_meta(manifest: Any) -> Optional[dict[str, Any]]:
+    """Same mapping as extensionMeta in src/utils/extensions.ts"""
+    if not isinstance(manifest, dict):
+        return None
+    meta: dict[str, Any] = {}
+    if isinstance(manifest.get("type"), str):
+        meta["type"] = manifest["type"]
+    host = manifest.get("host")
+    if isinstance(host, str) and host.strip():
+        meta["host"] = host.strip()
+    sandbox = manifest.get("sandbox")
+    if isinstance(sandbox, dict):
+        sandbox = sandbox.get("enabled")
+    if isinstance(sandbox, bool):
+        meta["sandbox"] = sandbox
+    return meta or None
+
+
+def url_of(value: Any) -> Optional[str]:
+    return value.get("url") if isinstance(value, dict) else None
+
+
+def packument_to_extension(data: dict[str, Any]) -> Optional[dict[str, Any]]:
+    """Same mapping as packumentToExtension in src/utils/extensions.ts"""
+    latest = (data.get("dist-tags") or {}).get("latest")
+    version_data = (data.get("versions") or {}).get(latest) if latest else None
+    if not version_data:
+        return None
+
+    maintainers = data.get("maintainers") or []
+    first = maintainers[0] if maintainers else {}
+    times = data.get("time") or {}
+    links = {
+        "homepage": version_data.get("homepage") or data.get("homepage"),
+        "repository": url_of(version_data.get("repository")) or url_of(data.get("repository")),
+        "bugs": url_of(version_data.get("bugs")) or url_of(data.get("bugs")),
+        "npm": f"https://www.npmjs.com/package/{data['name']}",
+    }
+
+    extension: dict[str, Any] = {
+        "name": data["name"],
+        "version": latest,
+        "description": version_data.get("description") or data.get("description") or "",
+        "keywords": version_data.get("keywords") or [],
+        "sanitized_name": data["name"],
+        "publisher": {"email": first.get("email") or "", "username": first.get("name") or ""},
+        "maintainers": [
+            {key: value for key, value in (("email", m.get("email")), ("username", m.get("name"))) if value is not None}
+            for m in maintainers
+        ],
+        "license": version_data.get("license") or data.get("license") or "",
+        "date": times.get(latest) or times.get("created") or "",
+        # JSON.stringify drops undefined links; do the same for None
+        "links": {key: value for key, value in links.items() if value},
+    }
+    meta = extension_meta(version_data.get("directus:extension"))
+    if meta:
+        extension["extension"] = meta
+    dependencies = list((version_data.get("dependencies") or {}).keys())
+    if dependencies:
+        extension["dependencies"] = dependencies
+    return extension
+
+
+def write_json_atomic(path: Path, data: Any) -> None:
+    """Write via a temporary file and rename, so a crash never leaves a torn file"""
+    temporary = path.with_name(f".{path.name}.tmp")
+    temporary.write_text(json.dumps(data, separators=(",", ":")))
+    os.replace(temporary, path)
+
+
+async def crawl_search(client: RegistryClient, checkpoint: Checkpoint, checkpoint_path: Path) -> None:
+    seen = set(checkpoint.names)
+    while checkpoint.pending_keywords:
+        keyword = checkpoint.pending_keywords[0]
+        offset = checkpoint.search_offsets.get(keyword, 0)
+        page = await client.search(keyword, offset)
+        objects = page.get("objects") or []
+
+        for item in objects:
+            name = (item.get("package") or {}).get("name")
+            if name and name not in seen:
+                seen.add(name)
+                checkpoint.names.append(name)
+
+        offset += len(objects)
+        checkpoint.search_offsets[keyword] = offset
+        if len(objects) < SEARCH_PAGE_SIZE or offset >= int(page.get("total") or 0):
+            checkpoint.pending_keywords.pop(0)
+            print(f"Search for keywords:{keyword} done: {offset} results", file=sys.stderr)
+        checkpoint.save(checkpoint_path)
+
+
+async def crawl_packuments(
+    client: RegistryClient, checkpoint: Checkpoint, checkpoint_path: Path, concurrency: int
+) -> None:
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for name in checkpoint.names:
+        if name not in checkpoint.entries:
+            queue.put_nowait(name)
+
+    total = queue.qsize()
+    completed = 0
+    print(f"Fetching {total} packuments ({len(checkpoint.entries)} already done)", file=sys.stderr)
+
+    async def worker() -> None:
+        nonlocal completed
+        while True:
+            try:
+                name = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            data = await client.packument(name)
+            extension = packument_to_extension(data) if data else None
+            if extension and not is_directus_extension(extension["name"], extension["keywords"]):
+                extension = None
+            checkpoint.entries[name] = extension
+
+            completed += 1
+            if completed % CHECKPOINT_EVERY == 0 or completed == total:
+                checkpoint.save(checkpoint_path)
+                print(f"  {completed}/{total} packuments", file=sys.stderr)
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+        # Keep whatever finished before a failure or interrupt
+        checkpoint.save(checkpoint_path)
+
+
+def build_snapshot(checkpoint: Checkpoint) -> dict[str, Any]:
+    """A catalog document as CatalogService stores it under catalog:entries"""
+    entries = {name: entry for name, entry in sorted(checkpoint.entries.items()) if entry}
+    return {
+        "schemaVersion": SCHEMA_VERSION,
+        "revision": 1,
+        "updatedAt": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+        "entries": entries,
+    }
+
+
+async def run(args: argparse.Namespace) -> int:
+    output = Path(args.output)
+    checkpoint_path = Path(args.checkpoint or f"{args.output}.checkpoint")
+    checkpoint = Checkpoint.load(checkpoint_path, args.keyword)
+
+    connector = aiohttp.TCPConnector(limit=args.concurrency, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    headers = {"User-Agent": USER_AGENT, "Accept": "application/json"}
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+        client = RegistryClient(session, args.registry, args.search_url, args.rate, args.retries)
+        await crawl_search(client, checkpoint, checkpoint_path)
+        await crawl_packuments(client, checkpoint, checkpoint_path, args.concurrency)
+
+    snapshot = build_snapshot(checkpoint)
+    write_json_atomic(output, snapshot)
+    checkpoint_path.unlink(missing_ok=True)
+    print(f"Wrote {len(snapshot['entries'])} extensions to {output}", file=sys.stderr)
+    return 0
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1], formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="catalog-snapshot.json", help="snapshot file to write")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument(
+        "--keyword",
+        action="append",
+        help="npm keyword to crawl; repeat for several (default: directus-extension)",
+    )
+    parser.add_argument("--registry", default="https://registry.npmjs.org", help="registry serving packuments")
+    parser.add_argument("--search-url", help="search endpoint (default: <registry>/-/v1/search)")
+    parser.add_argument("--concurrency", type=int, default=8, help="packuments fetched at once")
+    parser.add_argument("--rate", type=float, default=20.0, help="maximum requests started per second")
+    parser.add_argument("--retries", type=int, default=4, help="retries per request on 429, 5xx and network errors")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    args = parser.parse_args(argv)
+    args.keyword = args.keyword or ["directus-extension"]
+    args.search_url = args.search_url or f"{args.registry.rstrip('/')}/-/v1/search"
+    return args
+
+
+def main() -> int:
+    args = parse_args(sys.argv[1:])
+    try:
+        return asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print("Interrupted; rerun the same command to resume from the checkpoint", file=sys.stderr)
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""
+Tests for catalog_crawler.py against a local registry stand-in
+
+The stand-in is an aiohttp app serving a search endpoint and packuments,
+so pagination, 429 handling and checkpoint resume run end to end without
+the network. The mapping helpers are also checked against their
+TypeScript originals in src/utils/extensions.ts; those checks need a
+Node.js that can strip types (22.6 or newer) and are skipped otherwise.
+
+Usage: pip install aiohttp pytest && python -m pytest scripts/test_catalog_crawler.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).parent))
+import catalog_crawler  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+EXTENSIONS_TS = REPO_ROOT / "src" / "utils" / "extensions.ts"
+
+# A packument exercising every branch of the mapping: scoped name, links
+# split between version and package, a maintainer without an email, a
+# manifest with a trimmed host and an object-style sandbox flag
+PACKUMENT = {
+    "name": "@acme/directus-extension-map",
+    "description": "Package-level description",
+    "dist-tags": {"latest": "2.1.0"},
+    "homepage": "https://acme.dev/map",
+    "repository": {"type": "git", "url": "git+https://github.com/acme/map.git"},
+    "maintainers": [{"name": "ada", "email": "ada@acme.dev"}, {"name": "bob"}],
+    "time": {"created": "2023-01-02T00:00:00.000Z", "2.1.0": "2024-05-06T07:08:09.000Z"},
+    "versions": {
+        "2.1.0": {
+            "description": "Interactive map interface",
+            "keywords": ["directus", "directus-extension", "directus-custom-interface", "maps"],
+            "license": "MIT",
+            "bugs": {"url": "https://github.com/acme/map/issues"},
+            "dependencies": {"leaflet": "^1.9.0", "lodash": "^4.17.21"},
+            "directus:extension": {"type": "interface", "host": " ^10.10.0 || ^11.0.0 ", "sandbox": {"enabled": True}},
+        }
+    },
+}
+
+# (name, keywords) pairs on both sides of isDirectusExtension
+EXTENSION_CASES = [
+    ("directus-extension-foo", []),
+    ("directus-interface-color", []),
+    ("directus", []),
+    ("my-display", ["directus-custom-display"]),
+    ("theme-pack", ["directus-theme"]),
+    ("lodash", ["utility"]),
+    ("@scope/widget", ["directus-extension-bundle"]),
+]
+
+
+def packument(name: str, keywords: Optional[list[str]] = None) -> dict[str, Any]:
+    return {
+        "name": name,
+        "dist-tags": {"latest": "1.0.0"},
+        "maintainers": [{"name": "ada", "email": "ada@acme.dev"}],
+        "time": {"1.0.0": "2024-01-01T00:00:00.000Z"},
+        "versions": {"1.0.0": {"description": f"{name} description", "keywords": keywords or ["directus-extension"]}},
+    }
+
+
+class RegistryStandIn:
+    """Search and packument endpoints with scriptable failures"""
+
+    def __init__(self, packuments: dict[str, dict[str, Any]]) -> None:
+        self.packuments = packuments
+        self.hits: Counter[str] = Counter()
+        self.hit_times: dict[str, list[float]] = {}
+        # Path -> list of (status, headers) answered before serving normally
+        self.failures: dict[str, list[tuple[int, dict[str, str]]]] = {}
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/-/v1/search", self.search)
+        app.router.add_get("/{name:.+}", self.packument)
+        return app
+
+    def fail(self, path: str, status: int, times: int = 1, headers: Optional[dict[str, str]] = None) -> None:
+        self.failures.setdefault(path, []).extend([(status, headers or {})] * times)
+
+    def record(self, key: str) -> Optional[web.Response]:
+        self.hits[key] += 1
+        self.hit_times.setdefault(key, []).append(time.monotonic())
+        queued = self.failures.get(key)
+        if queued:
+            status, headers = queued.pop(0)
+            return web.Response(status=status, headers=headers)
+        return None
+
+    async def search(self, request: web.Request) -> web.Response:
+        offset = int(request.query["from"])
+        size = int(request.query["size"])
+        failure = self.record(f"search:{offset}")
+        if failure:
+            return failure
+        names = sorted(self.packuments)
+        objects = [{"package": {"name": name}} for name in names[offset : offset + size]]
+        return web.json_response({"objects": objects, "total": len(names)})
+
+    async def packument(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        failure = self.record(name)
+        if failure:
+            return failure
+        if name not in self.packuments:
+            return web.Response(status=404)
+        return web.json_response(self.packuments[name])
+
+
+async def crawl(registry: RegistryStandIn, output: Path, *extra: str) -> int:
+    server = TestServer(registry.app())
+    await server.start_server()
+    try:
+        base = str(server.make_url("")).rstrip("/")
+        args = catalog_crawler.parse_args(
+            ["--output", str(output), "--registry", base, "--rate", "1000", "--concurrency", "1", *extra]
+        )
+        return await catalog_crawler.run(args)
+    finally:
+        await server.close()
+
+
+@pytest.fixture
+def small_pages(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(catalog_crawler, "SEARCH_PAGE_SIZE", 2)
+    monkeypatch.setattr(catalog_crawler, "backoff", lambda attempt: 0.0)
+
+
+def test_pages_through_search_results(tmp_path: Path, small_pages: None) -> None:
+    names = [f"directus-extension-{i}" for i in range(5)]
+    registry = RegistryStandIn({name: packument(name) for name in names})
+    registry.packuments["left-pad"] = packument("left-pad", ["string"])
+    output = tmp_path / "snapshot.json"
+
+    assert asyncio.run(crawl(registry, output)) == 0
+
+    # Six results, two per page
+    assert [registry.hits[f"search:{offset}"] for offset in (0, 2, 4)] == [1, 1, 1]
+    assert "search:6" not in registry.hits
+    snapshot = json.loads(output.read_text())
+    assert snapshot["schemaVersion"] == catalog_crawler.SCHEMA_VERSION
+    # Packages that aren't extensions are fetched but left out
+    assert sorted(snapshot["entries"]) == names
+    assert not output.with_name("snapshot.json.checkpoint").exists()
+
+
+def test_honours_retry_after_on_429(tmp_path: Path, small_pages: None) -> None:
+    registry = RegistryStandIn({"directus-extension-a": packument("directus-extension-a")})
+    registry.fail("directus-extension-a", 429, headers={"Retry-After": "0.3"})
+
+    assert asyncio.run(crawl(registry, tmp_path / "snapshot.json", "--retries", "2")) == 0
+
+    assert registry.hits["directus-extension-a"] == 2
+    first, second = registry.hit_times["directus-extension-a"]
+    assert second - first >= 0.3
+
+
+def test_resumes_from_checkpoint_after_interruption(tmp_path: Path, small_pages: None) -> None:
+    names = [f"directus-extension-{letter}" for letter in "abcd"]
+    registry = RegistryStandIn({name: packument(name) for name in names})
+    registry.fail("directus-extension-c", 500)
+    output = tmp_path / "snapshot.json"
+    checkpoint = tmp_path / "snapshot.json.checkpoint"
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(crawl(registry, output, "--retries", "0"))
+    saved = json.loads(checkpoint.read_text())
+    assert saved["pending_keywords"] == []
+    assert sorted(saved["entries"]) == names[:2]
+    assert not output.exists()
+
+    assert asyncio.run(crawl(registry, output, "--retries", "0")) == 0
+
+    # The search and the packuments fetched before the failure are not repeated
+    assert registry.hits["search:0"] == 1
+    assert registry.hits["search:2"] == 1
+    assert [registry.hits[name] for name in names] == [1, 1, 2, 1]
+    assert sorted(json.loads(output.read_text())["entries"]) == names
+
+
+def node_can_strip_types() -> bool:
+    try:
+        result = subprocess.run(
+            ["node", "--experimental-strip-types", "--no-warnings", "-e", ""], capture_output=True, timeout=30
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return result.returncode == 0
+
+
+def run_typescript(script: str, payload: Any) -> Any:
+    """Evaluate `script` with the TypeScript module bound to `extensions` and stdin parsed as `input`"""
+    program = (
+        f"const extensions = await import({json.dumps(EXTENSIONS_TS.as_uri())});\n"
+        "let text = ''; for await (const chunk of process.stdin) text += chunk;\n"
+        "const input = JSON.parse(text);\n"
+        f"console.log(JSON.stringify({script}));"
+    )
+    result = subprocess.run(
+        ["node", "--experimental-strip-types", "--no-warnings", "--input-type=module", "-e", program],
+        input=json.dumps(payload),
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=30,
+    )
+    return json.loads(result.stdout)
+
+
+needs_node = pytest.mark.skipif(not node_can_strip_types(), reason="needs Node.js 22.6+ to load the TypeScript source")
+
+
+@needs_node
+def test_packument_mapping_matches_typescript() -> None:
+    expected = run_typescript("extensions.packumentToExtension(input)", PACKUMENT)
+    assert catalog_crawler.packument_to_extension(PACKUMENT) == expected
+
+
+@needs_node
+def test_extension_detection_matches_typescript() -> None:
+    cases = [{"name": name, "keywords": keywords} for name, keywords in EXTENSION_CASES]
+    expected = run_typescript("input.map(pkg => extensions.isDirectusExtension(pkg))", cases)
+    assert [catalog_crawler.is_directus_extension(name, keywords) for name, keywords in EXTENSION_CASES] == expected
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Usage analytics
+
+Loads the usage events the Worker stores in KV (a sample of tool calls,
+kept for 7 days) into NumPy arrays and reports what the daily rollups
+behind /admin/stats can't show: per-tool latency distributions, per-IP
+request rates checked against candidate rate limits, an hourly heatmap
+and how often requests were answered without touching npm. Every report
+is a vectorized group-by, so millions of events take seconds.
+
+Events come straight from a deployment's /admin/events endpoint, which
+streams them page by page (the script follows its resume cursor), or
+from files saved from it, plain or gzipped, in either export format:
+
+    python scripts/usage_analytics.py --url https://<worker>/admin/events --save events.jsonl.gz
+    python scripts/usage_analytics.py events.jsonl.gz --hourly-limit 100 --hourly-limit 250
+
+The endpoint needs the deployment's ADMIN_TOKEN secret, passed with
+--token or read from the ADMIN_TOKEN environment variable.
+
+Counts are scaled by --sample-rate to estimate real traffic; it must
+match the sampling rate in MonitoringService.
+
+Requires numpy (pip install numpy).
+
+Usage: python scripts/usage_analytics.py (--url URL [--token TOKEN] | FILE...) [--since 2026-10-01]
+           [--until 2026-10-07] [--hourly-limit 100] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import sys
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import IO, Any, Iterable, Iterator, Optional
+from urllib.parse import urlencode, urlsplit, urlunsplit, parse_qsl
+from urllib.request import Request, urlopen
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    sys.exit("usage_analytics.py needs numpy: pip install numpy")
+
+USER_AGENT = "directus-marketplace-search-mcp/1.0.0 (usage analytics)"
+# Share of tool calls MonitoringService stores as events
+DEFAULT_SAMPLE_RATE = 0.1
+LATENCY_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+HOUR_MS = 60 * 60 * 1000
+DAY_MS = 24 * HOUR_MS
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+class Categories:
+    """Dictionary encoding of a string column: values become int codes"""
+
+    def __init__(self) -> None:
+        self.index: dict[Optional[str], int] = {}
+
+    def encode(self, values: Iterable[Optional[str]]) -> list[int]:
+        index = self.index
+        return [index.setdefault(value, len(index)) for value in values]
+
+    @property
+    def labels(self) -> list[str]:
+        return ["(none)" if label is None else label for label in self.index]
+
+
+class EventLoader:
+    """Accumulates exported events column by column"""
+
+    def __init__(self) -> None:
+        self.timestamp: list[int] = []
+        self.success: list[bool] = []
+        self.response_time: list[Optional[float]] = []
+        self.error_code: list[Optional[int]] = []
+        self.subrequests: list[Optional[int]] = []
+        self.kv_operations: list[Optional[int]] = []
+        self.ip = Categories()
+        self.tool = Categories()
+        self.ip_codes: list[int] = []
+        self.tool_codes: list[int] = []
+        self.summary: Optional[dict[str, Any]] = None
+
+    def add_line(self, line: str) -> None:
+        line = line.strip()
+        if not line:
+            return
+        record = json.loads(line)
+        if "_export" in record:
+            self.summary = record["_export"]
+        elif "columns" in record:
+            self.add_columns(record["columns"])
+        else:
+            self.add_columns({key: [value] for key, value in record.items()})
+
+    def add_columns(self, columns: dict[str, list[Any]]) -> None:
+        count = len(columns["timestamp"])
+        missing = [None] * count
+        self.timestamp.extend(columns["timestamp"])
+        self.success.extend(columns.get("success", [True] * count))
+        self.response_time.extend(columns.get("responseTime", missing))
+        self.error_code.extend(columns.get("errorCode", missing))
+        self.subrequests.extend(columns.get("subrequests", missing))
+        self.kv_operations.extend(columns.get("kvOperations", missing))
+        self.ip_codes.extend(self.ip.encode(columns.get("ip", missing)))
+        self.tool_codes.extend(self.tool.encode(columns.get("tool", missing)))
+
+    def events(self) -> "Events":
+        return Events(
+            timestamp=np.asarray(self.timestamp, dtype=np.int64),
+            success=np.asarray(self.success, dtype=bool),
+            response_time=optional_array(self.response_time, np.float64, np.nan),
+            error_code=optional_array(self.error_code, np.int32, 0),
+            subrequests=optional_array(self.subrequests, np.int32, -1),
+            kv_operations=optional_array(self.kv_operations, np.int32, -1),
+            ip=np.asarray(self.ip_codes, dtype=np.int32),
+            ip_labels=self.ip.labels,
+            tool=np.asarray(self.tool_codes, dtype=np.int32),
+            tool_labels=self.tool.labels,
+        )
+
+
+def optional_array(values: list[Any], dtype: Any, fill: Any) -> np.ndarray:
+    return np.asarray([fill if value is None else value for value in values], dtype=dtype)
+
+
+@dataclass
+class Events:
+    timestamp: np.ndarray
+    success: np.ndarray
+    # NaN, 0 and -1 mark values an event doesn't carry
+    response_time: np.ndarray
+    error_code: np.ndarray
+    subrequests: np.ndarray
+    kv_operations: np.ndarray
+    ip: np.ndarray
+    ip_labels: list[str]
+    tool: np.ndarray
+    tool_labels: list[str]
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+
+def grouped_quantiles(groups: np.ndarray, values: np.ndarray, group_count: int, quantiles: Iterable[float]) -> dict[float, np.ndarray]:
+    """Linear-interpolated quantiles of values within each group, NaN for empty groups"""
+    order = np.lexsort((values, groups))
+    ordered = values[order]
+    counts = np.bincount(groups, minlength=group_count)
+    starts = np.cumsum(counts) - counts
+    present = counts > 0
+
+    result = {}
+    for q in quantiles:
+        position = starts + q * np.maximum(counts - 1, 0)
+        low = np.floor(position).astype(np.int64)
+        high = np.ceil(position).astype(np.int64)
+        value = np.full(group_count, np.nan)
+        low_values = ordered[low[present]]
+        value[present] = low_values + (ordered[high[present]] - low_values) * (position[present] - low[present])
+        result[q] = value
+    return result
+
+
+def latency_by_tool(events: Events) -> list[dict[str, Any]]:
+    timed = ~np.isnan(events.response_time)
+    tools = events.tool[timed]
+    latency = events.response_time[timed]
+    group_count = len(events.tool_labels)
+
+    counts = np.bincount(tools, minlength=group_count)
+    totals = np.bincount(tools, weights=latency, minlength=group_count)
+    peaks = np.full(group_count, np.nan)
+    if len(latency):
+        np.fmax.at(peaks, tools, latency)
+    errors = np.bincount(events.tool, weights=~events.success, minlength=group_count)
+    calls = np.bincount(events.tool, minlength=group_count)
+    quantiles = grouped_quantiles(tools, latency, group_count, LATENCY_QUANTILES)
+
+    rows = []
+    for code in np.argsort(-calls):
+        if calls[code] == 0:
+            continue
+        rows.append({
+            "tool": events.tool_labels[code],
+            "events": int(calls[code]),
+            "error_rate": float(errors[code] / calls[code]),
+            "mean_ms": float(totals[code] / counts[code]) if counts[code] else None,
+            **{f"p{round(q * 100)}_ms": nullable(quantiles[q][code]) for q in LATENCY_QUANTILES},
+            "max_ms": nullable(peaks[code]),
+        })
+    return rows
+
+
+def ip_rates(events: Events, sample_rate: float, hourly_limits: list[int], top: int) -> dict[str, Any]:
+    """Per-IP totals and peak hours, plus what candidate hourly limits would have refused"""
+    scale = 1 / sample_rate
+    group_count = len(events.ip_labels)
+    counts = np.bincount(events.ip, minlength=group_count)
+
+    # One bucket per (IP, hour) pair that saw traffic
+    hour = events.timestamp // HOUR_MS
+    hour -= hour.min()
+    buckets, bucket_counts = np.unique(events.ip.astype(np.int64) * (hour.max() + 1) + hour, return_counts=True)
+    bucket_ips = buckets // (hour.max() + 1)
+    peak_hour = np.zeros(group_count, dtype=np.int64)
+    np.maximum.at(peak_hour, bucket_ips, bucket_counts)
+    active_hours = np.bincount(bucket_ips, minlength=group_count)
+
+    estimated = bucket_counts * scale
+    limits = []
+    for limit in hourly_limits:
+        over = estimated > limit
+        refused = np.maximum(estimated - limit, 0).sum()
+        limits.append({
+            "hourly_limit": limit,
+            "ips_over": int(np.unique(bucket_ips[over]).size),
+            "ip_hours_over": int(over.sum()),
+            "estimated_refused_share": float(refused / estimated.sum()),
+        })
+
+    busiest = np.argsort(-counts)[:top]
+    return {
+        "unique_ips": int((counts > 0).sum()),
+        "peak_hour_percentiles": {
+            f"p{p}": float(np.percentile(peak_hour[counts > 0] * scale, p)) for p in (50, 90, 99)
+        },
+        "top_ips": [
+            {
+                "ip": events.ip_labels[code],
+                "estimated_requests": round(float(counts[code] * scale)),
+                "estimated_per_active_hour": float(counts[code] * scale / active_hours[code]),
+                "estimated_peak_hour": round(float(peak_hour[code] * scale)),
+            }
+            for code in busiest
+        ],
+        "limits": limits,
+    }
+
+
+def hourly_heatmap(events: Events, sample_rate: float) -> np.ndarray:
+    """Estimated requests by UTC weekday (rows, Monday first) and hour"""
+    day = events.timestamp // DAY_MS
+    # 1970-01-01 was a Thursday
+    weekday = (day + 3) % 7
+    hour = (events.timestamp % DAY_MS) // HOUR_MS
+    return np.bincount(weekday * 24 + hour, minlength=7 * 24).reshape(7, 24) / sample_rate
+
+
+def cache_effectiveness(events: Events) -> list[dict[str, Any]]:
+    """How often each tool answered without an upstream call, and what that saved in latency"""
+    known = events.subrequests >= 0
+    tools = events.tool[known]
+    cached = events.subrequests[known] == 0
+    latency = events.response_time[known]
+    group_count = len(events.tool_labels)
+
+    counts = np.bincount(tools, minlength=group_count)
+    hits = np.bincount(tools, weights=cached, minlength=group_count)
+    subrequests = np.bincount(tools, weights=events.subrequests[known], minlength=group_count)
+    kv_operations = np.bincount(tools, weights=np.maximum(events.kv_operations[known], 0), minlength=group_count)
+
+    timed = ~np.isnan(latency)
+    medians = {}
+    for label, mask in (("cached", cached & timed), ("upstream", ~cached & timed)):
+        medians[label] = grouped_quantiles(tools[mask], latency[mask], group_count, (0.5,))[0.5]
+
+    rows = []
+    for code in np.argsort(-counts):
+        if counts[code] == 0:
+            continue
+        rows.append({
+            "tool": events.tool_labels[code],
+            "events": int(counts[code]),
+            "cache_share": float(hits[code] / counts[code]),
+            "subrequests_per_call": float(subrequests[code] / counts[code]),
+            "kv_operations_per_call": float(kv_operations[code] / counts[code]),
+            "p50_cached_ms": nullable(medians["cached"][code]),
+            "p50_upstream_ms": nullable(medians["upstream"][code]),
+        })
+    return rows
+
+
+def nullable(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def analyze(events: Events, sample_rate: float, hourly_limits: list[int], top: int) -> dict[str, Any]:
+    heatmap = hourly_heatmap(events, sample_rate)
+    return {
+        "events": len(events),
+        "estimated_requests": round(len(events) / sample_rate),
+        "from": int(events.timestamp.min()),
+        "to": int(events.timestamp.max()),
+        "latency_by_tool": latency_by_tool(events),
+        "ip_rates": ip_rates(events, sample_rate, hourly_limits, top),
+        "hourly_heatmap": {WEEKDAYS[day]: heatmap[day].round(1).tolist() for day in range(7)},
+        "cache_effectiveness": cache_effectiveness(events),
+    }
+
+
+def export_lines(url: str, token: str, since: Optional[str], until: Optional[str]) -> Iterator[str]:
+    """Lines of a full export, following the resume cursor across requests"""
+    parts = urlsplit(url)
+    base_query = dict(parse_qsl(parts.query))
+    base_query["format"] = "columns"
+    if since:
+        base_query["since"] = since
+    if until:
+        base_query["until"] = until
+    headers = {"User-Agent": USER_AGENT, "Authorization": f"Bearer {token}"}
+
+    cursor: Optional[str] = None
+    skipped = 0
+    while True:
+        query = dict(base_query, **({"cursor": cursor} if cursor else {}))
+        request = Request(urlunsplit(parts._replace(query=urlencode(query))), headers=headers)
+        summary = None
+        with urlopen(request) as response:
+            for raw in response:
+                line = raw.decode("utf-8")
+                if line.startswith('{"_export"'):
+                    summary = json.loads(line)["_export"]
+                    continue
+                yield line
+        if summary is None:
+            raise RuntimeError("export ended without a summary line; the Worker may have hit an error")
+        skipped += summary["skipped"]
+        if summary["complete"]:
+            yield json.dumps({"_export": dict(summary, skipped=skipped)}) + "\n"
+            return
+        print(f"Exported {summary['exported']} events, continuing", file=sys.stderr)
+        cursor = summary["cursor"]
+
+
+def open_text(path: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def load(args: argparse.Namespace) -> EventLoader:
+    loader = EventLoader()
+    if args.url:
+        with open_save(args.save) if args.save else nullcontext() as save:
+            for line in export_lines(args.url, args.token, args.since, args.until):
+                if save:
+                    save.write(line)
+                loader.add_line(line)
+    for path in args.files:
+        with open_text(path) as handle:
+            for line in handle:
+                loader.add_line(line)
+    return loader
+
+
+def open_save(path: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def print_report(report: dict[str, Any], sample_rate: float) -> None:
+    print(f"{report['events']} events (~{report['estimated_requests']} requests at a {sample_rate:.0%} sample)")
+
+    print("\nLatency by tool (ms)")
+    print(f"  {'tool':<28} {'events':>8} {'errors':>7} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for row in report["latency_by_tool"]:
+        cells = [row[key] for key in ("p50_ms", "p90_ms", "p95_ms", "p99_ms", "max_ms")]
+        print(f"  {row['tool']:<28} {row['events']:>8} {row['error_rate']:>7.1%} " + " ".join(format_ms(cell) for cell in cells))
+
+    rates = report["ip_rates"]
+    peaks = rates["peak_hour_percentiles"]
+    print(f"\nClients: {rates['unique_ips']} IPs; estimated peak hour p50 {peaks['p50']:.0f}, p90 {peaks['p90']:.0f}, p99 {peaks['p99']:.0f}")
+    for row in rates["top_ips"]:
+        print(f"  {row['ip']:<40} ~{row['estimated_requests']:>7} requests, ~{row['estimated_per_active_hour']:.1f}/active hour, peak ~{row['estimated_peak_hour']}/hour")
+    for row in rates["limits"]:
+        print(f"  limit {row['hourly_limit']}/hour: {row['ips_over']} IPs over in {row['ip_hours_over']} IP-hours, ~{row['estimated_refused_share']:.1%} of requests refused")
+
+    print("\nEstimated requests by UTC hour")
+    print("       " + "".join(f"{hour:>7}" for hour in range(24)))
+    for day, counts in report["hourly_heatmap"].items():
+        print(f"  {day}  " + "".join(f"{count:>7.0f}" for count in counts))
+
+    print("\nCache effectiveness")
+    for row in report["cache_effectiveness"]:
+        print(
+            f"  {row['tool']:<28} {row['cache_share']:>6.1%} without npm calls, "
+            f"{row['subrequests_per_call']:.2f} subrequests and {row['kv_operations_per_call']:.1f} KV ops per call, "
+            f"p50 {format_ms(row['p50_cached_ms']).strip()} cached vs {format_ms(row['p50_upstream_ms']).strip()} upstream"
+        )
+
+
+def format_ms(value: Optional[float]) -> str:
+    return f"{'-':>8}" if value is None else f"{value:>8.0f}"
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1], formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="saved exports (.jsonl or .jsonl.gz)")
+    parser.add_argument("--url", help="a deployment's /admin/events endpoint")
+    parser.add_argument(
+        "--token",
+        default=os.environ.get("ADMIN_TOKEN"),
+        help="the deployment's ADMIN_TOKEN (default: $ADMIN_TOKEN)",
+    )
+    parser.add_argument("--save", help="also write the fetched export to this file")
+    parser.add_argument("--since", help="first event to fetch (ms since epoch or ISO date)")
+    parser.add_argument("--until", help="last event to fetch (ms since epoch or ISO date)")
+    parser.add_argument("--sample-rate", type=float, default=DEFAULT_SAMPLE_RATE, help="share of requests stored as events")
+    parser.add_argument(
+        "--hourly-limit",
+        type=int,
+        action="append",
+        help="candidate per-IP hourly limit to evaluate; repeat for several (default: 100)",
+    )
+    parser.add_argument("--top", type=int, default=10, help="busiest IPs to list")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    if not args.url and not args.files:
+        parser.error("pass --url or at least one export file")
+    if args.url and not args.token:
+        parser.error("--url needs --token or the ADMIN_TOKEN environment variable")
+    if not 0 < args.sample_rate <= 1:
+        parser.error("--sample-rate must be in (0, 1]")
+    args.hourly_limit = args.hourly_limit or [100]
+    return args
+
+
+def main() -> int:
+    args = parse_args(sys.argv[1:])
+    loader = load(args)
+    events = loader.events()
+    if len(events) == 0:
+        print("No events in the export", file=sys.stderr)
+        return 1
+    if loader.summary and loader.summary.get("skipped"):
+        print(f"Skipped {loader.summary['skipped']} events stored without metadata", file=sys.stderr)
+
+    report = analyze(events, args.sample_rate, args.hourly_limit, args.top)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report, args.sample_rate)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
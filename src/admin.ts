@@ -0,0 +1,145 @@
+/**
+ * Usage, admin stats and metrics endpoints
+ * Kept out of the main entry point so the worker starts without loading
+ * monitoring code; index.ts imports this module on first use
+ */
+
+import type { ServiceContainer } from './services/container.js';
+import type { EventExportFormat } from './services/monitoring.js';
+
+// Both formats are one JSON value per line, but only jsonl has one event
+// per line; columns lines hold a page of events as arrays
+const EVENT_EXPORT_CONTENT_TYPES: Record<EventExportFormat, string> = {
+  jsonl: 'application/x-ndjson; charset=utf-8',
+  columns: 'application/vnd.directus-marketplace-search.event-columns; charset=utf-8'
+};
+
+export async function handleAdminRequest(request: Request, services: ServiceContainer, url: URL): Promise<Response> {
+  // Usage statistics endpoint
+  if (url.pathname === '/usage') {
+    const rateLimiter = await services.rateLimiter();
+    const clientIP = rateLimiter.getClientIP(request);
+    const stats = await rateLimiter.getUsageStats(clientIP);
+
+    return new Response(JSON.stringify({
+      ip: clientIP,
+      usage: stats,
+      upgradeMessage: 'For unlimited access, deploy your own instance using our template',
+      deployUrl: 'https://github.com/learnwithcc/directus-marketplace-search-mcp'
+    }), {
+      headers: { 
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': '*'
+      }
+    });
+  }
+
+  // Admin monitoring endpoint (basic auth could be added here)
+  if (url.pathname === '/admin/stats') {
+    const monitoring = await services.monitoring();
+    const days = url.searchParams.get('days');
+    const [summary, window] = await Promise.all([
+      monitoring.getUsageSummary(),
+      days ? monitoring.getWindowSummary(parseInt(days, 10) || 7) : Promise.resolve(undefined)
+    ]);
+
+    return new Response(JSON.stringify({
+      summary,
+      window,
+      serverInfo: {
+        version: '1.0.0',
+        deployment: 'cloudflare-workers',
+        timestamp: new Date().toISOString()
+      }
+    }), {
+      headers: { 
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': '*'
+      }
+    });
+  }
+
+  // Stored usage events, streamed page by page for offline analysis (scripts/usage_analytics.py).
+  // Events carry client IPs and user agents, so this needs the admin token
+  // and is not opened up to other origins
+  if (url.pathname === '/admin/events') {
+    if (!hasAdminToken(request, services.env.ADMIN_TOKEN)) {
+      return new Response(JSON.stringify({ error: 'Unauthorized' }), {
+        status: 401,
+        headers: {
+          'Content-Type': 'application/json',
+          'WWW-Authenticate': 'Bearer'
+        }
+      });
+    }
+
+    const format = url.searchParams.get('format') || 'jsonl';
+    if (format !== 'jsonl' && format !== 'columns') {
+      return new Response(JSON.stringify({ error: 'format must be jsonl or columns' }), {
+        status: 400,
+        headers: { 'Content-Type': 'application/json' }
+      });
+    }
+
+    const monitoring = await services.monitoring();
+    const stream = monitoring.exportEvents({
+      format: format as EventExportFormat,
+      since: parseTime(url.searchParams.get('since')),
+      until: parseTime(url.searchParams.get('until')),
+      cursor: url.searchParams.get('cursor') || undefined
+    });
+
+    return new Response(stream, {
+      headers: { 
+        'Content-Type': EVENT_EXPORT_CONTENT_TYPES[format],
+        'Cache-Control': 'no-store'
+      }
+    });
+  }
+
+  // OpenMetrics exposition - served from the totals the cron job publishes every 5 minutes (one KV read per scrape)
+  if (url.pathname === '/metrics') {
+    const body = await services.metrics.renderOpenMetrics();
+
+    return new Response(body, {
+      headers: { 
+        'Content-Type': 'application/openmetrics-text; version=1.0.0; charset=utf-8',
+        'Cache-Control': 'no-store',
+        'Access-Control-Allow-Origin': '*'
+      }
+    });
+  }
+
+  return new Response('Not Found', { 
+    status: 404,
+    headers: {
+      'Access-Control-Allow-Origin': '*'
+    }
+  });
+}
+
+/**
+ * Milliseconds since the epoch, or an ISO date/time
+ */
+function parseTime(value: string | null): number | undefined {
+  if (!value) {
+    return undefined;
+  }
+  const time = /^\d+$/.test(value) ? parseInt(value, 10) : Date.parse(value);
+  return Number.isNaN(time) ? undefined : time;
+}
+
+/**
+ * True when the request carries `Authorization: Bearer <token>`. Without a
+ * configured token nobody is let in.
+ */
+function hasAdminToken(request: Request, token: string | undefined): boolean {
+  if (!token) {
+    return false;
+  }
+  const header = request.headers.get('Authorization') || '';
+  const expected = new TextEncoder().encode(`Bearer ${token}`);
+  const actual = new TextEncoder().encode(header);
+  // Compare in constant time so the token can't be guessed byte by byte
+  return actual.byteLength === expected.byteLength && crypto.subtle.timingSafeEqual(actual, expected);
+}
@@ -0,0 +1,128 @@
+/**
+ * Cacheable read-only HTTP API
+ * GET /api/search and GET /api/extension/:name, served through the
+ * Workers Cache API with canonical URLs, strong ETags and 304s
+ */
+
+import { NotFoundError } from './services/directus.js';
+import type { ServiceContainer } from './services/container.js';
+import { MetricsService } from './services/metrics.js';
+import { EdgeCacheService, edgeCacheResponse, type EdgeCacheEntry } from './services/edge-cache.js';
+import { validateSearchParams, validateExtensionName, ValidationError } from './utils/validation.js';
+
+const JSON_HEADERS = {
+  'Content-Type': 'application/json',
+  'Access-Control-Allow-Origin': '*'
+};
+
+export async function handleApiRequest(request: Request, services: ServiceContainer, url: URL): Promise<Response> {
+  if (request.method !== 'GET' && request.method !== 'HEAD') {
+    return new Response(JSON.stringify({ error: 'Method not allowed' }), {
+      status: 405,
+      headers: { ...JSON_HEADERS, 'Allow': 'GET, HEAD, OPTIONS' }
+    });
+  }
+
+  const searchService = await services.search();
+
+  try {
+    if (url.pathname === '/api/search') {
+      const params = validateSearchParams({
+        query: url.searchParams.get('q') ?? url.searchParams.get('query') ?? '',
+        category: url.searchParams.get('category') || undefined,
+        limit: numberParam(url.searchParams.get('limit')),
+        offset: numberParam(url.searchParams.get('offset')),
+        sort: url.searchParams.get('sort') || undefined,
+        compatibleWith: url.searchParams.get('compatible_with') || undefined,
+        sandbox: booleanParam(url.searchParams.get('sandbox')),
+        license: url.searchParams.get('license') || undefined,
+        publisher: url.searchParams.get('publisher') || undefined,
+        facets: booleanParam(url.searchParams.get('facets')),
+        readme: booleanParam(url.searchParams.get('readme'))
+      });
+      const canonicalUrl = searchService.edge.searchUrl(params);
+
+      return await serveThroughEdge(request, services, searchService.edge, canonicalUrl,
+        options => searchService.searchExtensionsEntry(params, options));
+    }
+
+    if (url.pathname.startsWith('/api/extension/')) {
+      const name = validateExtensionName(decodePathSegment(url.pathname.slice('/api/extension/'.length)));
+      const canonicalUrl = searchService.edge.extensionUrl(name);
+
+      return await serveThroughEdge(request, services, searchService.edge, canonicalUrl,
+        options => searchService.getExtensionDetailsEntry(name, options));
+    }
+  } catch (error) {
+    const message = error instanceof Error ? error.message : 'Unknown error';
+    const status = error instanceof ValidationError ? 400 : error instanceof NotFoundError ? 404 : 502;
+    return new Response(JSON.stringify({ error: message }), {
+      status,
+      headers: JSON_HEADERS
+    });
+  }
+
+  return new Response(JSON.stringify({ error: 'Not Found' }), {
+    status: 404,
+    headers: JSON_HEADERS
+  });
+}
+
+async function serveThroughEdge<T>(
+  request: Request,
+  services: ServiceContainer,
+  edge: EdgeCacheService,
+  canonicalUrl: string,
+  load: (options: { skipEdgeLookup: boolean }) => Promise<EdgeCacheEntry<T>>
+): Promise<Response> {
+  // Colo-local hits are answered without touching KV, the rate limiter or npm
+  const cached = await edge.match(canonicalUrl);
+  if (cached) {
+    return edgeCacheResponse(request, canonicalUrl, cached);
+  }
+
+  const rateLimiter = await services.rateLimiter();
+  const rateLimitResult = await rateLimiter.checkRateLimit(rateLimiter.getClientIP(request));
+  if (!rateLimitResult.allowed) {
+    MetricsService.recordRateLimitRejection(rateLimitResult.reason || 'unknown');
+    return new Response(JSON.stringify({
+      error: 'Rate limit exceeded',
+      resetTime: new Date(rateLimitResult.resetTime).toISOString(),
+      limit: rateLimitResult.limit
+    }), {
+      status: 429,
+      headers: {
+        ...JSON_HEADERS,
+        'Retry-After': Math.ceil((rateLimitResult.resetTime - Date.now()) / 1000).toString()
+      }
+    });
+  }
+
+  const entry = await load({ skipEdgeLookup: edge.available });
+  // Carries the lifetime it was stored with, which is short for a stale fallback
+  return edgeCacheResponse(request, canonicalUrl, entry);
+}
+
+function decodePathSegment(segment: string): string {
+  try {
+    return decodeURIComponent(segment);
+  } catch {
+    throw new ValidationError('Invalid extension name: malformed percent-encoding');
+  }
+}
+
+function numberParam(value: string | null): number | undefined {
+  if (value === null || value === '') {
+    return undefined;
+  }
+  const parsed = Number(value);
+  return Number.isNaN(parsed) ? undefined : parsed;
+}
+
+function booleanParam(value: string | null): boolean | string | undefined {
+  if (value === null || value === '') {
+    return undefined;
+  }
+  // Anything else is passed through for validation to reject
+  return value === 'true' ? true : value === 'false' ? false : value;
+}
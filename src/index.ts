@@ -5,135 +5,165 @@
 
 import type { Env } from './types/worker.js';
 import { SimpleMCPServer } from './mcp-simple.js';
-import { RateLimiterService } from './services/rate-limiter.js';
-import { MonitoringService } from './services/monitoring.js';
+import { SUPPORTED_PROTOCOL_VERSIONS, DEFAULT_PROTOCOL_VERSION, TOOL_NAMES } from './mcp-static.js';
+import { ServiceContainer } from './services/container.js';
+import { SubrequestScheduler, budgetedEnv } from './services/scheduler.js';
+import { MetricsService } from './services/metrics.js';
 
-export default {
-  async fetch(request: Request, env: Env): Promise<Response> {
-    try {
-      const url = new URL(request.url);
-      
-      // Handle CORS preflight for all endpoints
-      if (request.method === 'OPTIONS') {
-        const origin = request.headers.get('Origin');
-        return new Response(null, {
-          status: 200,
-          headers: {
-            'Access-Control-Allow-Origin': origin || '*',
-            'Access-Control-Allow-Methods': 'GET, POST, DELETE, OPTIONS, HEAD',
-            'Access-Control-Allow-Headers': '*',
-            'Access-Control-Expose-Headers': '*',
-            'Access-Control-Max-Age': '86400',
-            'Access-Control-Allow-Credentials': 'true',
-            'Vary': 'Origin',
-          }
-        });
-      }
-
-      // Health check endpoint
-      if (url.pathname === '/health') {
-        return new Response(JSON.stringify({ 
-          status: 'healthy', 
-          timestamp: new Date().toISOString(),
-          version: '1.0.0'
-        }), {
-          headers: { 
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*'
-          }
-        });
-      }
+// Durable Object classes must be exported from the entry module
+export { SessionManager } from './services/sessions.js';
 
-      // Usage statistics endpoint
-      if (url.pathname === '/usage') {
-        const rateLimiter = new RateLimiterService(env);
-        const clientIP = rateLimiter.getClientIP(request);
-        const stats = await rateLimiter.getUsageStats(clientIP);
-        
-        return new Response(JSON.stringify({
-          ip: clientIP,
-          usage: stats,
-          upgradeMessage: 'For unlimited access, deploy your own instance using our template',
-          deployUrl: 'https://github.com/learnwithcc/directus-marketplace-search-mcp'
-        }), {
-          headers: { 
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*'
-          }
-        });
-      }
+// Root info document, encoded once per isolate
+const ROOT_INFO_BYTES = new TextEncoder().encode(JSON.stringify({
+  name: 'directus-marketplace-search-mcp',
+  version: '1.0.0',
+  description: 'MCP server for Directus Marketplace search functionality',
+  protocolVersion: DEFAULT_PROTOCOL_VERSION,
+  supportedProtocolVersions: SUPPORTED_PROTOCOL_VERSIONS,
+  endpoints: {
+    mcp: '/mcp',
+    health: '/health',
+    usage: '/usage',
+    stats: '/admin/stats',
+    events: '/admin/events',
+    metrics: '/metrics',
+    search: '/api/search?q=',
+    extension: '/api/extension/:name'
+  },
+  tools: TOOL_NAMES
+}));
 
-      // Admin monitoring endpoint (basic auth could be added here)
-      if (url.pathname === '/admin/stats') {
-        const monitoring = new MonitoringService(env);
-        const summary = await monitoring.getUsageSummary();
-        
-        return new Response(JSON.stringify({
-          summary,
-          serverInfo: {
-            version: '1.0.0',
-            deployment: 'cloudflare-workers',
-            timestamp: new Date().toISOString()
-          }
-        }), {
-          headers: { 
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*'
-          }
-        });
-      }
+// Routes served by admin.ts, which is imported only when one is hit
+const ADMIN_PATHS = new Set(['/usage', '/admin/stats', '/admin/events', '/metrics']);
 
-      // MCP endpoint - Streamable HTTP transport (2025-03-26)
-      if (url.pathname === '/mcp') {
-        const mcpServer = new SimpleMCPServer(env);
-        return await mcpServer.handleRequest(request);
-      }
+let mcpServer: { services: ServiceContainer; server: SimpleMCPServer } | null = null;
 
-      // Root endpoint with API info
-      if (url.pathname === '/') {
-        return new Response(JSON.stringify({
-          name: 'directus-marketplace-search-mcp',
-          version: '1.0.0',
-          description: 'MCP server for Directus Marketplace search functionality',
-          protocolVersion: '2024-11-05', // Default version
-          supportedProtocolVersions: ['2024-11-05', '2025-06-18'],
-          endpoints: {
-            mcp: '/mcp',
-            health: '/health',
-            usage: '/usage',
-            stats: '/admin/stats'
-          },
-          tools: [
-            'search_extensions',
-            'get_extension_details', 
-            'get_extension_categories'
-          ]
-        }), {
-          headers: { 
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*'
-          }
-        });
-      }
+function getMcpServer(services: ServiceContainer): SimpleMCPServer {
+  if (!mcpServer || mcpServer.services !== services) {
+    mcpServer = { services, server: new SimpleMCPServer(services) };
+  }
+  return mcpServer.server;
+}
 
-      return new Response('Not Found', { 
-        status: 404,
+async function handleFetch(request: Request, env: Env): Promise<Response> {
+  try {
+    const url = new URL(request.url);
+    const services = ServiceContainer.for(env, url.origin);
+    
+    // Handle CORS preflight for all endpoints
+    if (request.method === 'OPTIONS') {
+      const origin = request.headers.get('Origin');
+      return new Response(null, {
+        status: 200,
         headers: {
+          'Access-Control-Allow-Origin': origin || '*',
+          'Access-Control-Allow-Methods': 'GET, POST, DELETE, OPTIONS, HEAD',
+          'Access-Control-Allow-Headers': '*',
+          'Access-Control-Expose-Headers': '*',
+          'Access-Control-Max-Age': '86400',
+          'Access-Control-Allow-Credentials': 'true',
+          'Vary': 'Origin',
+        }
+      });
+    }
+
+    // Health check endpoint
+    if (url.pathname === '/health') {
+      return new Response(JSON.stringify({ 
+        status: 'healthy', 
+        timestamp: new Date().toISOString(),
+        version: '1.0.0'
+      }), {
+        headers: { 
+          'Content-Type': 'application/json',
           'Access-Control-Allow-Origin': '*'
         }
       });
-    } catch (error) {
-      console.error('Worker error:', error);
-      return new Response(JSON.stringify({
-        error: 'Internal Server Error',
-        message: error instanceof Error ? error.message : 'Unknown error'
-      }), { 
-        status: 500,
-        headers: {
+    }
+
+    // Cacheable read API - served from the edge cache where possible, and
+    // loaded on first use since it needs the whole search stack
+    if (url.pathname.startsWith('/api/')) {
+      const { handleApiRequest } = await import('./api.js');
+      return await handleApiRequest(request, services, url);
+    }
+
+    // Usage, stats and metrics endpoints - loaded on first use to keep startup lean
+    if (ADMIN_PATHS.has(url.pathname)) {
+      const { handleAdminRequest } = await import('./admin.js');
+      return await handleAdminRequest(request, services, url);
+    }
+
+    // MCP endpoint - Streamable HTTP transport (2025-03-26)
+    if (url.pathname === '/mcp') {
+      return await getMcpServer(services).handleRequest(request);
+    }
+
+    // Root endpoint with API info
+    if (url.pathname === '/') {
+      return new Response(ROOT_INFO_BYTES, {
+        headers: { 
           'Content-Type': 'application/json',
           'Access-Control-Allow-Origin': '*'
         }
       });
     }
+
+    return new Response('Not Found', { 
+      status: 404,
+      headers: {
+        'Access-Control-Allow-Origin': '*'
+      }
+    });
+  } catch (error) {
+    console.error('Worker error:', error);
+    return new Response(JSON.stringify({
+      error: 'Internal Server Error',
+      message: error instanceof Error ? error.message : 'Unknown error'
+    }), { 
+      status: 500,
+      headers: {
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': '*'
+      }
+    });
+  }
+}
+
+export default {
+  // Each invocation gets its own subrequest and KV budget
+  async fetch(request: Request, env: Env): Promise<Response> {
+    return await SubrequestScheduler.forEnv(env).run(() => handleFetch(request, budgetedEnv(env)));
+  },
+
+  // Cron trigger: fold idle metrics shards and publish the metrics totals,
+  // fold the last completed week and month of usage stats, apply new npm
+  // changes to the stored catalog, then bring the similarity and README
+  // indexes in line with it. The steps share one budget, so later ones
+  // take what the earlier ones left.
+  async scheduled(controller: ScheduledController, env: Env, ctx: ExecutionContext): Promise<void> {
+    const scheduler = SubrequestScheduler.forEnv(env);
+    const budgeted = budgetedEnv(env);
+    ctx.waitUntil(scheduler.run(() =>
+      new MetricsService(budgeted).compact()
+        .then(folded => console.log(`Metrics compaction folded ${folded} idle shards`))
+        .catch(error => console.error('Metrics compaction failed:', error))
+        .then(() => import('./services/monitoring.js'))
+        .then(({ MonitoringService }) => new MonitoringService(budgeted).foldRollups())
+        .then(written => console.log(`Usage rollups folded: ${written}`))
+        .catch(error => console.error('Usage rollup fold failed:', error))
+        .then(() => import('./services/catalog-sync.js'))
+        .then(({ CatalogSyncService }) => new CatalogSyncService(budgeted).sync())
+        .then(result => console.log('Catalog sync complete:', result))
+        .catch(error => console.error('Catalog sync failed:', error))
+        .then(() => import('./services/similarity.js'))
+        .then(({ SimilarityService }) => new SimilarityService(budgeted).refresh())
+        .then(rebuilt => console.log(rebuilt ? 'Similarity index rebuilt' : 'Similarity index up to date'))
+        .catch(error => console.error('Similarity index refresh failed:', error))
+        .then(() => import('./services/readme-index.js'))
+        .then(({ ReadmeIndexService }) => new ReadmeIndexService(budgeted).refresh())
+        .then(result => console.log('README index refresh complete:', result))
+        .catch(error => console.error('README index refresh failed:', error))
+    ));
   }
 };
\ No newline at end of file
@@ -3,12 +3,41 @@
  * Implements MCP Streamable HTTP transport (2025-03-26 specification)
  */
 
-import type { Env } from './types/worker.js';
-import { DirectusSearchService } from './services/directus.js';
-import { RateLimiterService } from './services/rate-limiter.js';
-import { MonitoringService } from './services/monitoring.js';
-import { validateSearchParams } from './utils/validation.js';
-import { z } from 'zod';
+import type { ServiceContainer } from './services/container.js';
+import { MetricsService } from './services/metrics.js';
+import {
+  validateSearchParams,
+  validateExtensionName,
+  validateOutputOptions,
+  validateSimilarLimit,
+  validateResultPosition
+} from './utils/validation.js';
+import { projectExtension, serializeProjection, cleanRepositoryUrl } from './utils/projection.js';
+import {
+  DEFAULT_RESPONSE_BUDGET_BYTES,
+  fitToBudget,
+  truncateDescription,
+  encodeCursor,
+  decodeCursor
+} from './utils/pagination.js';
+import { compressedResponse, precompressedResponse } from './utils/compression.js';
+import {
+  TOOLS_LIST_BYTES,
+  CATEGORIES_BYTES,
+  INITIALIZE_BYTES,
+  negotiateProtocolVersion,
+  encodeJsonRpcResult
+} from './mcp-static.js';
+import type { EdgeCacheEntry } from './services/edge-cache.js';
+import { SessionRejectedError, type SessionService } from './services/sessions.js';
+import type {
+  DirectusExtension,
+  ExtensionSearchResult,
+  FacetCounts,
+  FacetName,
+  NPMSearchResponse,
+  SearchParams
+} from './types/directus.js';
 
 interface JsonRpcRequest {
   jsonrpc: '2.0';
@@ -28,49 +57,16 @@ interface JsonRpcResponse {
   };
 }
 
-interface McpServerInfo {
-  name: string;
-  version: string;
-  protocolVersion: string;
-  supportedProtocolVersions?: string[];
-  capabilities: {
-    tools?: {
-      listChanged?: boolean;
-    };
-    resources?: {
-      subscribe?: boolean;
-      listChanged?: boolean;
-    };
-    prompts?: {
-      listChanged?: boolean;
-    };
-    logging?: {};
-  };
+// The session a request belongs to, with the protocol version it claims
+interface SessionContext {
+  id: string;
+  protocolVersion?: string;
+  service: SessionService;
 }
 
 export class SimpleMCPServer {
-  private searchService: DirectusSearchService;
-  private rateLimiter: RateLimiterService;
-  private monitoring: MonitoringService;
-  private serverInfo: McpServerInfo;
-  // Simplified session tracking - no persistent storage needed
-
-  constructor(private env: Env) {
-    this.searchService = new DirectusSearchService(env);
-    this.rateLimiter = new RateLimiterService(env);
-    this.monitoring = new MonitoringService(env);
-    this.serverInfo = {
-      name: 'directus-marketplace-search',
-      version: '1.0.0',
-      protocolVersion: '2024-11-05', // Default, but negotiated during initialize
-      supportedProtocolVersions: ['2024-11-05', '2025-06-18'],
-      capabilities: {
-        tools: {
-          listChanged: true
-        }
-      }
-    };
-  }
+  // Services are shared by every request the isolate handles
+  constructor(private services: ServiceContainer) {}
 
   async handleRequest(request: Request): Promise<Response> {
     const startTime = Date.now();
@@ -107,13 +103,16 @@ export class SimpleMCPServer {
     // Determine if this is a tool call that needs rate limiting
     let isToolCall = false;
     let toolName: string | undefined;
+    // The body is read and parsed once here and handed to the POST handler
+    let body = '';
+    let parsedBody: JsonRpcRequest | undefined;
     
     if (request.method === 'POST') {
       try {
-        const cloned = request.clone();
-        const text = await cloned.text();
-        if (text.trim()) {
-          const jsonRpcRequest = JSON.parse(text);
+        body = await request.text();
+        if (body.trim()) {
+          const jsonRpcRequest = JSON.parse(body);
+          parsedBody = jsonRpcRequest;
           isToolCall = jsonRpcRequest.method === 'tools/call';
           if (isToolCall && jsonRpcRequest.params?.name) {
             toolName = jsonRpcRequest.params.name;
@@ -126,10 +125,16 @@ export class SimpleMCPServer {
 
     // Only apply rate limiting to actual tool calls
     if (isToolCall) {
-      const clientIP = this.rateLimiter.getClientIP(request);
-      const rateLimitResult = await this.rateLimiter.checkRateLimit(clientIP);
+      const rateLimiter = await this.services.rateLimiter();
+      const clientIP = rateLimiter.getClientIP(request);
+      const rateLimitResult = await rateLimiter.checkRateLimit(clientIP);
       
       if (!rateLimitResult.allowed) {
+        MetricsService.recordRateLimitRejection(rateLimitResult.reason || 'unknown');
+        this.services.metrics.flushIfDue().catch(error => {
+          console.error('Failed to flush metrics:', error);
+        });
+        
         const resetTime = new Date(rateLimitResult.resetTime).toISOString();
         const errorMessage = rateLimitResult.reason === 'hourly_limit_exceeded' 
           ? `Rate limit exceeded. You can make ${rateLimitResult.limit} requests per hour. Try again after ${resetTime}.`
@@ -169,7 +174,7 @@ export class SimpleMCPServer {
           response = await this.handleGetRequest(request, corsHeaders);
           break;
         case 'POST':
-          response = await this.handlePostRequest(request, corsHeaders);
+          response = await this.handlePostRequest(request, corsHeaders, body, parsedBody);
           break;
         case 'DELETE':
           response = await this.handleDeleteRequest(request, corsHeaders);
@@ -194,7 +199,10 @@ export class SimpleMCPServer {
       const success = response.status < 400;
       const errorCode = success ? undefined : response.status;
       
-      this.monitoring.trackRequest(request, success, responseTime, errorCode, toolName);
+      MetricsService.recordRequest(toolName || 'unknown', response.status);
+      this.services.monitoring()
+        .then(monitoring => monitoring.trackRequest(request, success, responseTime, errorCode, toolName))
+        .catch(error => console.error('Failed to track request:', error));
     }
     
     return response;
@@ -214,7 +222,12 @@ export class SimpleMCPServer {
     });
   }
 
-  private async handlePostRequest(request: Request, corsHeaders: Record<string, string>): Promise<Response> {
+  private async handlePostRequest(
+    request: Request,
+    corsHeaders: Record<string, string>,
+    text: string,
+    parsedBody?: JsonRpcRequest
+  ): Promise<Response> {
     try {
       // Log all headers for debugging
       const headers: Record<string, string> = {};
@@ -234,14 +247,13 @@ export class SimpleMCPServer {
           throw new Error('Request body is empty');
         }
         
-        const text = await request.text();
         console.log('Raw request body:', text);
         
         if (!text.trim()) {
           throw new Error('Request body is empty or whitespace only');
         }
         
-        jsonRpcRequest = JSON.parse(text);
+        jsonRpcRequest = parsedBody ?? JSON.parse(text);
         console.log('Received JSON-RPC request:', jsonRpcRequest);
       } catch (parseError) {
         console.error('Failed to parse JSON:', parseError);
@@ -272,22 +284,55 @@ export class SimpleMCPServer {
         }
       }
       
-      const response = await this.handleJsonRpcRequest(jsonRpcRequest, request);
-      
       // Standard response headers
       const responseHeaders: Record<string, string> = {
         'Content-Type': 'application/json',
         ...corsHeaders
       };
       
+      // With a session store, initialize opens a session the client sends back as Mcp-Session-Id
+      const sessions = this.services.sessions;
+      if (sessions && jsonRpcRequest.method === 'initialize') {
+        const sessionId = this.generateSessionId();
+        await sessions.initialize(sessionId, negotiateProtocolVersion(jsonRpcRequest.params?.protocolVersion));
+        responseHeaders['Mcp-Session-Id'] = sessionId;
+      }
+      
+      // The most frequent calls have fixed results; answer them from
+      // pre-encoded bytes, compressed once per isolate for each request id
+      const staticResult = this.getStaticResult(jsonRpcRequest);
+      if (staticResult) {
+        const body = encodeJsonRpcResult(jsonRpcRequest.id, staticResult.bytes);
+        return await precompressedResponse(request, `${staticResult.key}|${JSON.stringify(jsonRpcRequest.id)}`, body, {
+          headers: responseHeaders
+        });
+      }
+      
+      const response = await this.handleJsonRpcRequest(jsonRpcRequest, request);
+      
       const responseBody = JSON.stringify(response);
       console.log('Sending response:', responseBody);
       console.log('Response headers:', responseHeaders);
       
-      return new Response(responseBody, {
+      return compressedResponse(request, responseBody, {
         headers: responseHeaders
       });
     } catch (error: any) {
+      if (error instanceof SessionRejectedError) {
+        // Per the transport spec: 404 for an unknown session (the client
+        // should initialize again), 400 for a mismatched protocol version
+        return new Response(JSON.stringify({
+          jsonrpc: '2.0',
+          id: null,
+          error: { code: -32001, message: error.message }
+        }), {
+          status: error.status,
+          headers: {
+            'Content-Type': 'application/json',
+            ...corsHeaders
+          }
+        });
+      }
       console.error('MCP request error:', error);
       const errorResponse: JsonRpcResponse = {
         jsonrpc: '2.0',
@@ -310,7 +355,17 @@ export class SimpleMCPServer {
   }
 
   private async handleDeleteRequest(request: Request, corsHeaders: Record<string, string>): Promise<Response> {
-    // Stateless - no session cleanup needed
+    const sessionId = request.headers.get('Mcp-Session-Id');
+    if (sessionId && this.services.sessions) {
+      try {
+        await this.services.sessions.end(sessionId);
+      } catch (error) {
+        if (error instanceof SessionRejectedError) {
+          return new Response('', { status: error.status, headers: corsHeaders });
+        }
+        throw error;
+      }
+    }
     console.log('MCP connection terminated');
     
     return new Response('', {
@@ -335,41 +390,37 @@ export class SimpleMCPServer {
     return crypto.randomUUID();
   }
 
-  private async extractToolNameFromRequest(request: Request): Promise<string | undefined> {
-    try {
-      // Clone the request to read the body without consuming it
-      const cloned = request.clone();
-      const text = await cloned.text();
-      
-      if (!text.trim()) {
-        return undefined;
-      }
-      
-      const jsonRpcRequest = JSON.parse(text);
-      
-      if (jsonRpcRequest.method === 'tools/call' && jsonRpcRequest.params?.name) {
-        return jsonRpcRequest.params.name;
+  /**
+   * Results that never change, from mcp-static.ts; these methods have no
+   * other handler
+   */
+  private getStaticResult(request: JsonRpcRequest): { key: string; bytes: Uint8Array } | undefined {
+    switch (request.method) {
+      case 'initialize': {
+        const version = negotiateProtocolVersion(request.params?.protocolVersion);
+        return { key: `initialize:${version}`, bytes: INITIALIZE_BYTES.get(version)! };
       }
-    } catch (error) {
-      // Ignore errors, just return undefined
+      case 'tools/list':
+        return { key: 'tools/list', bytes: TOOLS_LIST_BYTES };
+      case 'tools/call':
+        return request.params?.name === 'get_extension_categories'
+          ? { key: 'categories', bytes: CATEGORIES_BYTES }
+          : undefined;
+      default:
+        return undefined;
     }
-    
-    return undefined;
   }
 
-  private async handleJsonRpcRequest(jsonRpcRequest: JsonRpcRequest, httpRequest: Request): Promise<JsonRpcResponse> {
+  private async handleJsonRpcRequest(
+    jsonRpcRequest: JsonRpcRequest,
+    httpRequest: Request
+  ): Promise<JsonRpcResponse> {
     try {
       let result: any;
 
       switch (jsonRpcRequest.method) {
-        case 'initialize':
-          result = await this.handleInitialize(jsonRpcRequest.params, httpRequest);
-          break;
-        case 'tools/list':
-          result = await this.handleToolsList();
-          break;
         case 'tools/call':
-          result = await this.handleToolCall(jsonRpcRequest.params);
+          result = await this.handleToolCall(jsonRpcRequest.params, this.getSession(httpRequest));
           break;
         default:
           throw {
@@ -384,6 +435,10 @@ export class SimpleMCPServer {
         result
       };
     } catch (error: any) {
+      if (error instanceof SessionRejectedError) {
+        // Answered with an HTTP status rather than a JSON-RPC error
+        throw error;
+      }
       return {
         jsonrpc: '2.0',
         id: jsonRpcRequest.id,
@@ -417,112 +472,16 @@ export class SimpleMCPServer {
     }
   }
 
-  private async handleInitialize(params: any, httpRequest: Request): Promise<any> {
-    // Stateless initialization - no session storage needed
-    console.log('MCP client initializing');
-    console.log('Client requested protocol version:', params?.protocolVersion);
-    
-    // Support both protocol versions
-    const clientProtocolVersion = params?.protocolVersion;
-    const supportedVersions = ['2024-11-05', '2025-06-18'];
-    
-    let negotiatedVersion = '2024-11-05'; // Default to older version for compatibility
-    if (supportedVersions.includes(clientProtocolVersion)) {
-      negotiatedVersion = clientProtocolVersion;
-    }
-    
-    console.log(`Negotiated protocol version: ${negotiatedVersion}`);
-    
-    return {
-      protocolVersion: negotiatedVersion,
-      capabilities: this.serverInfo.capabilities,
-      serverInfo: {
-        ...this.serverInfo,
-        protocolVersion: negotiatedVersion
-      }
-    };
-  }
-
-  private async handleToolsList(): Promise<{ tools: any[] }> {
-    return {
-      tools: [
-        {
-          name: 'search_extensions',
-          description: 'Search Directus marketplace extensions by query, category, and other filters. Returns a simple list with extension names, descriptions, popularity indicators, and GitHub/NPM links.',
-          inputSchema: {
-            type: 'object',
-            properties: {
-              query: {
-                type: 'string',
-                description: 'Search query for extension name, description, or keywords',
-                minLength: 1,
-                maxLength: 100
-              },
-              category: {
-                type: 'string',
-                enum: ['interfaces', 'displays', 'layouts', 'panels', 'modules', 'hooks', 'endpoints', 'operations', 'themes'],
-                description: 'Filter by extension category'
-              },
-              limit: {
-                type: 'number',
-                minimum: 1,
-                maximum: 50,
-                default: 10,
-                description: 'Maximum number of results to return'
-              },
-              offset: {
-                type: 'number',
-                minimum: 0,
-                default: 0,
-                description: 'Number of results to skip for pagination'
-              },
-              sort: {
-                type: 'string',
-                enum: ['relevance', 'downloads', 'updated', 'created'],
-                default: 'relevance',
-                description: 'Sort order for results'
-              }
-            },
-            required: ['query']
-          }
-        },
-        {
-          name: 'get_extension_details',
-          description: 'Get detailed information about a specific Directus extension including name, version, description, author, and links to GitHub/NPM.',
-          inputSchema: {
-            type: 'object',
-            properties: {
-              name: {
-                type: 'string',
-                description: 'Extension package name (e.g., directus-extension-display-link)',
-                minLength: 1
-              }
-            },
-            required: ['name']
-          }
-        },
-        {
-          name: 'get_extension_categories',
-          description: 'Get a simple list of all available Directus extension categories with brief descriptions.',
-          inputSchema: {
-            type: 'object',
-            properties: {}
-          }
-        }
-      ]
-    };
-  }
-
-  private async handleToolCall(params: any): Promise<{ content: any[] }> {
+  private async handleToolCall(params: any, session: SessionContext | null): Promise<{ content: any[] }> {
     const { name, arguments: args } = params;
 
     switch (name) {
       case 'search_extensions':
-        return await this.handleSearchExtensions(args);
+        return await this.handleSearchExtensions(args, session);
       case 'get_extension_details':
-        return await this.handleGetExtensionDetails(args);
-      case 'get_extension_categories':
-        return await this.handleGetExtensionCategories();
+        return await this.handleGetExtensionDetails(args, session);
+      case 'find_similar_extensions':
+        return await this.handleFindSimilarExtensions(args);
       default:
         throw {
           code: -32601,
@@ -531,54 +490,97 @@ export class SimpleMCPServer {
     }
   }
 
-  private async handleSearchExtensions(args: any): Promise<{ content: any[] }> {
+  private async handleSearchExtensions(args: any, session: SessionContext | null): Promise<{ content: any[] }> {
     try {
-      const params = validateSearchParams(args);
-      const results = await this.searchService.searchExtensions(params);
+      // A continuation token replaces all the search arguments it was issued
+      // for; only the output options still come from args
+      const params = validateSearchParams(args?.cursor ? decodeCursor(String(args.cursor)) : args);
+      const outputOptions = validateOutputOptions(args);
+      const limit = params.limit || 10;
+      const search = await this.services.search();
+      
+      // Pages of a search this session has already seen come from the session store
+      const remembered = session
+        ? await session.service.getResults(session.id, params, session.protocolVersion)
+        : null;
+      let entry: EdgeCacheEntry<NPMSearchResponse> | null = null;
+      let results: NPMSearchResponse;
+      if (remembered) {
+        results = await search.enrichPending(remembered, params.query);
+      } else if (session) {
+        // Fetch the next pages too and keep them in the session. The store
+        // is awaited so an immediate "next page" finds it.
+        const windowParams = session.service.window(params);
+        const fetched = await search.searchWindow(windowParams, limit);
+        await session.service.storeResults(session.id, windowParams, fetched, session.protocolVersion);
+        results = { ...fetched, objects: fetched.objects.slice(0, limit) };
+      } else {
+        entry = await search.searchExtensionsEntry(params);
+        results = entry.data;
+      }
+      const budget = this.getResponseBudget();
+      const offset = params.offset || 0;
+      
+      if (outputOptions.output === 'json') {
+        const { fields } = outputOptions;
+        const serialize = (data: NPMSearchResponse) => {
+          const fit = fitToBudget(data.objects, (item, truncate) => JSON.stringify({
+            ...projectExtension(
+              truncate ? { ...item.package, description: truncateDescription(item.package.description) } : item.package,
+              fields,
+              item.downloads.monthly
+            ),
+            ...(item.highlight && { highlight: item.highlight })
+          }), budget);
+          const nextCursor = fit.omitted > 0
+            ? `,"nextCursor":${JSON.stringify(encodeCursor(params, offset + fit.parts.length))}`
+            : '';
+          const facets = data.facets ? `,"facets":${JSON.stringify(data.facets)}` : '';
+          return `{"total":${data.total},"results":[${fit.parts.join(',')}]${facets}${nextCursor}}`;
+        };
+        // nextCursor resumes these exact params, so they are part of the key:
+        // different searches can return byte-identical results
+        const variant = `${fields.join(',')}|${budget}|${search.edge.searchUrl(params)}`;
+        const text = entry ? serializeProjection(entry, variant, serialize) : serialize(results);
+        
+        return {
+          content: [
+            {
+              type: 'text',
+              text
+            }
+          ]
+        };
+      }
       
       if (results.objects.length === 0) {
         return {
           content: [
             {
               type: 'text',
-              text: `No Directus extensions found for "${params.query}"${params.category ? ` in category "${params.category}"` : ''}.`
+              text: (`No Directus extensions found for "${params.query}"${params.category ? ` in category "${params.category}"` : ''}${describeFilters(params)}.\n\n` +
+                (results.facets ? describeFacets(results.facets) : '')).trim()
             }
           ]
         };
       }
 
       // Simple conversational format
-      let response = `I found ${results.objects.length} Directus extensions for "${params.query}"${params.category ? ` in the ${params.category} category` : ''}!\n\n`;
+      let response = `I found ${results.objects.length} Directus extensions for "${params.query}"${params.category ? ` in the ${params.category} category` : ''}${describeFilters(params)}!\n\n`;
+      if (results.facets) {
+        response += describeFacets(results.facets);
+      }
       
-      results.objects.forEach((item, index) => {
-        const pkg = item.package;
-        const downloads = item.downloads;
-        const monthlyDownloads = typeof downloads === 'number' ? downloads : downloads.monthly;
-        
-        // Determine popularity
-        let popularity = '';
-        if (monthlyDownloads > 1000) {
-          popularity = ' (Very popular!)';
-        } else if (monthlyDownloads > 500) {
-          popularity = ' (Popular)';
-        } else if (monthlyDownloads > 100) {
-          popularity = ' (Moderately popular)';
-        }
-        
-        // Simple format: Name, Description, Popularity, Link
-        response += `**${pkg.name}**${popularity}\n`;
-        response += `${pkg.description}\n`;
-        
-        // Add the most relevant link (prefer GitHub over npm)
-        if (pkg.links?.repository) {
-          const repoUrl = pkg.links.repository.replace('git+', '').replace('.git', '');
-          response += `[View on GitHub](${repoUrl})\n\n`;
-        } else if (pkg.links?.npm) {
-          response += `[View on NPM](${pkg.links.npm})\n\n`;
-        } else {
-          response += `\n`;
-        }
-      });
+      // In a session, results are numbered so get_extension_details can refer to them
+      const positioned = results.objects.map((item, index) => ({ item, position: offset + index + 1 }));
+      const fit = fitToBudget(positioned, ({ item, position }, truncate) =>
+        `${session ? `${position}. ` : ''}${this.renderSearchResult(item, truncate)}`, budget);
+      response += fit.parts.join('');
+      
+      if (fit.omitted > 0) {
+        response += `${fit.omitted} more results were left out to keep this response small. `;
+        response += `Call search_extensions with cursor "${encodeCursor(params, offset + fit.parts.length)}" to see them.`;
+      }
 
       return {
         content: [
@@ -589,6 +591,9 @@ export class SimpleMCPServer {
         ]
       };
     } catch (error) {
+      if (error instanceof SessionRejectedError) {
+        throw error;
+      }
       throw {
         code: -32603,
         message: `Search failed: ${error instanceof Error ? error.message : 'Unknown error'}`
@@ -596,21 +601,109 @@ export class SimpleMCPServer {
     }
   }
 
-  private async handleGetExtensionDetails(args: any): Promise<{ content: any[] }> {
+  private renderSearchResult(item: ExtensionSearchResult, truncate: boolean): string {
+    const pkg = item.package;
+    const monthlyDownloads = item.downloads.monthly;
+    
+    // Determine popularity
+    let popularity = '';
+    if (monthlyDownloads > 1000) {
+      popularity = ' (Very popular!)';
+    } else if (monthlyDownloads > 500) {
+      popularity = ' (Popular)';
+    } else if (monthlyDownloads > 100) {
+      popularity = ' (Moderately popular)';
+    }
+    
+    // Simple format: Name, Description, Popularity, Link
+    let rendered = `**${pkg.name}**${popularity}\n`;
+    rendered += `${truncate ? truncateDescription(pkg.description) : pkg.description}\n`;
+    
+    if (pkg.extension?.host) {
+      rendered += `Directus ${pkg.extension.host}${pkg.extension.sandbox ? ' (sandboxed)' : ''}\n`;
+    }
+    
+    if (item.highlight) {
+      rendered += `> ${item.highlight}\n`;
+    }
+    
+    // Add the most relevant link (prefer GitHub over npm)
+    if (pkg.links?.repository) {
+      rendered += `[View on GitHub](${cleanRepositoryUrl(pkg.links.repository)})\n\n`;
+    } else if (pkg.links?.npm) {
+      rendered += `[View on NPM](${pkg.links.npm})\n\n`;
+    } else {
+      rendered += `\n`;
+    }
+    
+    return rendered;
+  }
+
+  private getSession(request: Request): SessionContext | null {
+    const sessionId = request.headers.get('Mcp-Session-Id');
+    const service = this.services.sessions;
+    return sessionId && service ? {
+      id: sessionId,
+      protocolVersion: request.headers.get('MCP-Protocol-Version') || undefined,
+      service
+    } : null;
+  }
+
+  private getResponseBudget(): number {
+    return parseInt(this.services.env.MAX_RESPONSE_BYTES || '', 10) || DEFAULT_RESPONSE_BUDGET_BYTES;
+  }
+
+  private async handleGetExtensionDetails(args: any, session: SessionContext | null): Promise<{ content: any[] }> {
     try {
-      const schema = z.object({
-        name: z.string().min(1).max(100)
-      });
+      const outputOptions = validateOutputOptions(args);
+      const search = await this.services.search();
+      let entry: EdgeCacheEntry<DirectusExtension> | null = null;
+      let details: DirectusExtension | null;
       
-      const { name } = schema.parse(args);
-      const details = await this.searchService.getExtensionDetails(name);
+      if (args?.result !== undefined && args?.name === undefined) {
+        // A result number refers to the session's latest search, which already holds the details
+        const position = validateResultPosition(args.result);
+        if (!session) {
+          throw new Error('result numbers need a session (SESSIONS binding and Mcp-Session-Id); pass the extension name instead');
+        }
+        details = await session.service.getResult(session.id, position, session.protocolVersion);
+        if (details && !details.downloads) {
+          details = await search.withDownloads(details);
+        }
+        if (!details) {
+          return {
+            content: [
+              {
+                type: 'text',
+                text: `There is no result #${position} in this session's latest search. Pass the extension name instead.`
+              }
+            ]
+          };
+        }
+      } else {
+        const name = validateExtensionName(args?.name);
+        entry = await search.getExtensionDetailsEntry(name);
+        details = entry.data;
+        
+        if (!details) {
+          return {
+            content: [
+              {
+                type: 'text',
+                text: `Extension "${name}" not found in the Directus marketplace.`
+              }
+            ]
+          };
+        }
+      }
       
-      if (!details) {
+      if (outputOptions.output === 'json') {
+        const serialize = (data: DirectusExtension) => JSON.stringify(projectExtension(data, outputOptions.fields));
         return {
           content: [
             {
               type: 'text',
-              text: `Extension "${name}" not found in the Directus marketplace.`
+              text: entry ? serializeProjection(entry, outputOptions.fields.join(','), serialize) : serialize(details)
             }
           ]
         };
@@ -631,12 +724,27 @@ export class SimpleMCPServer {
         response += `Updated: ${new Date(details.date).toLocaleDateString()}\n`;
       }
       
+      if (details.downloads) {
+        response += `Downloads: ${details.downloads.monthly.toLocaleString()} in the last month\n`;
+      }
+      
+      if (details.extension?.type) {
+        response += `Type: ${details.extension.type}\n`;
+      }
+      
+      if (details.extension?.host) {
+        response += `Compatible with: Directus ${details.extension.host}\n`;
+      }
+      
+      if (details.extension) {
+        response += `Sandboxed: ${details.extension.sandbox ? 'yes' : 'no'}\n`;
+      }
+      
       response += `\n`;
       
       // Links section
       if (details.links?.repository) {
-        const repoUrl = details.links.repository.replace('git+', '').replace('.git', '');
-        response += `[View on GitHub](${repoUrl})\n`;
+        response += `[View on GitHub](${cleanRepositoryUrl(details.links.repository)})\n`;
       }
       if (details.links?.npm) {
         response += `[View on NPM](${details.links.npm})\n`;
@@ -651,6 +759,9 @@ export class SimpleMCPServer {
         ]
       };
     } catch (error) {
+      if (error instanceof SessionRejectedError) {
+        throw error;
+      }
       throw {
         code: -32603,
         message: `Failed to get extension details: ${error instanceof Error ? error.message : 'Unknown error'}`
@@ -658,42 +769,119 @@ export class SimpleMCPServer {
     }
   }
 
-  private async handleGetExtensionCategories(): Promise<{ content: any[] }> {
+  private async handleFindSimilarExtensions(args: any): Promise<{ content: any[] }> {
     try {
-      const categories = [
-        { name: 'interfaces', description: 'Custom field interfaces for data input' },
-        { name: 'displays', description: 'Custom field displays for data presentation' },
-        { name: 'layouts', description: 'Custom collection layout views' },
-        { name: 'panels', description: 'Dashboard panels and widgets' },
-        { name: 'modules', description: 'Full-page application modules' },
-        { name: 'hooks', description: 'Server-side event hooks' },
-        { name: 'endpoints', description: 'Custom API endpoints' },
-        { name: 'operations', description: 'Flow operation nodes' },
-        { name: 'themes', description: 'Custom themes and styling' }
-      ];
-      
-      // Simple categories format
-      let response = "Here are the types of Directus extensions you can search for:\n\n";
-      
-      categories.forEach((category) => {
-        response += `**${category.name}** - ${category.description}\n`;
-      });
-      
-      response += `\nJust tell me what kind of functionality you're looking for and I'll search for extensions!`;
-      
+      const name = validateExtensionName(args?.name);
+      const limit = validateSimilarLimit(args?.limit);
+      const outputOptions = validateOutputOptions(args);
+      const index = await this.services.similarity();
+      const similar = await index.findSimilar(name, limit);
+
+      if (outputOptions.output === 'json') {
+        const results = (similar ?? []).map(({ extension, similarity }) => ({
+          ...projectExtension(extension, outputOptions.fields),
+          similarity: Math.round(similarity * 100) / 100
+        }));
+        return {
+          content: [
+            {
+              type: 'text',
+              text: JSON.stringify({ name, found: similar !== null, results })
+            }
+          ]
+        };
+      }
+
+      if (!similar) {
+        return {
+          content: [
+            {
+              type: 'text',
+              text: `Extension "${name}" isn't in the extension catalog yet, so I can't look up similar ones. Try search_extensions with a few words describing what it does.`
+            }
+          ]
+        };
+      }
+
+      if (similar.length === 0) {
+        return {
+          content: [
+            {
+              type: 'text',
+              text: `I couldn't find any extensions similar to "${name}".`
+            }
+          ]
+        };
+      }
+
+      let response = `Here are ${similar.length} extensions similar to "${name}":\n\n`;
+      for (const { extension, similarity } of similar) {
+        response += `**${extension.name}** (${Math.round(similarity * 100)}% similar)\n`;
+        response += `${truncateDescription(extension.description)}\n`;
+        response += extension.links?.repository
+          ? `[View on GitHub](${cleanRepositoryUrl(extension.links.repository)})\n\n`
+          : `[View on NPM](${extension.links.npm})\n\n`;
+      }
+
       return {
         content: [
           {
             type: 'text',
-            text: response
+            text: response.trim()
           }
         ]
       };
     } catch (error) {
       throw {
         code: -32603,
-        message: `Failed to get categories: ${error instanceof Error ? error.message : 'Unknown error'}`
+        message: `Failed to find similar extensions: ${error instanceof Error ? error.message : 'Unknown error'}`
       };
     }
   }
-}
\ No newline at end of file
+}
+
+function describeFilters(params: SearchParams): string {
+  const filters: string[] = [];
+  if (params.compatibleWith) {
+    filters.push(`compatible with Directus ${params.compatibleWith}`);
+  }
+  if (params.sandbox !== undefined) {
+    filters.push(params.sandbox ? 'sandboxed' : 'not sandboxed');
+  }
+  if (params.license) {
+    filters.push(`licensed ${params.license}`);
+  }
+  if (params.publisher) {
+    filters.push(`published by ${params.publisher}`);
+  }
+  if (params.readme) {
+    filters.push('matched in READMEs');
+  }
+  return filters.length > 0 ? ` (${filters.join(', ')})` : '';
+}
+
+const FACET_LABELS: Record<FacetName, string> = {
+  type: 'Type',
+  sandbox: 'Sandboxed',
+  license: 'License',
+  host_major: 'Directus version',
+  publisher: 'Publisher'
+};
+
+/**
+ * "Refine by" summary of facet counts, e.g. "Type: 12 interface, 4 display"
+ */
+function describeFacets(facets: FacetCounts): string {
+  const lines = (Object.keys(FACET_LABELS) as FacetName[])
+    .filter(name => facets[name] && Object.keys(facets[name]!).length > 0)
+    .map(name => {
+      const values = Object.entries(facets[name]!).map(([value, count]) => {
+        if (name === 'sandbox') {
+          return `${count} ${value === 'true' ? 'yes' : 'no'}`;
+        }
+        return `${count} ${name === 'host_major' ? `v${value}` : value}`;
+      });
+      return `- ${FACET_LABELS[name]}: ${values.join(', ')}`;
+    });
+  return lines.length > 0 ? `**Refine by:**\n${lines.join('\n')}\n\n` : '';
+}
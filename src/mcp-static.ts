@@ -0,0 +1,264 @@
+/**
+ * Static MCP payloads
+ * Tool definitions, server info and the category list never change at
+ * runtime, so their JSON-RPC results are serialized once at module load
+ */
+
+import { EXTENSION_FIELDS } from './utils/projection.js';
+
+export interface McpServerInfo {
+  name: string;
+  version: string;
+  protocolVersion: string;
+  supportedProtocolVersions?: string[];
+  capabilities: {
+    tools?: {
+      listChanged?: boolean;
+    };
+    resources?: {
+      subscribe?: boolean;
+      listChanged?: boolean;
+    };
+    prompts?: {
+      listChanged?: boolean;
+    };
+    logging?: {};
+  };
+}
+
+export const SUPPORTED_PROTOCOL_VERSIONS = ['2024-11-05', '2025-06-18'];
+// Older version for compatibility when the client asks for one we don't speak
+export const DEFAULT_PROTOCOL_VERSION = '2024-11-05';
+
+export const SERVER_INFO: McpServerInfo = {
+  name: 'directus-marketplace-search',
+  version: '1.0.0',
+  protocolVersion: DEFAULT_PROTOCOL_VERSION, // Default, but negotiated during initialize
+  supportedProtocolVersions: SUPPORTED_PROTOCOL_VERSIONS,
+  capabilities: {
+    tools: {
+      listChanged: true
+    }
+  }
+};
+
+const OUTPUT_SCHEMA = {
+  type: 'string',
+  enum: ['markdown', 'json'],
+  default: 'markdown',
+  description: 'Response format: conversational Markdown, or compact JSON for programmatic use'
+};
+
+const FIELDS_SCHEMA = {
+  type: 'array',
+  items: {
+    type: 'string',
+    enum: EXTENSION_FIELDS
+  },
+  description: 'Fields to include in JSON output (default: name, version, description, downloads, repository, npm)'
+};
+
+export const TOOL_DEFINITIONS = [
+  {
+    name: 'search_extensions',
+    description: 'Search Directus marketplace extensions by query, category, and other filters. Returns a simple list with extension names, descriptions, popularity indicators, and GitHub/NPM links.',
+    inputSchema: {
+      type: 'object',
+      properties: {
+        query: {
+          type: 'string',
+          description: 'Search query for extension name, description, or keywords',
+          minLength: 1,
+          maxLength: 100
+        },
+        category: {
+          type: 'string',
+          enum: ['interfaces', 'displays', 'layouts', 'panels', 'modules', 'hooks', 'endpoints', 'operations', 'themes'],
+          description: 'Filter by extension category'
+        },
+        limit: {
+          type: 'number',
+          minimum: 1,
+          maximum: 50,
+          default: 10,
+          description: 'Maximum number of results to return'
+        },
+        offset: {
+          type: 'number',
+          minimum: 0,
+          default: 0,
+          description: 'Number of results to skip for pagination'
+        },
+        sort: {
+          type: 'string',
+          enum: ['relevance', 'downloads', 'updated', 'created'],
+          default: 'relevance',
+          description: 'Sort order for results'
+        },
+        compatible_with: {
+          type: 'string',
+          description: 'Only return extensions whose declared Directus host range accepts this version (e.g. "11" or "10.8.3")'
+        },
+        sandbox: {
+          type: 'boolean',
+          description: 'Only return extensions that run in the Directus sandbox (true) or outside it (false)'
+        },
+        license: {
+          type: 'string',
+          description: 'Only return extensions under this license (e.g. "MIT")'
+        },
+        publisher: {
+          type: 'string',
+          description: 'Only return extensions published by this npm user'
+        },
+        facets: {
+          type: 'boolean',
+          default: false,
+          description: 'Also return match counts by type, sandbox, license, Directus major version and publisher, to narrow the search in one step'
+        },
+        readme: {
+          type: 'boolean',
+          default: false,
+          description: 'Search inside extension READMEs (e.g. "S3 presigned URLs") instead of names, descriptions and keywords; results include a highlighted excerpt'
+        },
+        output: OUTPUT_SCHEMA,
+        fields: FIELDS_SCHEMA,
+        cursor: {
+          type: 'string',
+          description: 'Continuation token from a previous response that was cut to fit the size budget'
+        }
+      },
+      required: ['query']
+    }
+  },
+  {
+    name: 'get_extension_details',
+    description: 'Get detailed information about a specific Directus extension including name, version, description, author, and links to GitHub/NPM. Pass the package name, or in a session the number of a result from the latest search.',
+    inputSchema: {
+      type: 'object',
+      properties: {
+        name: {
+          type: 'string',
+          description: 'Extension package name (e.g., directus-extension-display-link)',
+          minLength: 1
+        },
+        result: {
+          type: 'number',
+          minimum: 1,
+          description: 'Number of a result in this session\'s latest search (e.g., 3 for the third result), instead of name'
+        },
+        output: OUTPUT_SCHEMA,
+        fields: FIELDS_SCHEMA
+      }
+    }
+  },
+  {
+    name: 'find_similar_extensions',
+    description: 'Find Directus extensions similar to a given one (alternatives or companions), based on shared keywords, description phrases and dependencies. Answered from a precomputed index of the extension catalog.',
+    inputSchema: {
+      type: 'object',
+      properties: {
+        name: {
+          type: 'string',
+          description: 'Package name of the extension to find alternatives for (e.g., directus-extension-display-link)',
+          minLength: 1
+        },
+        limit: {
+          type: 'number',
+          minimum: 1,
+          maximum: 20,
+          default: 5,
+          description: 'Maximum number of similar extensions to return'
+        },
+        output: OUTPUT_SCHEMA,
+        fields: FIELDS_SCHEMA
+      },
+      required: ['name']
+    }
+  },
+  {
+    name: 'get_extension_categories',
+    description: 'Get a simple list of all available Directus extension categories with brief descriptions.',
+    inputSchema: {
+      type: 'object',
+      properties: {}
+    }
+  }
+];
+
+export const TOOL_NAMES = TOOL_DEFINITIONS.map(tool => tool.name);
+
+const EXTENSION_CATEGORIES = [
+  { name: 'interfaces', description: 'Custom field interfaces for data input' },
+  { name: 'displays', description: 'Custom field displays for data presentation' },
+  { name: 'layouts', description: 'Custom collection layout views' },
+  { name: 'panels', description: 'Dashboard panels and widgets' },
+  { name: 'modules', description: 'Full-page application modules' },
+  { name: 'hooks', description: 'Server-side event hooks' },
+  { name: 'endpoints', description: 'Custom API endpoints' },
+  { name: 'operations', description: 'Flow operation nodes' },
+  { name: 'themes', description: 'Custom themes and styling' }
+];
+
+export const TOOLS_LIST_RESULT = { tools: TOOL_DEFINITIONS };
+
+export const CATEGORIES_RESULT = {
+  content: [
+    {
+      type: 'text',
+      text: "Here are the types of Directus extensions you can search for:\n\n" +
+        EXTENSION_CATEGORIES.map(category => `**${category.name}** - ${category.description}\n`).join('') +
+        `\nJust tell me what kind of functionality you're looking for and I'll search for extensions!`
+    }
+  ]
+};
+
+/**
+ * Pick the protocol version to answer initialize with
+ */
+export function negotiateProtocolVersion(requested: unknown): string {
+  return typeof requested === 'string' && SUPPORTED_PROTOCOL_VERSIONS.includes(requested)
+    ? requested
+    : DEFAULT_PROTOCOL_VERSION;
+}
+
+export function initializeResult(protocolVersion: string) {
+  return {
+    protocolVersion,
+    capabilities: SERVER_INFO.capabilities,
+    serverInfo: {
+      ...SERVER_INFO,
+      protocolVersion
+    }
+  };
+}
+
+const encoder = new TextEncoder();
+
+export const TOOLS_LIST_BYTES = encoder.encode(JSON.stringify(TOOLS_LIST_RESULT));
+export const CATEGORIES_BYTES = encoder.encode(JSON.stringify(CATEGORIES_RESULT));
+export const INITIALIZE_BYTES = new Map(
+  SUPPORTED_PROTOCOL_VERSIONS.map(version => [version, encoder.encode(JSON.stringify(initializeResult(version)))])
+);
+
+const RESPONSE_PREFIX = encoder.encode('{"jsonrpc":"2.0","id":');
+const RESULT_INFIX = encoder.encode(',"result":');
+const RESPONSE_SUFFIX = encoder.encode('}');
+
+/**
+ * Wrap a pre-serialized result in a JSON-RPC response for the given id.
+ * Only the id is serialized per call; the result bytes are copied as-is.
+ */
+export function encodeJsonRpcResult(id: string | number, result: Uint8Array): Uint8Array {
+  const idBytes = encoder.encode(JSON.stringify(id));
+  const body = new Uint8Array(
+    RESPONSE_PREFIX.byteLength + idBytes.byteLength + RESULT_INFIX.byteLength + result.byteLength + RESPONSE_SUFFIX.byteLength
+  );
+
+  let offset = 0;
+  for (const part of [RESPONSE_PREFIX, idBytes, RESULT_INFIX, result, RESPONSE_SUFFIX]) {
+    body.set(part, offset);
+    offset += part.byteLength;
+  }
+  return body;
+}
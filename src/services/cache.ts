@@ -3,7 +3,19 @@
  * Provides efficient caching for API responses
  */
 
-import type { CacheEntry } from '../types/directus.js';
+import type { CacheEntry, UpstreamValidators } from '../types/directus.js';
+import { MetricsService } from './metrics.js';
+
+export interface CacheSetOptions {
+  validators?: UpstreamValidators;
+  // Keep the entry in KV this long past its TTL so it can be revalidated
+  staleTtlSeconds?: number;
+}
+
+export interface CacheLookup<T> {
+  entry: CacheEntry<T>;
+  fresh: boolean;
+}
 
 export class CacheService {
   constructor(private kv: KVNamespace) {}
@@ -12,6 +24,7 @@ export class CacheService {
     try {
       const cached = await this.kv.get(key);
       if (!cached) {
+        MetricsService.recordCacheLookup('kv', false);
         return null;
       }
 
@@ -20,10 +33,12 @@ export class CacheService {
       // Check if cache entry is expired
       if (Date.now() - entry.timestamp > entry.ttl * 1000) {
         // Entry is expired, delete it and return null
+        MetricsService.recordCacheLookup('kv', false);
         await this.kv.delete(key);
         return null;
       }
 
+      MetricsService.recordCacheLookup('kv', true);
       return entry.data;
     } catch (error) {
       console.error('Cache get error:', error);
@@ -31,16 +46,39 @@ export class CacheService {
     }
   }
 
-  async set<T>(key: string, data: T, ttlSeconds: number = 3600): Promise<void> {
+  /**
+   * Get the raw entry, including expired ones still retained for revalidation
+   */
+  async getEntry<T>(key: string): Promise<CacheLookup<T> | null> {
+    try {
+      const cached = await this.kv.get(key);
+      if (!cached) {
+        MetricsService.recordCacheLookup('kv', false);
+        return null;
+      }
+
+      const entry: CacheEntry<T> = JSON.parse(cached);
+      const fresh = Date.now() - entry.timestamp <= entry.ttl * 1000;
+      MetricsService.recordCacheLookup('kv', fresh);
+      
+      return { entry, fresh };
+    } catch (error) {
+      console.error('Cache get error:', error);
+      return null;
+    }
+  }
+
+  async set<T>(key: string, data: T, ttlSeconds: number = 3600, options: CacheSetOptions = {}): Promise<void> {
     try {
       const entry: CacheEntry<T> = {
         data,
         timestamp: Date.now(),
-        ttl: ttlSeconds
+        ttl: ttlSeconds,
+        validators: options.validators
       };
 
       await this.kv.put(key, JSON.stringify(entry), {
-        expirationTtl: ttlSeconds
+        expirationTtl: ttlSeconds + (options.staleTtlSeconds || 0)
       });
     } catch (error) {
       console.error('Cache set error:', error);
@@ -0,0 +1,347 @@
+/**
+ * Catalog Index Service
+ * Precomputed lookup structures over the stored catalog, so filters that
+ * npm search can't express (host compatibility, sandboxing, license,
+ * publisher) and facet counts are answered without fetching packuments.
+ * Each facet value maps to a bitmap of catalog positions: filters are
+ * bitmap intersections and facet counts are popcounts. Rebuilt only when
+ * the catalog changes.
+ */
+
+import type { Env } from '../types/worker.js';
+import type {
+  DirectusExtension,
+  ExtensionCategory,
+  FacetCounts,
+  FacetName,
+  SearchParams
+} from '../types/directus.js';
+import { CatalogService, type CatalogDocument } from './catalog.js';
+import { normalizeQuery } from './edge-cache.js';
+import { Bitmap } from '../utils/bitmap.js';
+import { parseRange, rangesOverlap, type VersionInterval } from '../utils/semver.js';
+
+export interface IndexedExtension {
+  extension: DirectusExtension;
+  name: string;
+  keywords: string;
+  description: string;
+  // Parsed host range; null when the package declares none (or an unparseable one)
+  hostRanges: VersionInterval[] | null;
+}
+
+export interface CatalogIndex {
+  revision: number;
+  updatedAt: string;
+  entries: IndexedExtension[];
+  facets: Record<FacetName, Map<string, Bitmap>>;
+  // Majors that have a host_major bucket; others are checked range by range
+  hostMajors: Set<string>;
+}
+
+export interface CatalogMatch {
+  entry: IndexedExtension;
+  score: number;
+}
+
+export interface CatalogQueryResult {
+  matches: CatalogMatch[];
+  facets?: FacetCounts;
+}
+
+const FACET_NAMES: FacetName[] = ['type', 'sandbox', 'license', 'host_major', 'publisher'];
+
+// Values reported per facet; long tails (publishers, licenses) are cut off
+const FACET_VALUE_LIMIT = 10;
+
+// Search categories are plural; manifest types are singular
+const CATEGORY_TYPES: Record<ExtensionCategory, string> = {
+  interfaces: 'interface',
+  displays: 'display',
+  layouts: 'layout',
+  panels: 'panel',
+  modules: 'module',
+  hooks: 'hook',
+  endpoints: 'endpoint',
+  operations: 'operation',
+  themes: 'theme'
+};
+
+const EXTENSION_TYPES = new Set([...Object.values(CATEGORY_TYPES), 'bundle']);
+
+// "11", "11.x" and "11.*" name a whole major and can use the host_major facet
+const MAJOR_ONLY = /^(\d+)(\.[x*])?$/;
+
+// Cap on host_major buckets, counting back from the newest major seen
+const MAX_HOST_MAJORS = 20;
+
+export class CatalogIndexService {
+  // Isolate-local index for the catalog revision it was built from
+  private static memo: CatalogIndex | null = null;
+  private catalog: CatalogService;
+
+  constructor(private env: Env) {
+    this.catalog = new CatalogService(env);
+  }
+
+  async load(): Promise<CatalogIndex> {
+    const document = await this.catalog.load();
+    const memo = CatalogIndexService.memo;
+    if (memo && memo.revision === document.revision && memo.updatedAt === document.updatedAt) {
+      return memo;
+    }
+
+    CatalogIndexService.memo = buildIndex(document);
+    return CatalogIndexService.memo;
+  }
+
+  /**
+   * Every catalog entry matching the query and filters, best first, plus
+   * facet counts when requested. Sorting by downloads is left to the
+   * caller, which owns download counts.
+   */
+  async query(params: SearchParams): Promise<CatalogQueryResult> {
+    const index = await this.load();
+    if (index.entries.length === 0) {
+      throw new Error('Catalog filters need the extension catalog, which has not been imported yet');
+    }
+
+    const terms = normalizeQuery(params.query).split(' ').filter(Boolean);
+    const scores = new Uint32Array(index.entries.length);
+    const textMatches: number[] = [];
+    index.entries.forEach((entry, position) => {
+      scores[position] = scoreEntry(entry, terms);
+      if (scores[position] > 0) {
+        textMatches.push(position);
+      }
+    });
+    const text = Bitmap.fromIndices(textMatches, index.entries.length);
+
+    const filters = facetFilters(index, params);
+    let matched = text;
+    for (const filter of filters.values()) {
+      matched = matched.and(filter);
+    }
+
+    const matches = matched.toArray().map(position => ({ entry: index.entries[position], score: scores[position] }));
+    if (params.sort === 'updated' || params.sort === 'created') {
+      matches.sort((a, b) => b.entry.extension.date.localeCompare(a.entry.extension.date));
+    } else {
+      matches.sort((a, b) => b.score - a.score || a.entry.name.localeCompare(b.entry.name));
+    }
+
+    return {
+      matches,
+      facets: params.facets ? countFacets(index, text, filters) : undefined
+    };
+  }
+
+  /**
+   * Names of the catalog entries passing the filters in params, ignoring
+   * the text query; null when no filter is set
+   */
+  async filterNames(params: SearchParams): Promise<Set<string> | null> {
+    const index = await this.load();
+    const filters = facetFilters(index, params);
+    if (filters.size === 0) {
+      return null;
+    }
+
+    let matched = Bitmap.full(index.entries.length);
+    for (const filter of filters.values()) {
+      matched = matched.and(filter);
+    }
+    return new Set(matched.toArray().map(position => index.entries[position].extension.name));
+  }
+}
+
+function buildIndex(document: CatalogDocument): CatalogIndex {
+  const entries: IndexedExtension[] = Object.values(document.entries).map(extension => ({
+    extension,
+    name: extension.name.toLowerCase(),
+    keywords: extension.keywords.join(' ').toLowerCase(),
+    description: extension.description.toLowerCase(),
+    hostRanges: extension.extension?.host ? parseRange(extension.extension.host) : null
+  }));
+
+  // Collect positions per facet value, then freeze them into bitmaps
+  const positions = Object.fromEntries(FACET_NAMES.map(name => [name, new Map<string, number[]>()])) as
+    Record<FacetName, Map<string, number[]>>;
+  const add = (facet: FacetName, value: string | null | undefined, position: number) => {
+    if (!value) {
+      return;
+    }
+    const list = positions[facet].get(value);
+    if (list) {
+      list.push(position);
+    } else {
+      positions[facet].set(value, [position]);
+    }
+  };
+
+  const majors = hostMajors(entries);
+  entries.forEach((entry, position) => {
+    const { extension } = entry;
+    add('type', extensionType(extension), position);
+    // Directus only sandboxes extensions that opt in
+    add('sandbox', String(extension.extension?.sandbox === true), position);
+    add('license', extension.license?.trim(), position);
+    add('publisher', extension.publisher?.username, position);
+    for (const [major, range] of majors) {
+      if (entry.hostRanges && rangesOverlap(entry.hostRanges, range)) {
+        add('host_major', major, position);
+      }
+    }
+  });
+
+  const facets = {} as Record<FacetName, Map<string, Bitmap>>;
+  for (const name of FACET_NAMES) {
+    facets[name] = new Map(
+      [...positions[name]].map(([value, list]) => [value, Bitmap.fromIndices(list, entries.length)])
+    );
+  }
+
+  return { revision: document.revision, updatedAt: document.updatedAt, entries, facets, hostMajors: new Set(majors.keys()) };
+}
+
+/**
+ * The Directus majors worth a host_major bucket: every major that starts
+ * or ends a declared host range, and the ones in between
+ */
+function hostMajors(entries: IndexedExtension[]): Map<string, VersionInterval[]> {
+  let lowest = Infinity;
+  let highest = -Infinity;
+  for (const { hostRanges } of entries) {
+    for (const interval of hostRanges ?? []) {
+      for (const bound of [interval.lower, interval.upper]) {
+        if (bound) {
+          lowest = Math.min(lowest, bound.version[0]);
+          highest = Math.max(highest, bound.version[0]);
+        }
+      }
+    }
+  }
+
+  const majors = new Map<string, VersionInterval[]>();
+  for (let major = Math.max(lowest, highest - MAX_HOST_MAJORS + 1); major <= highest; major++) {
+    majors.set(String(major), parseRange(String(major))!);
+  }
+  return majors;
+}
+
+/**
+ * Declared manifest type, falling back to the directus-custom-* keyword
+ * older extensions were tagged with
+ */
+function extensionType(extension: DirectusExtension): string | null {
+  if (extension.extension?.type) {
+    return extension.extension.type;
+  }
+  for (const keyword of extension.keywords) {
+    const match = /^directus-custom-(\w+)$/.exec(keyword);
+    if (match && EXTENSION_TYPES.has(match[1])) {
+      return match[1];
+    }
+  }
+  return null;
+}
+
+/**
+ * One bitmap per active filter, keyed by the facet it narrows
+ */
+function facetFilters(index: CatalogIndex, params: SearchParams): Map<FacetName, Bitmap> {
+  const size = index.entries.length;
+  const empty = Bitmap.fromIndices([], size);
+  const filters = new Map<FacetName, Bitmap>();
+
+  if (params.category) {
+    filters.set('type', index.facets.type.get(CATEGORY_TYPES[params.category]) ?? empty);
+  }
+  if (params.sandbox !== undefined) {
+    filters.set('sandbox', index.facets.sandbox.get(String(params.sandbox)) ?? empty);
+  }
+  if (params.license) {
+    filters.set('license', lookupIgnoringCase(index.facets.license, params.license) ?? empty);
+  }
+  if (params.publisher) {
+    filters.set('publisher', lookupIgnoringCase(index.facets.publisher, params.publisher) ?? empty);
+  }
+  if (params.compatibleWith) {
+    const major = MAJOR_ONLY.exec(params.compatibleWith);
+    if (major && index.hostMajors.has(major[1])) {
+      filters.set('host_major', index.facets.host_major.get(major[1]) ?? empty);
+    } else {
+      // A specific version, or a major outside the bucketed ones (open
+      // ranges like ">=10" still accept it): check the parsed ranges directly
+      const wanted = parseRange(params.compatibleWith) ?? [];
+      const compatible: number[] = [];
+      index.entries.forEach((entry, position) => {
+        if (entry.hostRanges && rangesOverlap(entry.hostRanges, wanted)) {
+          compatible.push(position);
+        }
+      });
+      filters.set('host_major', Bitmap.fromIndices(compatible, size));
+    }
+  }
+
+  return filters;
+}
+
+/**
+ * Counts per facet value among the text matches. Each facet ignores its
+ * own filter, so the counts show what switching that filter would return.
+ */
+function countFacets(index: CatalogIndex, text: Bitmap, filters: Map<FacetName, Bitmap>): FacetCounts {
+  const counts: FacetCounts = {};
+
+  for (const name of FACET_NAMES) {
+    let base = text;
+    for (const [filterName, filter] of filters) {
+      if (filterName !== name) {
+        base = base.and(filter);
+      }
+    }
+
+    const values = [...index.facets[name]]
+      .map(([value, bitmap]) => [value, base.andCardinality(bitmap)] as const)
+      .filter(([, count]) => count > 0)
+      .sort((a, b) => b[1] - a[1] || a[0].localeCompare(b[0]))
+      .slice(0, FACET_VALUE_LIMIT);
+    counts[name] = Object.fromEntries(values);
+  }
+
+  return counts;
+}
+
+function lookupIgnoringCase(values: Map<string, Bitmap>, wanted: string): Bitmap | undefined {
+  const exact = values.get(wanted);
+  if (exact) {
+    return exact;
+  }
+  const lower = wanted.toLowerCase();
+  for (const [value, bitmap] of values) {
+    if (value.toLowerCase() === lower) {
+      return bitmap;
+    }
+  }
+  return undefined;
+}
+
+/**
+ * Every term must appear somewhere; name hits outweigh keyword hits,
+ * which outweigh description hits. Returns 0 for non-matches.
+ */
+function scoreEntry(entry: IndexedExtension, terms: string[]): number {
+  let score = 0;
+  for (const term of terms) {
+    const termScore =
+      (entry.name.includes(term) ? 10 : 0) +
+      (entry.keywords.includes(term) ? 5 : 0) +
+      (entry.description.includes(term) ? 1 : 0);
+    if (termScore === 0) {
+      return 0;
+    }
+    score += termScore;
+  }
+  return score;
+}
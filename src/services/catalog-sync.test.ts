@@ -0,0 +1,208 @@
+/**
+ * Catalog sync against an in-memory changes feed stand-in and KV
+ */
+
+import { beforeEach, describe, expect, it } from 'vitest';
+import type { Env } from '../types/worker.js';
+import { CatalogService } from './catalog.js';
+import { CatalogSyncService, type ChangesFeed, type ChangesFeedEntry, type ChangesFeedPage } from './catalog-sync.js';
+
+const CHECKPOINT_KEY = 'catalog:sync:checkpoint';
+
+class MemoryKV {
+  values = new Map<string, string>();
+
+  async get(key: string): Promise<string | null> {
+    return this.values.get(key) ?? null;
+  }
+
+  async put(key: string, value: string): Promise<void> {
+    this.values.set(key, value);
+  }
+
+  async delete(key: string): Promise<void> {
+    this.values.delete(key);
+  }
+}
+
+/**
+ * Changes feed over a fixed list of changes, numbered from 1. `failAt`
+ * makes the packument lookup for that name throw once, to interrupt a run.
+ */
+class FakeFeed implements ChangesFeed {
+  packuments = new Map<string, any>();
+  fetched: string[] = [];
+  failAt: string | null = null;
+
+  constructor(private entries: ChangesFeedEntry[], private head: string = '0') {}
+
+  async latestSequence(): Promise<string> {
+    return this.head;
+  }
+
+  async changes(since: string, limit: number): Promise<ChangesFeedPage> {
+    const results = this.entries.filter(entry => Number(entry.seq) > Number(since)).slice(0, limit);
+    return { results, last_seq: results.length > 0 ? results[results.length - 1].seq : since };
+  }
+
+  async packument(name: string): Promise<any | null> {
+    if (this.failAt === name) {
+      this.failAt = null;
+      throw new Error('registry unavailable');
+    }
+    this.fetched.push(name);
+    return this.packuments.get(name) ?? null;
+  }
+}
+
+function packument(name: string, keywords: string[] = ['directus-extension']): any {
+  return {
+    name,
+    'dist-tags': { latest: '1.0.0' },
+    maintainers: [{ name: 'ada', email: 'ada@example.com' }],
+    time: { '1.0.0': '2024-01-01T00:00:00.000Z' },
+    versions: { '1.0.0': { description: `${name} description`, keywords } }
+  };
+}
+
+function change(seq: number, id: string, deleted?: boolean): ChangesFeedEntry {
+  return deleted ? { seq, id, deleted } : { seq, id };
+}
+
+describe('CatalogSyncService', () => {
+  let kv: MemoryKV;
+  let env: Env;
+
+  beforeEach(() => {
+    kv = new MemoryKV();
+    env = { CACHE: kv as unknown as KVNamespace, ENVIRONMENT: 'test' };
+    // Checkpoints and catalog come from this test's KV only
+    kv.values.set(CHECKPOINT_KEY, JSON.stringify({ seq: '0', updatedAt: '' }));
+  });
+
+  async function entries(): Promise<string[]> {
+    return Object.keys((await new CatalogService(env).load({ fresh: true })).entries).sort();
+  }
+
+  it('upserts changed extensions and skips other packages', async () => {
+    const feed = new FakeFeed([
+      change(1, 'directus-extension-map'),
+      change(2, 'left-pad'),
+      change(3, 'directus-utils')
+    ]);
+    feed.packuments.set('directus-extension-map', packument('directus-extension-map'));
+    feed.packuments.set('directus-utils', packument('directus-utils', ['utility']));
+
+    const result = await new CatalogSyncService(env, feed).sync({ maxPackumentFetches: 10 });
+
+    expect(await entries()).toEqual(['directus-extension-map']);
+    // Names without "directus" are never fetched without include_docs
+    expect(feed.fetched).toEqual(['directus-extension-map', 'directus-utils']);
+    expect(result).toMatchObject({ upserts: 1, deletes: 0, processedChanges: 3, caughtUp: true, seq: '3' });
+  });
+
+  it('checks every doc when the feed includes them', async () => {
+    const feed = new FakeFeed([
+      { seq: 1, id: 'map-interface', doc: packument('map-interface', ['directus-custom-interface']) },
+      { seq: 2, id: 'left-pad', doc: packument('left-pad', ['string']) }
+    ]);
+
+    await new CatalogSyncService(env, feed).sync();
+
+    expect(await entries()).toEqual(['map-interface']);
+    expect(feed.fetched).toEqual([]);
+  });
+
+  it('deletes removed and untagged extensions', async () => {
+    const feed = new FakeFeed([
+      { seq: 1, id: 'directus-extension-a', doc: packument('directus-extension-a') },
+      { seq: 2, id: 'acme-map', doc: packument('acme-map') }
+    ]);
+    await new CatalogSyncService(env, feed).sync();
+    expect(await entries()).toEqual(['acme-map', 'directus-extension-a']);
+
+    const next = new FakeFeed([
+      change(3, 'directus-extension-a', true),
+      // Tracked, so fetched despite its name, and no longer tagged as an extension
+      change(4, 'acme-map')
+    ]);
+    next.packuments.set('acme-map', packument('acme-map', ['maps']));
+    const result = await new CatalogSyncService(env, next).sync();
+
+    expect(await entries()).toEqual([]);
+    expect(next.fetched).toEqual(['acme-map']);
+    expect(result).toMatchObject({ since: '2', deletes: 2 });
+  });
+
+  it('persists the checkpoint after each batch', async () => {
+    const names = ['a', 'b', 'c', 'd', 'e'].map(letter => `directus-extension-${letter}`);
+    const feed = new FakeFeed(names.map((name, i) => change(i + 1, name)));
+    names.forEach(name => feed.packuments.set(name, packument(name)));
+
+    const result = await new CatalogSyncService(env, feed).sync({ batchSize: 2 });
+
+    expect(result.batches).toBe(3);
+    expect(JSON.parse(kv.values.get(CHECKPOINT_KEY)!).seq).toBe('5');
+
+    // Nothing new: the next run starts at the checkpoint and fetches nothing
+    feed.fetched = [];
+    const again = await new CatalogSyncService(env, feed).sync({ batchSize: 2 });
+    expect(again).toMatchObject({ since: '5', processedChanges: 0, caughtUp: true });
+    expect(feed.fetched).toEqual([]);
+  });
+
+  it('resumes an interrupted batch from the last checkpoint', async () => {
+    const names = ['a', 'b', 'c', 'd'].map(letter => `directus-extension-${letter}`);
+    const feed = new FakeFeed(names.map((name, i) => change(i + 1, name)));
+    names.forEach(name => feed.packuments.set(name, packument(name)));
+    feed.failAt = 'directus-extension-d';
+
+    await expect(new CatalogSyncService(env, feed).sync({ batchSize: 2 })).rejects.toThrow('registry unavailable');
+    // The first batch was saved; the failed one left the checkpoint where it was
+    expect(JSON.parse(kv.values.get(CHECKPOINT_KEY)!).seq).toBe('2');
+    expect(await entries()).toEqual(names.slice(0, 2));
+
+    feed.fetched = [];
+    const result = await new CatalogSyncService(env, feed).sync({ batchSize: 2 });
+
+    expect(result).toMatchObject({ since: '2', seq: '4', caughtUp: true });
+    expect(feed.fetched).toEqual(names.slice(2));
+    expect(await entries()).toEqual(names);
+  });
+
+  it('stops where the packument budget runs out and resumes there', async () => {
+    const names = ['a', 'b', 'c'].map(letter => `directus-extension-${letter}`);
+    const feed = new FakeFeed(names.map((name, i) => change(i + 1, name)));
+    names.forEach(name => feed.packuments.set(name, packument(name)));
+
+    const first = await new CatalogSyncService(env, feed).sync({ maxPackumentFetches: 2 });
+    expect(first).toMatchObject({ seq: '2', upserts: 2, caughtUp: false });
+
+    const second = await new CatalogSyncService(env, feed).sync({ maxPackumentFetches: 2 });
+    expect(second).toMatchObject({ since: '2', seq: '3', upserts: 1, caughtUp: true });
+    expect(await entries()).toEqual(names);
+  });
+
+  it('re-fetches a catalog stored under an older schema', async () => {
+    const names = ['a', 'b', 'c'].map(letter => `directus-extension-${letter}`);
+    const stale = Object.fromEntries(names.map(name => [name, { name, version: '0.1.0' }]));
+    kv.values.set('catalog:entries', JSON.stringify({ schemaVersion: 1, revision: 4, updatedAt: '', entries: stale }));
+    const feed = new FakeFeed([]);
+    feed.packuments.set(names[0], packument(names[0]));
+    feed.packuments.set(names[1], packument(names[1]));
+
+    const first = await new CatalogSyncService(env, feed).sync({ maxPackumentFetches: 2 });
+    expect(first.upgraded).toBe(2);
+    let document = await new CatalogService(env).load({ fresh: true });
+    expect(document.entries[names[0]].version).toBe('1.0.0');
+    expect(document.outdated).toEqual([names[2]]);
+    expect(JSON.parse(kv.values.get('catalog:entries')!).schemaVersion).toBe(CatalogService.SCHEMA_VERSION);
+
+    // Unpublished since the old snapshot: dropped, and the upgrade is done
+    const second = await new CatalogSyncService(env, feed).sync({ maxPackumentFetches: 2 });
+    expect(second.upgraded).toBe(1);
+    document = await new CatalogService(env).load({ fresh: true });
+    expect(Object.keys(document.entries).sort()).toEqual(names.slice(0, 2));
+    expect(document.outdated).toBeUndefined();
+  });
+});
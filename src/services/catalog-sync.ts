@@ -0,0 +1,300 @@
+/**
+ * Catalog Sync Service
+ * Keeps the stored catalog current by following the npm replication
+ * changes feed from a persisted sequence checkpoint
+ */
+
+import type { Env } from '../types/worker.js';
+import type { DirectusExtension } from '../types/directus.js';
+import { CatalogService } from './catalog.js';
+import { UpstreamClient } from './upstream.js';
+import { SubrequestScheduler, scheduled } from './scheduler.js';
+import { isDirectusExtension, packumentToExtension } from '../utils/extensions.js';
+
+export interface ChangesFeedEntry {
+  seq: string | number;
+  id: string;
+  deleted?: boolean;
+  // Present when the feed is queried with include_docs (CouchDB-compatible mirrors)
+  doc?: any;
+}
+
+export interface ChangesFeedPage {
+  results: ChangesFeedEntry[];
+  last_seq: string | number;
+}
+
+export interface ChangesFeed {
+  latestSequence(): Promise<string>;
+  changes(since: string, limit: number): Promise<ChangesFeedPage>;
+  packument(name: string): Promise<any | null>;
+}
+
+export interface SyncOptions {
+  batchSize?: number;
+  maxBatches?: number;
+  // Cap on packument downloads per run; by default whatever the subrequest
+  // budget leaves after the changes feed pages, up to 40
+  maxPackumentFetches?: number;
+}
+
+export interface SyncResult {
+  since: string;
+  seq: string;
+  batches: number;
+  processedChanges: number;
+  upserts: number;
+  deletes: number;
+  // Entries from an older catalog schema re-fetched this run
+  upgraded: number;
+  caughtUp: boolean;
+}
+
+interface SyncCheckpoint {
+  seq: string;
+  updatedAt: string;
+}
+
+const USER_AGENT = 'directus-marketplace-search-mcp/1.0.0';
+const PACKUMENT_CONCURRENCY = 6;
+
+/**
+ * Changes feed backed by the npm replication API (or any CouchDB-style
+ * stand-in configured through NPM_REPLICATE_URL)
+ */
+export class NpmChangesFeed implements ChangesFeed {
+  constructor(
+    private replicateUrl: string,
+    private registry: UpstreamClient,
+    private includeDocs: boolean = false
+  ) {}
+
+  async latestSequence(): Promise<string> {
+    const data: any = await this.fetchJson(`${this.replicateUrl}/`);
+    return String(data.update_seq);
+  }
+
+  async changes(since: string, limit: number): Promise<ChangesFeedPage> {
+    const url = new URL(`${this.replicateUrl}/_changes`);
+    url.searchParams.set('since', since);
+    url.searchParams.set('limit', limit.toString());
+    if (this.includeDocs) {
+      url.searchParams.set('include_docs', 'true');
+    }
+    return await this.fetchJson(url.toString());
+  }
+
+  async packument(name: string): Promise<any | null> {
+    // Background work: no hedging, the extra subrequest isn't worth it here
+    const response = await this.registry.fetch(`/${encodeURIComponent(name)}`, { hedge: false, priority: 'normal' });
+
+    if (response.status === 404) {
+      return null;
+    }
+    if (!response.ok) {
+      throw new Error(`npm registry API error: ${response.status} ${response.statusText}`);
+    }
+    return await response.json();
+  }
+
+  private async fetchJson(url: string): Promise<any> {
+    const response = await scheduled('subrequest', 'critical', () => fetch(url, {
+      headers: { 'User-Agent': USER_AGENT, 'Accept': 'application/json' }
+    }));
+    if (!response.ok) {
+      throw new Error(`npm changes feed error: ${response.status} ${response.statusText}`);
+    }
+    return await response.json();
+  }
+}
+
+export class CatalogSyncService {
+  private static readonly CHECKPOINT_KEY = 'catalog:sync:checkpoint';
+  private catalog: CatalogService;
+  private feed: ChangesFeed;
+
+  constructor(private env: Env, feed?: ChangesFeed) {
+    this.catalog = new CatalogService(env);
+    this.feed = feed || new NpmChangesFeed(
+      env.NPM_REPLICATE_URL || 'https://replicate.npmjs.com/registry',
+      UpstreamClient.forRegistry(env),
+      env.NPM_CHANGES_INCLUDE_DOCS === 'true'
+    );
+  }
+
+  /**
+   * Process changes since the stored checkpoint. The catalog is written
+   * before the checkpoint advances, so an interrupted run replays at most
+   * one batch, and replaying upserts/deletes is harmless.
+   */
+  async sync(options: SyncOptions = {}): Promise<SyncResult> {
+    const batchSize = options.batchSize || 500;
+    const maxBatches = options.maxBatches || 10;
+    const available = SubrequestScheduler.current()?.available('subrequest', 'normal') ?? Infinity;
+    // Keep one subrequest per feed page, plus the head lookup on a first run
+    let fetchBudget = options.maxPackumentFetches ?? Math.max(0, Math.min(40, available - maxBatches - 1));
+
+    const checkpoint = await this.getCheckpoint();
+    // First run: start from the head of the feed; the existing catalog comes from a snapshot import
+    const since = checkpoint?.seq ?? await this.feed.latestSequence();
+    let seq = since;
+
+    const result: SyncResult = {
+      since,
+      seq,
+      batches: 0,
+      processedChanges: 0,
+      upserts: 0,
+      deletes: 0,
+      upgraded: 0,
+      caughtUp: false
+    };
+
+    while (result.batches < maxBatches) {
+      const page = await this.feed.changes(seq, batchSize);
+      const document = await this.catalog.load({ fresh: result.batches === 0 });
+      result.batches++;
+
+      // Decide what each change needs, stopping where the packument budget runs out
+      const resolved: Array<{ entry: ChangesFeedEntry; packument?: any }> = [];
+      const toFetch: ChangesFeedEntry[] = [];
+      let stoppedEarly = false;
+
+      for (const entry of page.results) {
+        // Without include_docs the feed carries no keywords, so only names
+        // containing "directus" and packages we already track are fetched.
+        // Keyword-only extensions with other names are left to the crawler
+        // snapshot; with include_docs, classifyChanges checks every doc.
+        const needsFetch = !entry.deleted && entry.doc === undefined &&
+          (entry.id.includes('directus') || entry.id in document.entries);
+        if (needsFetch) {
+          if (fetchBudget === 0) {
+            stoppedEarly = true;
+            break;
+          }
+          fetchBudget--;
+          toFetch.push(entry);
+        }
+        resolved.push({ entry });
+      }
+
+      const packuments = await this.fetchPackuments(toFetch.map(entry => entry.id));
+      for (const item of resolved) {
+        if (packuments.has(item.entry.id)) {
+          item.packument = packuments.get(item.entry.id);
+        }
+      }
+
+      const changes = this.classifyChanges(resolved, document.entries);
+      await this.catalog.applyChanges(changes);
+      result.upserts += changes.upserts.length;
+      result.deletes += changes.deletes.length;
+      result.processedChanges += resolved.length;
+
+      if (stoppedEarly) {
+        // Resume from the last change we fully handled
+        if (resolved.length > 0) {
+          seq = String(resolved[resolved.length - 1].entry.seq);
+          await this.saveCheckpoint(seq);
+        }
+        break;
+      }
+
+      seq = String(page.last_seq);
+      await this.saveCheckpoint(seq);
+
+      if (page.results.length < batchSize) {
+        result.caughtUp = true;
+        break;
+      }
+    }
+
+    result.seq = seq;
+
+    // Whatever budget the feed left goes to entries stored under an older schema
+    if (fetchBudget > 0) {
+      result.upgraded = await this.upgradeOutdated(fetchBudget);
+    }
+
+    return result;
+  }
+
+  /**
+   * Re-fetch up to `budget` entries the catalog marked outdated after a
+   * schema change, and store them in the current format (or drop them if
+   * they are gone or no longer extensions). Returns how many were handled.
+   */
+  private async upgradeOutdated(budget: number): Promise<number> {
+    // The feed loop just loaded the catalog, so the memo is current
+    const document = await this.catalog.load();
+    const names = (document.outdated ?? []).slice(0, budget);
+    if (names.length === 0) {
+      return 0;
+    }
+
+    const packuments = await this.fetchPackuments(names);
+    const resolved = names.map(name => ({ entry: { seq: 0, id: name }, packument: packuments.get(name) }));
+    const changes = this.classifyChanges(resolved, document.entries);
+    // Entries missing from the catalog still have to leave the outdated list
+    const untouched = names.filter(name =>
+      !changes.deletes.includes(name) && !changes.upserts.some(extension => extension.name === name)
+    );
+    await this.catalog.applyChanges({ upserts: changes.upserts, deletes: [...changes.deletes, ...untouched] });
+    return names.length;
+  }
+
+  async getCheckpoint(): Promise<SyncCheckpoint | null> {
+    const stored = await this.env.CACHE.get(CatalogSyncService.CHECKPOINT_KEY);
+    return stored ? JSON.parse(stored) : null;
+  }
+
+  private async saveCheckpoint(seq: string): Promise<void> {
+    const checkpoint: SyncCheckpoint = { seq, updatedAt: new Date().toISOString() };
+    await this.env.CACHE.put(CatalogSyncService.CHECKPOINT_KEY, JSON.stringify(checkpoint));
+  }
+
+  private classifyChanges(
+    resolved: Array<{ entry: ChangesFeedEntry; packument?: any }>,
+    known: Record<string, DirectusExtension>
+  ): { upserts: DirectusExtension[]; deletes: string[] } {
+    const upserts = new Map<string, DirectusExtension>();
+    const deletes = new Set<string>();
+
+    for (const { entry, packument } of resolved) {
+      const source = entry.doc ?? packument;
+      if (entry.deleted || source === null) {
+        deletes.add(entry.id);
+        upserts.delete(entry.id);
+        continue;
+      }
+      if (source === undefined) {
+        // Not a candidate: the name doesn't look like an extension and we don't track it
+        continue;
+      }
+
+      const extension = packumentToExtension(source);
+      if (extension && isDirectusExtension(extension)) {
+        upserts.set(extension.name, extension);
+        deletes.delete(extension.name);
+      } else if (entry.id in known) {
+        // Unpublished, or no longer tagged as a Directus extension
+        deletes.add(entry.id);
+        upserts.delete(entry.id);
+      }
+    }
+
+    return { upserts: [...upserts.values()], deletes: [...deletes] };
+  }
+
+  private async fetchPackuments(names: string[]): Promise<Map<string, any | null>> {
+    const packuments = new Map<string, any | null>();
+
+    for (let i = 0; i < names.length; i += PACKUMENT_CONCURRENCY) {
+      const chunk = names.slice(i, i + PACKUMENT_CONCURRENCY);
+      const results = await Promise.all(chunk.map(name => this.feed.packument(name)));
+      chunk.forEach((name, index) => packuments.set(name, results[index]));
+    }
+
+    return packuments;
+  }
+}
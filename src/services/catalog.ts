@@ -0,0 +1,127 @@
+/**
+ * Catalog Service
+ * Stores the full set of known Directus extensions as a single KV document
+ * so indexes can be built from one read
+ */
+
+import type { Env } from '../types/worker.js';
+import type { DirectusExtension } from '../types/directus.js';
+
+export interface CatalogDocument {
+  schemaVersion: number;
+  // Incremented on every write so derived indexes can tell when to rebuild
+  revision: number;
+  updatedAt: string;
+  entries: Record<string, DirectusExtension>;
+  // Entries stored under an older schema; catalog sync re-fetches them
+  outdated?: string[];
+}
+
+export interface CatalogChanges {
+  upserts: DirectusExtension[];
+  deletes: string[];
+}
+
+export class CatalogService {
+  // 2: entries carry "directus:extension" metadata (type, host, sandbox)
+  // 3: entries carry runtime dependency names
+  static readonly SCHEMA_VERSION = 3;
+  private static readonly CATALOG_KEY = 'catalog:entries';
+  private static readonly MEMO_TTL_MS = 60_000;
+
+  // Isolate-local copy so repeated index lookups don't re-read KV
+  private static memo: { document: CatalogDocument; loadedAt: number } | null = null;
+
+  constructor(private env: Env) {}
+
+  async load(options: { fresh?: boolean } = {}): Promise<CatalogDocument> {
+    const memo = CatalogService.memo;
+    if (!options.fresh && memo && Date.now() - memo.loadedAt < CatalogService.MEMO_TTL_MS) {
+      return memo.document;
+    }
+
+    const stored = await this.env.CACHE.get(CatalogService.CATALOG_KEY);
+    const document: CatalogDocument = stored ? JSON.parse(stored) : emptyCatalog();
+    migrate(document);
+    CatalogService.memo = { document, loadedAt: Date.now() };
+    return document;
+  }
+
+  async save(document: CatalogDocument): Promise<void> {
+    document.schemaVersion = CatalogService.SCHEMA_VERSION;
+    document.revision++;
+    document.updatedAt = new Date().toISOString();
+    await this.env.CACHE.put(CatalogService.CATALOG_KEY, JSON.stringify(document));
+    CatalogService.memo = { document, loadedAt: Date.now() };
+  }
+
+  /**
+   * Apply upserts and deletes and persist the catalog if anything changed.
+   * Returns the number of entries that actually changed. Every name passed
+   * in counts as re-fetched, so it leaves the outdated list either way.
+   */
+  async applyChanges(changes: CatalogChanges): Promise<number> {
+    const document = await this.load({ fresh: true });
+    let changed = 0;
+    let upgraded = 0;
+
+    if (document.outdated) {
+      const handled = new Set([...changes.upserts.map(extension => extension.name), ...changes.deletes]);
+      const remaining = document.outdated.filter(name => !handled.has(name));
+      upgraded = document.outdated.length - remaining.length;
+      if (remaining.length > 0) {
+        document.outdated = remaining;
+      } else {
+        delete document.outdated;
+      }
+    }
+
+    for (const extension of changes.upserts) {
+      const existing = document.entries[extension.name];
+      if (!existing || JSON.stringify(existing) !== JSON.stringify(extension)) {
+        document.entries[extension.name] = extension;
+        changed++;
+      }
+    }
+
+    for (const name of changes.deletes) {
+      if (document.entries[name]) {
+        delete document.entries[name];
+        changed++;
+      }
+    }
+
+    if (changed > 0 || upgraded > 0) {
+      await this.save(document);
+    }
+
+    return changed;
+  }
+}
+
+/**
+ * Bring a catalog stored under an older schema up to the current one. The
+ * missing fields only exist in the packuments, so every entry is marked
+ * outdated for catalog sync to re-fetch; until then those entries are
+ * served as stored and the fields added since are simply absent.
+ */
+function migrate(document: CatalogDocument): void {
+  const version = document.schemaVersion ?? 1;
+  if (version >= CatalogService.SCHEMA_VERSION) {
+    return;
+  }
+
+  const outdated = new Set([...(document.outdated ?? []), ...Object.keys(document.entries)]);
+  console.error(`Catalog schema ${version} is older than ${CatalogService.SCHEMA_VERSION}; re-fetching ${outdated.size} entries`);
+  document.outdated = [...outdated];
+  document.schemaVersion = CatalogService.SCHEMA_VERSION;
+}
+
+function emptyCatalog(): CatalogDocument {
+  return {
+    schemaVersion: CatalogService.SCHEMA_VERSION,
+    revision: 0,
+    updatedAt: new Date(0).toISOString(),
+    entries: {}
+  };
+}
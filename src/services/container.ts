@@ -0,0 +1,94 @@
+/**
+ * Service Container
+ * Keeps one instance of each service per isolate. Services are created on
+ * first use and rebuilt only when the runtime hands us a different env or origin.
+ */
+
+import type { Env } from '../types/worker.js';
+import type { DirectusSearchService } from './directus.js';
+import type { RateLimiterService } from './rate-limiter.js';
+import type { MonitoringService } from './monitoring.js';
+import type { SimilarityService } from './similarity.js';
+import { MetricsService } from './metrics.js';
+import { SessionService } from './sessions.js';
+
+export class ServiceContainer {
+  private static current: ServiceContainer | null = null;
+
+  private searchService?: DirectusSearchService;
+  private rateLimiterService?: RateLimiterService;
+  private monitoringService?: MonitoringService;
+  private similarityService?: SimilarityService;
+  private metricsService?: MetricsService;
+  private sessionService?: SessionService | null;
+
+  private constructor(readonly env: Env, readonly origin: string) {}
+
+  /**
+   * Get the container for this env and origin, reusing the isolate's
+   * existing one when both match
+   */
+  static for(env: Env, origin: string): ServiceContainer {
+    const current = ServiceContainer.current;
+    if (current && current.env === env && current.origin === origin) {
+      return current;
+    }
+    ServiceContainer.current = new ServiceContainer(env, origin);
+    return ServiceContainer.current;
+  }
+
+  // Search pulls in the catalog, README and download services, so it is
+  // loaded on first use too; /health, OPTIONS and the static MCP answers
+  // never need it
+  async search(): Promise<DirectusSearchService> {
+    if (!this.searchService) {
+      const { DirectusSearchService } = await import('./directus.js');
+      // Sharing the request origin lets tool calls read through the same edge cache as /api
+      this.searchService = new DirectusSearchService(this.env, this.origin);
+    }
+    return this.searchService;
+  }
+
+  // Rate limiting and monitoring are only needed for tool calls and admin
+  // routes, so their modules are loaded on first use rather than at startup
+
+  async rateLimiter(): Promise<RateLimiterService> {
+    if (!this.rateLimiterService) {
+      const { RateLimiterService } = await import('./rate-limiter.js');
+      this.rateLimiterService = new RateLimiterService(this.env);
+    }
+    return this.rateLimiterService;
+  }
+
+  async monitoring(): Promise<MonitoringService> {
+    if (!this.monitoringService) {
+      const { MonitoringService } = await import('./monitoring.js');
+      this.monitoringService = new MonitoringService(this.env);
+    }
+    return this.monitoringService;
+  }
+
+  // Only find_similar_extensions needs the similarity index
+  async similarity(): Promise<SimilarityService> {
+    if (!this.similarityService) {
+      const { SimilarityService } = await import('./similarity.js');
+      this.similarityService = new SimilarityService(this.env);
+    }
+    return this.similarityService;
+  }
+
+  // Null when no SESSIONS binding is configured
+  get sessions(): SessionService | null {
+    if (this.sessionService === undefined) {
+      this.sessionService = SessionService.forEnv(this.env);
+    }
+    return this.sessionService;
+  }
+
+  get metrics(): MetricsService {
+    if (!this.metricsService) {
+      this.metricsService = new MetricsService(this.env);
+    }
+    return this.metricsService;
+  }
+}
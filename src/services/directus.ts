@@ -8,31 +8,189 @@ import type {
   SearchParams, 
   NPMSearchResponse, 
   DirectusExtension,
-  ExtensionCategory 
+  ExtensionCategory,
+  UpstreamValidators
 } from '../types/directus.js';
 import { CacheService } from './cache.js';
+import { EdgeCacheService, normalizeQuery, type EdgeCacheEntry } from './edge-cache.js';
+import { MetricsService } from './metrics.js';
+import { DownloadStatsService } from './downloads.js';
+import { UpstreamClient } from './upstream.js';
+import { SubrequestScheduler } from './scheduler.js';
+import { CatalogIndexService } from './catalog-index.js';
+import { ReadmeIndexService } from './readme-index.js';
+import { isDirectusExtension, packumentToExtension } from '../utils/extensions.js';
+
+/**
+ * The package does not exist on npm
+ */
+export class NotFoundError extends Error {
+  constructor(message: string) {
+    super(message);
+    this.name = 'NotFoundError';
+  }
+}
+
+export interface EdgeLookupOptions {
+  // Set when the caller has already missed the edge cache for this URL
+  skipEdgeLookup?: boolean;
+}
 
 export class DirectusSearchService {
+  static readonly SEARCH_TTL_SECONDS = 300;
+  static readonly EXTENSION_TTL_SECONDS = 3600;
+  // Expired details stay in KV this long so refreshes can be conditional
+  static readonly EXTENSION_STALE_TTL_SECONDS = 7 * 24 * 60 * 60;
+  // Expired searches stay in KV this long so they can be served while npm is failing
+  static readonly SEARCH_STALE_TTL_SECONDS = 24 * 60 * 60;
+  // Edge TTL for stale data, so the edge retries npm soon
+  private static readonly STALE_EDGE_TTL_SECONDS = 60;
+  private static readonly SEARCH_DEADLINE_MS = 5000;
+  private static readonly DETAILS_DEADLINE_MS = 8000;
+  // Catalog matches re-ranked by downloads when sorting by popularity
+  private static readonly DOWNLOAD_SORT_CANDIDATES = 100;
+
   private cacheService: CacheService;
-  private readonly NPM_REGISTRY_BASE = 'https://registry.npmjs.org';
-  private readonly NPM_SEARCH_BASE = 'https://registry.npmjs.org/-/v1/search';
+  private edgeCache: EdgeCacheService;
+  private downloadStats: DownloadStatsService;
+  private upstream: UpstreamClient;
+  private catalogIndex: CatalogIndexService;
+  private readmeIndex: ReadmeIndexService;
+  private readonly NPM_SEARCH_PATH = '/-/v1/search';
 
-  constructor(private env: Env) {
+  constructor(private env: Env, origin: string) {
     this.cacheService = new CacheService(env.CACHE);
+    this.edgeCache = new EdgeCacheService(origin);
+    this.downloadStats = new DownloadStatsService(env);
+    this.upstream = UpstreamClient.forRegistry(env);
+    this.catalogIndex = new CatalogIndexService(env);
+    this.readmeIndex = new ReadmeIndexService(env);
+  }
+
+  get edge(): EdgeCacheService {
+    return this.edgeCache;
   }
 
   async searchExtensions(params: SearchParams): Promise<NPMSearchResponse> {
+    return (await this.searchExtensionsEntry(params)).data;
+  }
+
+  /**
+   * Search through the edge cache, then KV, then the npm registry (or the
+   * stored catalog, for filters npm search can't express, or the README
+   * index).
+   * Returns the serialized body and ETag alongside the data so HTTP
+   * callers can answer without re-serializing.
+   */
+  async searchExtensionsEntry(
+    params: SearchParams,
+    options: EdgeLookupOptions = {}
+  ): Promise<EdgeCacheEntry<NPMSearchResponse>> {
+    const edgeUrl = this.edgeCache.searchUrl(params);
+    const ttl = DirectusSearchService.SEARCH_TTL_SECONDS;
+
+    if (!options.skipEdgeLookup) {
+      const edgeCached = await this.edgeCache.get<NPMSearchResponse>(edgeUrl);
+      if (edgeCached) {
+        return edgeCached;
+      }
+    }
+
     const cacheKey = this.generateCacheKey(params);
     
-    // Try cache first
-    const cached = await this.cacheService.get<NPMSearchResponse>(cacheKey);
-    if (cached) {
-      return cached;
+    // Try KV next and promote hits to the colo-local edge cache
+    const cached = await this.cacheService.getEntry<NPMSearchResponse>(cacheKey);
+    if (cached?.fresh) {
+      return await this.edgeCache.set(edgeUrl, cached.entry.data, ttl);
     }
 
+    try {
+      const filteredData = await this.searchSource(params);
+
+      // Cache the result for 5 minutes
+      await this.cacheService.set(cacheKey, filteredData, ttl, {
+        staleTtlSeconds: DirectusSearchService.SEARCH_STALE_TTL_SECONDS
+      });
+      
+      return await this.edgeCache.set(edgeUrl, filteredData, ttl);
+    } catch (error) {
+      console.error('Search extensions error:', error);
+      if (cached) {
+        // npm is failing or the circuit is open: a stale answer beats none
+        MetricsService.recordUpstreamEvent('stale_served');
+        return await this.edgeCache.set(edgeUrl, cached.entry.data, DirectusSearchService.STALE_EDGE_TTL_SECONDS);
+      }
+      throw new Error(`Failed to search extensions: ${error instanceof Error ? error.message : 'Unknown error'}`);
+    }
+  }
+
+  /**
+   * A session's search window: the page shown now plus the pages after it.
+   * Only the first `shown` results get download counts and README
+   * snippets; the rest are marked pending for enrichPending to fill in if
+   * their page is ever served. Partly enriched results are never cached.
+   */
+  async searchWindow(params: SearchParams, shown: number): Promise<NPMSearchResponse> {
+    try {
+      return await this.searchSource(params, shown);
+    } catch (error) {
+      console.error('Search extensions error:', error);
+      throw new Error(`Failed to search extensions: ${error instanceof Error ? error.message : 'Unknown error'}`);
+    }
+  }
+
+  /**
+   * Fill in what searchWindow left out for the results about to be shown
+   */
+  async enrichPending(response: NPMSearchResponse, query: string): Promise<NPMSearchResponse> {
+    const pending = response.objects.filter(item => item.pending);
+    if (pending.length === 0) {
+      return response;
+    }
+
+    const hits = pending
+      .filter(item => item.pending?.chunk !== undefined)
+      .map(item => ({ extension: item.package, score: item.searchScore, chunk: item.pending!.chunk! }));
+    const [downloads, snippets] = await Promise.all([
+      this.getMonthlyDownloads(pending.map(item => item.package.name)),
+      hits.length > 0 ? this.readmeIndex.snippets(hits, query) : new Map<string, string>()
+    ]);
+
+    return {
+      ...response,
+      objects: response.objects.map(item => {
+        if (!item.pending) {
+          return item;
+        }
+        const { pending, ...rest } = item;
+        const name = item.package.name;
+        return {
+          ...rest,
+          downloads: { ...item.downloads, monthly: downloads.get(name) ?? item.downloads.monthly },
+          ...(snippets.has(name) && { highlight: snippets.get(name) })
+        };
+      })
+    };
+  }
+
+  /**
+   * Run a search against the README index, the catalog or npm, enriching
+   * the first `enrich` results
+   */
+  private async searchSource(params: SearchParams, enrich: number = Infinity): Promise<NPMSearchResponse> {
+    if (params.readme) {
+      return await this.searchReadmes(params, enrich);
+    }
+    if (usesCatalog(params)) {
+      return await this.searchCatalog(params, enrich);
+    }
+    return await this.searchRegistry(params, enrich);
+  }
+
+  private async searchRegistry(params: SearchParams, enrich: number): Promise<NPMSearchResponse> {
     // Build search query
     const searchText = this.buildSearchQuery(params);
-    const searchUrl = new URL(this.NPM_SEARCH_BASE);
+    const searchUrl = new URL(this.NPM_SEARCH_PATH, 'https://registry.npmjs.org');
     
     searchUrl.searchParams.set('text', searchText);
     searchUrl.searchParams.set('size', (params.limit || 10).toString());
@@ -54,108 +212,281 @@ export class DirectusSearchService {
       searchUrl.searchParams.set('maintenance', '0.5');
     }
 
-    try {
-      const response = await fetch(searchUrl.toString(), {
-        headers: {
-          'User-Agent': 'directus-marketplace-search-mcp/1.0.0',
-          'Accept': 'application/json'
+    const response = await this.upstream.fetch(`${searchUrl.pathname}${searchUrl.search}`, {
+      deadlineMs: DirectusSearchService.SEARCH_DEADLINE_MS
+    });
+
+    if (!response.ok) {
+      throw new Error(`npm registry API error: ${response.status} ${response.statusText}`);
+    }
+
+    const data: NPMSearchResponse = await response.json();
+    
+    // Filter results to only include Directus extensions
+    const filteredData = {
+      ...data,
+      objects: data.objects.filter(item => isDirectusExtension(item.package))
+    };
+
+    // One bulk downloads request covers every hit that is shown
+    const shown = filteredData.objects.slice(0, enrich);
+    const downloads = await this.getMonthlyDownloads(shown.map(item => item.package.name));
+    filteredData.objects = filteredData.objects.map((item, index) => {
+      const current = normalizeDownloads(item.downloads);
+      if (index >= enrich) {
+        return { ...item, downloads: current, pending: {} };
+      }
+      return {
+        ...item,
+        downloads: {
+          ...current,
+          monthly: downloads.get(item.package.name) ?? current.monthly
         }
-      });
+      };
+    });
 
-      if (!response.ok) {
-        throw new Error(`npm registry API error: ${response.status} ${response.statusText}`);
+    return filteredData;
+  }
+
+  /**
+   * Answer a search from the catalog index. Matches are ranked by the
+   * index; popularity sorting re-ranks the best candidates by downloads.
+   */
+  private async searchCatalog(params: SearchParams, enrich: number): Promise<NPMSearchResponse> {
+    const result = await this.catalogIndex.query(params);
+    let matches = result.matches;
+    const limit = params.limit || 10;
+    const offset = params.offset || 0;
+
+    let candidateDownloads: Map<string, number> | null = null;
+    if (params.sort === 'downloads') {
+      const ranked = await this.rankByDownloads(matches, match => match.entry.extension.name, offset + limit);
+      matches = ranked.items;
+      candidateDownloads = ranked.downloads;
+    }
+
+    const page = matches.slice(offset, offset + limit);
+    const shown = page.slice(0, enrich).map(match => match.entry.extension.name);
+    const downloads = await this.pageDownloads(shown, candidateDownloads);
+
+    return {
+      objects: page.map(({ entry, score }, index) => ({
+        downloads: { monthly: downloads.get(entry.extension.name) ?? 0, weekly: 0 },
+        dependents: '0',
+        updated: entry.extension.date,
+        searchScore: score,
+        package: entry.extension,
+        ...(index >= enrich && !downloads.has(entry.extension.name) && { pending: {} })
+      })),
+      total: result.matches.length,
+      time: new Date().toISOString(),
+      ...(result.facets && { facets: result.facets })
+    };
+  }
+
+  /**
+   * Answer a search from README text. Other catalog filters still apply;
+   * README chunks are only read for the page being returned.
+   */
+  private async searchReadmes(params: SearchParams, enrich: number): Promise<NPMSearchResponse> {
+    const allowed = await this.catalogIndex.filterNames(params);
+    let hits = await this.readmeIndex.search(params.query, allowed);
+    const total = hits.length;
+    const limit = params.limit || 10;
+    const offset = params.offset || 0;
+
+    let candidateDownloads: Map<string, number> | null = null;
+    if (params.sort === 'downloads') {
+      const ranked = await this.rankByDownloads(hits, hit => hit.extension.name, offset + limit);
+      hits = ranked.items;
+      candidateDownloads = ranked.downloads;
+    } else if (params.sort === 'updated' || params.sort === 'created') {
+      hits = [...hits].sort((a, b) => b.extension.date.localeCompare(a.extension.date));
+    }
+
+    const page = hits.slice(offset, offset + limit);
+    const shown = page.slice(0, enrich);
+    const [downloads, snippets] = await Promise.all([
+      this.pageDownloads(shown.map(hit => hit.extension.name), candidateDownloads),
+      this.readmeIndex.snippets(shown, params.query)
+    ]);
+
+    return {
+      objects: page.map(({ extension, score, chunk }, index) => ({
+        downloads: { monthly: downloads.get(extension.name) ?? 0, weekly: 0 },
+        dependents: '0',
+        updated: extension.date,
+        searchScore: score,
+        package: extension,
+        ...(snippets.has(extension.name) && { highlight: snippets.get(extension.name) }),
+        ...(index >= enrich && { pending: { chunk } })
+      })),
+      total,
+      time: new Date().toISOString()
+    };
+  }
+
+  /**
+   * Re-rank the best candidates by monthly downloads, returning every item
+   * (the ranked candidates first, the rest in their original order) along
+   * with the counts fetched. Unscoped names share one bulk request, but
+   * each scoped name costs a background subrequest, so candidates stop at
+   * the last scoped name the budget can still look up rather than being
+   * ranked with refused lookups counted as zero.
+   */
+  private async rankByDownloads<T>(
+    items: T[],
+    nameOf: (item: T) => string,
+    needed: number
+  ): Promise<{ items: T[]; downloads: Map<string, number> }> {
+    // One subrequest is kept for the bulk request
+    let scopedLookups = (SubrequestScheduler.current()?.available('subrequest', 'background') ?? Infinity) - 1;
+    let count = 0;
+    for (const item of items.slice(0, Math.max(DirectusSearchService.DOWNLOAD_SORT_CANDIDATES, needed))) {
+      if (nameOf(item).startsWith('@')) {
+        if (scopedLookups <= 0) {
+          break;
+        }
+        scopedLookups--;
       }
+      count++;
+    }
 
-      const data: NPMSearchResponse = await response.json();
-      
-      // Filter results to only include Directus extensions
-      const filteredData = {
-        ...data,
-        objects: data.objects.filter(item => this.isDirectusExtension(item.package))
-      };
+    const candidates = items.slice(0, count);
+    const downloads = await this.getMonthlyDownloads(candidates.map(nameOf));
+    for (const candidate of candidates) {
+      // npm has no stats for it; don't look it up again for the page
+      if (!downloads.has(nameOf(candidate))) {
+        downloads.set(nameOf(candidate), 0);
+      }
+    }
+    candidates.sort((a, b) => (downloads.get(nameOf(b)) ?? 0) - (downloads.get(nameOf(a)) ?? 0));
+    return { items: candidates.concat(items.slice(count)), downloads };
+  }
 
-      // Cache the result for 5 minutes
-      await this.cacheService.set(cacheKey, filteredData, 300);
-      
-      return filteredData;
-    } catch (error) {
-      console.error('Search extensions error:', error);
-      throw new Error(`Failed to search extensions: ${error instanceof Error ? error.message : 'Unknown error'}`);
+  /**
+   * Download counts for a page of results, reusing the ones fetched for ranking
+   */
+  private async pageDownloads(names: string[], known: Map<string, number> | null): Promise<Map<string, number>> {
+    const missing = known ? names.filter(name => !known.has(name)) : names;
+    if (known && missing.length === 0) {
+      return known;
     }
+    const fetched = await this.getMonthlyDownloads(missing);
+    return known ? new Map([...known, ...fetched]) : fetched;
   }
 
   async getExtensionDetails(packageName: string): Promise<DirectusExtension> {
+    return (await this.getExtensionDetailsEntry(packageName)).data;
+  }
+
+  async getExtensionDetailsEntry(
+    packageName: string,
+    options: EdgeLookupOptions = {}
+  ): Promise<EdgeCacheEntry<DirectusExtension>> {
+    const edgeUrl = this.edgeCache.extensionUrl(packageName);
+    const ttl = DirectusSearchService.EXTENSION_TTL_SECONDS;
+
+    if (!options.skipEdgeLookup) {
+      const edgeCached = await this.edgeCache.get<DirectusExtension>(edgeUrl);
+      if (edgeCached) {
+        return edgeCached;
+      }
+    }
+
     const cacheKey = `extension:${packageName}`;
+    const cacheOptions = { staleTtlSeconds: DirectusSearchService.EXTENSION_STALE_TTL_SECONDS };
     
-    // Try cache first
-    const cached = await this.cacheService.get<DirectusExtension>(cacheKey);
-    if (cached) {
-      return cached;
+    // Try KV next and promote hits to the colo-local edge cache
+    const cached = await this.cacheService.getEntry<DirectusExtension>(cacheKey);
+    if (cached?.fresh) {
+      return await this.edgeCache.set(edgeUrl, cached.entry.data, ttl);
     }
 
-    const packageUrl = `${this.NPM_REGISTRY_BASE}/${encodeURIComponent(packageName)}`;
+    const packagePath = `/${encodeURIComponent(packageName)}`;
     
     try {
-      const response = await fetch(packageUrl, {
-        headers: {
-          'User-Agent': 'directus-marketplace-search-mcp/1.0.0',
-          'Accept': 'application/json'
-        }
+      // Revalidate an expired entry instead of re-downloading the packument
+      const validators = cached?.entry.validators;
+      const conditionalHeaders: Record<string, string> = {};
+      if (validators?.etag) {
+        conditionalHeaders['If-None-Match'] = validators.etag;
+      }
+      if (validators?.lastModified) {
+        conditionalHeaders['If-Modified-Since'] = validators.lastModified;
+      }
+      
+      const response = await this.upstream.fetch(packagePath, {
+        headers: conditionalHeaders,
+        deadlineMs: DirectusSearchService.DETAILS_DEADLINE_MS
       });
 
+      if (response.status === 304 && cached) {
+        MetricsService.recordRevalidation(true);
+        const revalidated = await this.withDownloads(cached.entry.data);
+        await this.cacheService.set(cacheKey, revalidated, ttl, { ...cacheOptions, validators });
+        return await this.edgeCache.set(edgeUrl, revalidated, ttl);
+      }
+      if (validators) {
+        MetricsService.recordRevalidation(false);
+      }
+
       if (!response.ok) {
         if (response.status === 404) {
-          throw new Error(`Extension '${packageName}' not found`);
+          throw new NotFoundError(`Extension '${packageName}' not found`);
         }
         throw new Error(`npm registry API error: ${response.status} ${response.statusText}`);
       }
 
       const data: any = await response.json();
-      
-      // Extract the latest version info
-      const latestVersion = data['dist-tags']?.latest;
-      if (!latestVersion || !data.versions?.[latestVersion]) {
+      const parsed = packumentToExtension(data);
+      if (!parsed) {
         throw new Error(`No valid version found for '${packageName}'`);
       }
+      const extension = await this.withDownloads(parsed);
 
-      const versionData = data.versions[latestVersion];
-      
-      const extension: DirectusExtension = {
-        name: data.name,
-        version: latestVersion,
-        description: versionData.description || data.description || '',
-        keywords: versionData.keywords || [],
-        sanitized_name: data.name,
-        publisher: {
-          email: data.maintainers?.[0]?.email || '',
-          username: data.maintainers?.[0]?.name || ''
-        },
-        maintainers: data.maintainers?.map((m: any) => ({
-          email: m.email,
-          username: m.name
-        })) || [],
-        license: versionData.license || data.license || '',
-        date: data.time?.[latestVersion] || data.time?.created || '',
-        links: {
-          homepage: versionData.homepage || data.homepage,
-          repository: versionData.repository?.url || data.repository?.url,
-          bugs: versionData.bugs?.url || data.bugs?.url,
-          npm: `https://www.npmjs.com/package/${data.name}`
-        }
+      const responseValidators: UpstreamValidators = {
+        etag: response.headers.get('ETag') || undefined,
+        lastModified: response.headers.get('Last-Modified') || undefined
       };
 
-      // Cache for 1 hour
-      await this.cacheService.set(cacheKey, extension, 3600);
+      // Cache for 1 hour, keeping the validators for the next refresh
+      await this.cacheService.set(cacheKey, extension, ttl, { ...cacheOptions, validators: responseValidators });
       
-      return extension;
+      return await this.edgeCache.set(edgeUrl, extension, ttl);
     } catch (error) {
       console.error('Get extension details error:', error);
-      throw new Error(`Failed to get extension details: ${error instanceof Error ? error.message : 'Unknown error'}`);
+      const notFound = error instanceof NotFoundError;
+      if (cached && !notFound) {
+        MetricsService.recordUpstreamEvent('stale_served');
+        return await this.edgeCache.set(edgeUrl, cached.entry.data, DirectusSearchService.STALE_EDGE_TTL_SECONDS);
+      }
+      const message = `Failed to get extension details: ${error instanceof Error ? error.message : 'Unknown error'}`;
+      throw notFound ? new NotFoundError(message) : new Error(message);
+    }
+  }
+
+  private async getMonthlyDownloads(packageNames: string[]): Promise<Map<string, number>> {
+    try {
+      return await this.downloadStats.getMonthlyDownloads(packageNames);
+    } catch (error) {
+      // Download counts are an enrichment; never fail the lookup over them
+      console.error('Download stats error:', error);
+      return new Map();
     }
   }
 
+  /**
+   * Attach the monthly download count, if npm has one
+   */
+  async withDownloads(extension: DirectusExtension): Promise<DirectusExtension> {
+    const downloads = await this.getMonthlyDownloads([extension.name]);
+    const monthly = downloads.get(extension.name);
+    return monthly === undefined ? extension : { ...extension, downloads: { monthly } };
+  }
+
   private buildSearchQuery(params: SearchParams): string {
-    let query = `keywords:directus-extension ${params.query}`;
+    let query = `keywords:directus-extension ${normalizeQuery(params.query)}`;
     
     // Add category-specific keywords
     if (params.category) {
@@ -184,37 +515,44 @@ export class DirectusSearchService {
     return categoryMap[category] || null;
   }
 
-  private isDirectusExtension(pkg: DirectusExtension): boolean {
-    // Check if package has directus-extension keyword
-    const hasDirectusKeyword = pkg.keywords?.some(keyword => 
-      keyword.includes('directus-extension') || 
-      keyword.includes('directus-custom') ||
-      keyword.includes('directus-theme')
-    );
-    
-    // Check if package name indicates it's a Directus extension
-    const hasDirectusName = pkg.name.includes('directus') && 
-      (pkg.name.includes('extension') || 
-       pkg.name.includes('interface') || 
-       pkg.name.includes('display') || 
-       pkg.name.includes('layout') || 
-       pkg.name.includes('panel') || 
-       pkg.name.includes('module') || 
-       pkg.name.includes('hook') || 
-       pkg.name.includes('theme'));
-
-    return hasDirectusKeyword || hasDirectusName;
-  }
-
   private generateCacheKey(params: SearchParams): string {
     const keyObj = {
-      query: params.query,
+      query: normalizeQuery(params.query),
       category: params.category || null,
       limit: params.limit || 10,
       offset: params.offset || 0,
-      sort: params.sort || 'relevance'
+      sort: params.sort || 'relevance',
+      compatibleWith: params.compatibleWith ?? null,
+      sandbox: params.sandbox ?? null,
+      license: params.license ?? null,
+      publisher: params.publisher ?? null,
+      facets: params.facets ?? false,
+      readme: params.readme ?? false
     };
     
     return `search:${btoa(JSON.stringify(keyObj))}`;
   }
-}
\ No newline at end of file
+}
+
+/**
+ * Filters and facet counts npm search can't provide are answered from the catalog
+ */
+function usesCatalog(params: SearchParams): boolean {
+  return params.compatibleWith !== undefined ||
+    params.sandbox !== undefined ||
+    params.license !== undefined ||
+    params.publisher !== undefined ||
+    params.facets === true;
+}
+
+/**
+ * npm search has returned downloads both as a bare number and as
+ * { monthly, weekly }; always hand callers the object form
+ */
+function normalizeDownloads(downloads: unknown): { monthly: number; weekly: number } {
+  if (typeof downloads === 'number') {
+    return { monthly: downloads, weekly: 0 };
+  }
+  const value = downloads as { monthly?: number; weekly?: number } | undefined;
+  return { monthly: value?.monthly ?? 0, weekly: value?.weekly ?? 0 };
+}
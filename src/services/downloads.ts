@@ -0,0 +1,115 @@
+/**
+ * Download Stats Service
+ * Fetches monthly download counts through the npm bulk point endpoint
+ * and caches them per package for a day
+ */
+
+import type { Env } from '../types/worker.js';
+import { CacheService } from './cache.js';
+import { UpstreamClient } from './upstream.js';
+
+export class DownloadStatsService {
+  private static readonly CACHE_PREFIX = 'downloads:';
+  private static readonly TTL_SECONDS = 24 * 60 * 60;
+  // npm accepts up to 128 unscoped packages per bulk request
+  private static readonly BULK_LIMIT = 128;
+  private static readonly DEADLINE_MS = 3000;
+  private readonly DOWNLOADS_PATH = '/downloads/point/last-month';
+  private cacheService: CacheService;
+  private upstream: UpstreamClient;
+
+  constructor(private env: Env) {
+    this.cacheService = new CacheService(env.CACHE);
+    this.upstream = new UpstreamClient(['https://api.npmjs.org']);
+  }
+
+  /**
+   * Get last-month download counts for many packages at once.
+   * Packages npm has no data for are left out of the result.
+   */
+  async getMonthlyDownloads(packageNames: string[]): Promise<Map<string, number>> {
+    const names = [...new Set(packageNames)];
+    const counts = new Map<string, number>();
+
+    const cached = await Promise.all(
+      names.map(name => this.cacheService.get<number>(`${DownloadStatsService.CACHE_PREFIX}${name}`))
+    );
+    const missing: string[] = [];
+    names.forEach((name, index) => {
+      const value = cached[index];
+      if (value === null) {
+        missing.push(name);
+      } else {
+        counts.set(name, value);
+      }
+    });
+
+    if (missing.length === 0) {
+      return counts;
+    }
+
+    // The bulk endpoint doesn't support scoped packages, so those go one per request
+    const unscoped = missing.filter(name => !name.startsWith('@'));
+    const scoped = missing.filter(name => name.startsWith('@'));
+    const batches: string[][] = [];
+    for (let i = 0; i < unscoped.length; i += DownloadStatsService.BULK_LIMIT) {
+      batches.push(unscoped.slice(i, i + DownloadStatsService.BULK_LIMIT));
+    }
+    scoped.forEach(name => batches.push([name]));
+
+    const fetched = await Promise.all(batches.map(batch => this.fetchBatch(batch)));
+    const writes: Promise<void>[] = [];
+    for (const batchCounts of fetched) {
+      for (const [name, downloads] of batchCounts) {
+        counts.set(name, downloads);
+        writes.push(this.cacheService.set(
+          `${DownloadStatsService.CACHE_PREFIX}${name}`,
+          downloads,
+          DownloadStatsService.TTL_SECONDS
+        ));
+      }
+    }
+    await Promise.all(writes);
+
+    return counts;
+  }
+
+  private async fetchBatch(names: string[]): Promise<Map<string, number>> {
+    const counts = new Map<string, number>();
+
+    try {
+      // Counts are an enhancement; single scoped lookups go last when the budget is tight
+      const response = await this.upstream.fetch(`${this.DOWNLOADS_PATH}/${names.join(',')}`, {
+        deadlineMs: DownloadStatsService.DEADLINE_MS,
+        hedge: false,
+        priority: names.length === 1 ? 'background' : 'normal'
+      });
+
+      if (!response.ok) {
+        // 404 means npm has no stats for any package in the batch
+        if (response.status !== 404) {
+          console.error(`npm downloads API error: ${response.status} ${response.statusText}`);
+        }
+        return counts;
+      }
+
+      const data: any = await response.json();
+      if (names.length === 1) {
+        // Single-package responses are not keyed by name
+        if (typeof data?.downloads === 'number') {
+          counts.set(names[0], data.downloads);
+        }
+      } else {
+        for (const name of names) {
+          if (typeof data?.[name]?.downloads === 'number') {
+            counts.set(name, data[name].downloads);
+          }
+        }
+      }
+    } catch (error) {
+      console.error('Download stats fetch error:', error);
+    }
+
+    return counts;
+  }
+}
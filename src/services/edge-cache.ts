@@ -0,0 +1,183 @@
+/**
+ * Edge Cache Service using the Workers Cache API
+ * Stores JSON documents under canonical GET URLs so the public /api
+ * endpoints and the MCP tools share colo-local entries
+ */
+
+import type { SearchParams } from '../types/directus.js';
+import { MetricsService } from './metrics.js';
+
+export interface EdgeCacheDocument {
+  body: string;
+  etag: string;
+  // What the entry was stored with; a stale fallback gets a short lifetime
+  cacheControl: string;
+}
+
+export interface EdgeCacheEntry<T> extends EdgeCacheDocument {
+  data: T;
+}
+
+export class EdgeCacheService {
+  constructor(private origin: string) {}
+
+  /**
+   * Canonical URL for a validated search: fixed parameter order, defaults
+   * filled in and the query case-folded, so equivalent searches share one entry.
+   */
+  searchUrl(params: SearchParams): string {
+    const url = new URL('/api/search', this.origin);
+    url.searchParams.set('q', normalizeQuery(params.query));
+    if (params.category) {
+      url.searchParams.set('category', params.category);
+    }
+    url.searchParams.set('limit', (params.limit || 10).toString());
+    url.searchParams.set('offset', (params.offset || 0).toString());
+    url.searchParams.set('sort', params.sort || 'relevance');
+    if (params.compatibleWith) {
+      url.searchParams.set('compatible_with', params.compatibleWith);
+    }
+    if (params.sandbox !== undefined) {
+      url.searchParams.set('sandbox', String(params.sandbox));
+    }
+    if (params.license) {
+      url.searchParams.set('license', params.license);
+    }
+    if (params.publisher) {
+      url.searchParams.set('publisher', params.publisher);
+    }
+    if (params.facets) {
+      url.searchParams.set('facets', 'true');
+    }
+    if (params.readme) {
+      url.searchParams.set('readme', 'true');
+    }
+    return url.toString();
+  }
+
+  extensionUrl(packageName: string): string {
+    return new URL(`/api/extension/${encodeURIComponent(packageName)}`, this.origin).toString();
+  }
+
+  get available(): boolean {
+    return getDefaultCache() !== null;
+  }
+
+  /**
+   * Look up the stored document without parsing it
+   */
+  async match(url: string): Promise<EdgeCacheDocument | null> {
+    const cache = getDefaultCache();
+    if (!cache) {
+      return null;
+    }
+
+    try {
+      const cached = await cache.match(url);
+      if (!cached) {
+        MetricsService.recordCacheLookup('edge', false);
+        return null;
+      }
+
+      const body = await cached.text();
+      MetricsService.recordCacheLookup('edge', true);
+      return {
+        body,
+        etag: cached.headers.get('ETag') || await computeEtag(body),
+        cacheControl: cached.headers.get('Cache-Control') || cacheControl(0)
+      };
+    } catch (error) {
+      console.error('Edge cache get error:', error);
+      return null;
+    }
+  }
+
+  async get<T>(url: string): Promise<EdgeCacheEntry<T> | null> {
+    const document = await this.match(url);
+    return document ? { ...document, data: JSON.parse(document.body) } : null;
+  }
+
+  async set<T>(url: string, data: T, ttlSeconds: number): Promise<EdgeCacheEntry<T>> {
+    const body = JSON.stringify(data);
+    const entry: EdgeCacheEntry<T> = { data, body, etag: await computeEtag(body), cacheControl: cacheControl(ttlSeconds) };
+
+    const cache = getDefaultCache();
+    if (cache) {
+      try {
+        await cache.put(url, new Response(body, {
+          headers: {
+            'Content-Type': 'application/json',
+            'Cache-Control': entry.cacheControl,
+            'ETag': entry.etag
+          }
+        }));
+      } catch (error) {
+        console.error('Edge cache set error:', error);
+        // Don't throw - caching is not critical for functionality
+      }
+    }
+
+    return entry;
+  }
+}
+
+/**
+ * Build the HTTP response for a cached document, answering 304 when the
+ * client already holds the current representation. Clients get the same
+ * Cache-Control the edge entry was stored with.
+ */
+export function edgeCacheResponse(
+  request: Request,
+  canonicalUrl: string,
+  entry: EdgeCacheDocument
+): Response {
+  const headers: Record<string, string> = {
+    'Content-Type': 'application/json',
+    'Cache-Control': entry.cacheControl,
+    'ETag': entry.etag,
+    'Link': `<${canonicalUrl}>; rel="canonical"`,
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Expose-Headers': 'ETag'
+  };
+
+  if (matchesEtag(request.headers.get('If-None-Match'), entry.etag)) {
+    return new Response(null, { status: 304, headers });
+  }
+
+  return new Response(request.method === 'HEAD' ? null : entry.body, { headers });
+}
+
+function cacheControl(ttlSeconds: number): string {
+  // Browsers revalidate sooner than the shared edge cache does
+  const maxAge = Math.min(60, ttlSeconds);
+  return `public, max-age=${maxAge}, s-maxage=${ttlSeconds}`;
+}
+
+function matchesEtag(ifNoneMatch: string | null, etag: string): boolean {
+  if (!ifNoneMatch) {
+    return false;
+  }
+  // If-None-Match uses the weak comparison function (RFC 9110 13.1.2)
+  return ifNoneMatch.split(',').some(candidate => {
+    const tag = candidate.trim();
+    return tag === '*' || tag.replace(/^W\//, '') === etag;
+  });
+}
+
+export function normalizeQuery(query: string): string {
+  return query.trim().toLowerCase().replace(/\s+/g, ' ');
+}
+
+async function computeEtag(body: string): Promise<string> {
+  const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(body));
+  const hex = [...new Uint8Array(digest)]
+    .slice(0, 16)
+    .map(byte => byte.toString(16).padStart(2, '0'))
+    .join('');
+  return `"${hex}"`;
+}
+
+function getDefaultCache(): Cache | null {
+  // The Cache API is unavailable outside the Workers runtime (and a no-op on workers.dev)
+  return typeof caches !== 'undefined' ? caches.default : null;
+}
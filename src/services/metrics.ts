@@ -0,0 +1,338 @@
+/**
+ * Metrics Service
+ * Pre-aggregated counters and histograms exposed in OpenMetrics format
+ */
+
+import type { Env } from '../types/worker.js';
+
+export type CacheTier = 'kv' | 'edge';
+
+export type UpstreamEvent = 'hedge' | 'failover' | 'timeout' | 'circuit_open' | 'stale_served' | 'budget_exhausted';
+
+interface HistogramData {
+  // Non-cumulative bucket counts, one per UPSTREAM_LATENCY_BUCKETS entry plus +Inf
+  buckets: number[];
+  sum: number;
+  count: number;
+}
+
+export interface MetricsSnapshot {
+  updatedAt: number;
+  requests: Record<string, number>;
+  cacheLookups: Record<string, number>;
+  rateLimitRejections: Record<string, number>;
+  revalidations: Record<string, number>;
+  upstreamEvents: Record<string, number>;
+  upstreamLatency: HistogramData;
+}
+
+// Upper bounds in seconds
+const UPSTREAM_LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+
+function emptySnapshot(): MetricsSnapshot {
+  return {
+    updatedAt: 0,
+    requests: {},
+    cacheLookups: {},
+    rateLimitRejections: {},
+    revalidations: {},
+    upstreamEvents: {},
+    upstreamLatency: {
+      buckets: new Array(UPSTREAM_LATENCY_BUCKETS.length + 1).fill(0),
+      sum: 0,
+      count: 0
+    }
+  };
+}
+
+function increment(counters: Record<string, number>, key: string, by: number = 1): void {
+  counters[key] = (counters[key] || 0) + by;
+}
+
+/**
+ * Add every counter in `source` to `target`
+ */
+function addSnapshot(target: MetricsSnapshot, source: MetricsSnapshot): MetricsSnapshot {
+  for (const [key, value] of Object.entries(source.requests)) {
+    increment(target.requests, key, value);
+  }
+  for (const [key, value] of Object.entries(source.cacheLookups)) {
+    increment(target.cacheLookups, key, value);
+  }
+  for (const [key, value] of Object.entries(source.rateLimitRejections)) {
+    increment(target.rateLimitRejections, key, value);
+  }
+  for (const [key, value] of Object.entries(source.revalidations)) {
+    increment(target.revalidations, key, value);
+  }
+  for (const [key, value] of Object.entries(source.upstreamEvents)) {
+    increment(target.upstreamEvents, key, value);
+  }
+  source.upstreamLatency.buckets.forEach((value, i) => {
+    target.upstreamLatency.buckets[i] = (target.upstreamLatency.buckets[i] || 0) + value;
+  });
+  target.upstreamLatency.sum += source.upstreamLatency.sum;
+  target.upstreamLatency.count += source.upstreamLatency.count;
+  target.updatedAt = Math.max(target.updatedAt, source.updatedAt);
+  return target;
+}
+
+// Counters of retired isolates, folded together by compact()
+interface BaseSnapshot extends MetricsSnapshot {
+  // Shards already added to this snapshot but maybe not yet deleted
+  folded?: string[];
+}
+
+interface ShardMetadata {
+  updatedAt: number;
+}
+
+/**
+ * Each isolate keeps running totals in memory and writes them to its own
+ * shard key, so no two isolates ever write the same key and a shard only
+ * grows. The cron job folds shards of isolates that have gone idle into a
+ * base snapshot and publishes the base plus the live shards as one totals
+ * key, so a /metrics scrape costs one KV read however many isolates run.
+ */
+export class MetricsService {
+  private static readonly SNAPSHOT_KEY = 'metrics:snapshot';
+  private static readonly SHARD_PREFIX = 'metrics:snapshot:';
+  // Written by the cron job only; the one key /metrics reads
+  private static readonly TOTALS_KEY = 'metrics:totals';
+  // The cron job publishes every 5 minutes, so flushing shards more often
+  // would only add KV writes
+  private static readonly FLUSH_INTERVAL_MS = 5 * 60 * 1000;
+  // An isolate idle this long starts a new shard, so compact() can never
+  // fold a shard its isolate will write again
+  private static readonly SHARD_ROTATE_MS = 12 * 60 * 60 * 1000;
+  private static readonly SHARD_IDLE_MS = 24 * 60 * 60 * 1000;
+
+  // Deltas recorded by this isolate since the last flush
+  private static pending: MetricsSnapshot = emptySnapshot();
+  private static pendingEvents = 0;
+  private static lastFlush = 0;
+  // This isolate's shard and the totals last written to it
+  private static shardKey?: string;
+  private static totals: MetricsSnapshot = emptySnapshot();
+
+  constructor(private env: Env) {}
+
+  static recordRequest(tool: string, status: number): void {
+    increment(MetricsService.pending.requests, `${tool}|${status}`);
+    MetricsService.pendingEvents++;
+  }
+
+  static recordCacheLookup(tier: CacheTier, hit: boolean): void {
+    increment(MetricsService.pending.cacheLookups, `${tier}|${hit ? 'hit' : 'miss'}`);
+    MetricsService.pendingEvents++;
+  }
+
+  static recordRateLimitRejection(reason: string): void {
+    increment(MetricsService.pending.rateLimitRejections, reason);
+    MetricsService.pendingEvents++;
+  }
+
+  static recordRevalidation(notModified: boolean): void {
+    increment(MetricsService.pending.revalidations, notModified ? 'not_modified' : 'modified');
+    MetricsService.pendingEvents++;
+  }
+
+  static recordUpstreamEvent(event: UpstreamEvent): void {
+    increment(MetricsService.pending.upstreamEvents, event);
+    MetricsService.pendingEvents++;
+  }
+
+  static recordUpstreamLatency(durationMs: number): void {
+    const seconds = durationMs / 1000;
+    const histogram = MetricsService.pending.upstreamLatency;
+    let index = UPSTREAM_LATENCY_BUCKETS.findIndex(bound => seconds <= bound);
+    if (index === -1) {
+      index = UPSTREAM_LATENCY_BUCKETS.length;
+    }
+    histogram.buckets[index]++;
+    histogram.sum += seconds;
+    histogram.count++;
+    MetricsService.pendingEvents++;
+  }
+
+  /**
+   * Write this isolate's totals, including pending deltas, to its shard.
+   * Costs one KV write, so callers on hot paths should prefer flushIfDue().
+   */
+  async flush(): Promise<void> {
+    if (MetricsService.pendingEvents === 0) {
+      return;
+    }
+
+    const now = Date.now();
+    if (!MetricsService.shardKey || now - MetricsService.lastFlush >= MetricsService.SHARD_ROTATE_MS) {
+      MetricsService.shardKey = `${MetricsService.SHARD_PREFIX}${crypto.randomUUID()}`;
+      MetricsService.totals = emptySnapshot();
+    }
+
+    // Swap the buffer first so events recorded while we await are kept for the next flush
+    const deltas = MetricsService.pending;
+    const events = MetricsService.pendingEvents;
+    MetricsService.pending = emptySnapshot();
+    MetricsService.pendingEvents = 0;
+    MetricsService.lastFlush = now;
+
+    const totals = addSnapshot(addSnapshot(emptySnapshot(), MetricsService.totals), deltas);
+    totals.updatedAt = now;
+    try {
+      await this.env.CACHE.put(MetricsService.shardKey, JSON.stringify(totals), {
+        metadata: { updatedAt: now }
+      });
+      MetricsService.totals = totals;
+    } catch (error) {
+      console.error('Failed to flush metrics:', error);
+      // Keep the deltas for the next flush
+      MetricsService.pending = addSnapshot(deltas, MetricsService.pending);
+      MetricsService.pendingEvents += events;
+    }
+  }
+
+  /**
+   * Flush at most once per FLUSH_INTERVAL_MS for this isolate
+   */
+  async flushIfDue(): Promise<void> {
+    if (Date.now() - MetricsService.lastFlush >= MetricsService.FLUSH_INTERVAL_MS) {
+      await this.flush();
+    }
+  }
+
+  /**
+   * Totals across all isolates as last published by the cron job
+   */
+  async getSnapshot(): Promise<MetricsSnapshot> {
+    return this.readSnapshot(MetricsService.TOTALS_KEY);
+  }
+
+  /**
+   * Fold the shards of isolates idle for SHARD_IDLE_MS into the base
+   * snapshot and delete them, then publish the base plus the live shards
+   * as the totals /metrics serves. The base records which shards it
+   * already holds, so a failed delete never counts a shard twice. Run
+   * from the cron job, the only writer of the base and the totals.
+   */
+  async compact(): Promise<number> {
+    const [base, shards] = await Promise.all([this.readBase(), this.listShards()]);
+    const folded = new Set(base.folded);
+    const now = Date.now();
+
+    const leftovers = shards.filter(shard => folded.has(shard.name)).map(shard => shard.name);
+    const unfolded = shards.filter(shard => !folded.has(shard.name));
+    const idle = unfolded
+      .filter(shard => now - (shard.metadata?.updatedAt ?? 0) >= MetricsService.SHARD_IDLE_MS)
+      .map(shard => shard.name);
+    const idleNames = new Set(idle);
+    const live = unfolded.filter(shard => !idleNames.has(shard.name)).map(shard => shard.name);
+
+    const [idleSnapshots, liveSnapshots] = await Promise.all([
+      Promise.all(idle.map(name => this.readSnapshot(name))),
+      Promise.all(live.map(name => this.readSnapshot(name)))
+    ]);
+    if (idle.length > 0) {
+      for (const snapshot of idleSnapshots) {
+        addSnapshot(base, snapshot);
+      }
+      base.folded = [...leftovers, ...idle];
+      await this.env.CACHE.put(MetricsService.SNAPSHOT_KEY, JSON.stringify(base));
+    }
+
+    // A fresh snapshot, so the base's folded list isn't published
+    const totals = addSnapshot(emptySnapshot(), base);
+    for (const snapshot of liveSnapshots) {
+      addSnapshot(totals, snapshot);
+    }
+    await this.env.CACHE.put(MetricsService.TOTALS_KEY, JSON.stringify(totals));
+
+    if (idle.length > 0 || leftovers.length > 0) {
+      await Promise.all([...leftovers, ...idle].map(name => this.env.CACHE.delete(name)));
+    }
+    return idle.length;
+  }
+
+  private async readBase(): Promise<BaseSnapshot> {
+    return this.readSnapshot(MetricsService.SNAPSHOT_KEY);
+  }
+
+  private async readSnapshot(key: string): Promise<BaseSnapshot> {
+    const stored = await this.env.CACHE.get(key);
+    return stored ? { ...emptySnapshot(), ...JSON.parse(stored) } : emptySnapshot();
+  }
+
+  private async listShards(): Promise<Array<{ name: string; metadata?: ShardMetadata }>> {
+    const shards: Array<{ name: string; metadata?: ShardMetadata }> = [];
+    let cursor: string | undefined;
+    do {
+      const page = await this.env.CACHE.list<ShardMetadata>({ prefix: MetricsService.SHARD_PREFIX, cursor });
+      shards.push(...page.keys);
+      cursor = page.list_complete ? undefined : page.cursor;
+    } while (cursor);
+    return shards;
+  }
+
+  /**
+   * Render the stored totals in OpenMetrics text format
+   */
+  async renderOpenMetrics(): Promise<string> {
+    const snapshot = await this.getSnapshot();
+    const lines: string[] = [];
+
+    lines.push('# TYPE mcp_tool_requests counter');
+    lines.push('# HELP mcp_tool_requests MCP tool calls by tool and HTTP status.');
+    for (const [key, value] of Object.entries(snapshot.requests)) {
+      const [tool, status] = key.split('|');
+      lines.push(`mcp_tool_requests_total{tool="${escapeLabel(tool)}",status="${escapeLabel(status)}"} ${value}`);
+    }
+
+    lines.push('# TYPE mcp_cache_lookups counter');
+    lines.push('# HELP mcp_cache_lookups Cache lookups by tier and result.');
+    for (const [key, value] of Object.entries(snapshot.cacheLookups)) {
+      const [tier, result] = key.split('|');
+      lines.push(`mcp_cache_lookups_total{tier="${escapeLabel(tier)}",result="${escapeLabel(result)}"} ${value}`);
+    }
+
+    lines.push('# TYPE mcp_rate_limit_rejections counter');
+    lines.push('# HELP mcp_rate_limit_rejections Requests refused by the rate limiter, by reason.');
+    for (const [reason, value] of Object.entries(snapshot.rateLimitRejections)) {
+      lines.push(`mcp_rate_limit_rejections_total{reason="${escapeLabel(reason)}"} ${value}`);
+    }
+
+    lines.push('# TYPE mcp_upstream_revalidations counter');
+    lines.push('# HELP mcp_upstream_revalidations Conditional npm requests for expired entries, by result.');
+    for (const [result, value] of Object.entries(snapshot.revalidations)) {
+      lines.push(`mcp_upstream_revalidations_total{result="${escapeLabel(result)}"} ${value}`);
+    }
+
+    lines.push('# TYPE mcp_upstream_events counter');
+    lines.push('# HELP mcp_upstream_events Hedged requests, mirror failovers, timeouts, open-circuit refusals, stale responses and budget refusals.');
+    for (const [event, value] of Object.entries(snapshot.upstreamEvents)) {
+      lines.push(`mcp_upstream_events_total{event="${escapeLabel(event)}"} ${value}`);
+    }
+
+    lines.push('# TYPE mcp_upstream_latency_seconds histogram');
+    lines.push('# UNIT mcp_upstream_latency_seconds seconds');
+    lines.push('# HELP mcp_upstream_latency_seconds Latency of npm registry requests.');
+    let cumulative = 0;
+    UPSTREAM_LATENCY_BUCKETS.forEach((bound, i) => {
+      cumulative += snapshot.upstreamLatency.buckets[i] || 0;
+      lines.push(`mcp_upstream_latency_seconds_bucket{le="${bound}"} ${cumulative}`);
+    });
+    lines.push(`mcp_upstream_latency_seconds_bucket{le="+Inf"} ${snapshot.upstreamLatency.count}`);
+    lines.push(`mcp_upstream_latency_seconds_sum ${snapshot.upstreamLatency.sum}`);
+    lines.push(`mcp_upstream_latency_seconds_count ${snapshot.upstreamLatency.count}`);
+
+    lines.push('# TYPE mcp_metrics_last_flush_timestamp_seconds gauge');
+    lines.push('# HELP mcp_metrics_last_flush_timestamp_seconds When the stored counters were last updated.');
+    lines.push(`mcp_metrics_last_flush_timestamp_seconds ${snapshot.updatedAt / 1000}`);
+
+    lines.push('# EOF');
+    return lines.join('\n') + '\n';
+  }
+}
+
+function escapeLabel(value: string): string {
+  return value.replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+}
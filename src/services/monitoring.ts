@@ -4,8 +4,10 @@
  */
 
 import type { Env } from '../types/worker.js';
+import { MetricsService } from './metrics.js';
+import { SubrequestScheduler } from './scheduler.js';
 
-interface UsageEvent {
+export interface UsageEvent {
   timestamp: number;
   ip: string;
   method: string;
@@ -15,6 +17,21 @@ interface UsageEvent {
   success: boolean;
   responseTime?: number;
   errorCode?: number;
+  tool?: string;
+  // Upstream calls and KV operations made while answering; no subrequests means the cache answered
+  subrequests?: number;
+  kvOperations?: number;
+}
+
+export type EventExportFormat = 'jsonl' | 'columns';
+
+export interface EventExportOptions {
+  format?: EventExportFormat;
+  // Inclusive range of event timestamps (ms since epoch)
+  since?: number;
+  until?: number;
+  // Resume a previous export where it stopped
+  cursor?: string;
 }
 
 interface DailyStats {
@@ -24,16 +41,48 @@ interface DailyStats {
   toolCalls: {
     search_extensions: number;
     get_extension_details: number;
+    find_similar_extensions: number;
     get_extension_categories: number;
   };
   errors: number;
   avgResponseTime: number;
 }
 
+type RollupGranularity = 'day' | 'week' | 'month';
+
+interface UsageRollup {
+  period: string;
+  granularity: RollupGranularity;
+  totalRequests: number;
+  errors: number;
+  responseTimeTotal: number;
+  toolCalls: Record<string, number>;
+}
+
+interface RollupPeriod {
+  granularity: RollupGranularity;
+  period: string;
+  // First day (UTC midnight) and length, so a rollup can be folded from daily records
+  start: number;
+  days: number;
+}
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
 export class MonitoringService {
   private static readonly USAGE_PREFIX = 'usage:';
   private static readonly DAILY_STATS_PREFIX = 'daily_stats:';
+  private static readonly ROLLUP_PREFIX = 'rollup:';
   private static readonly MAX_EVENTS_PER_DAY = 1000; // Limit KV writes
+  private static readonly EVENT_TTL_SECONDS = 7 * 24 * 60 * 60;
+  // KV caps list metadata at 1024 bytes
+  private static readonly MAX_EVENT_METADATA_BYTES = 1024;
+  private static readonly MAX_HEADER_CHARS = 256;
+  // List pages (up to 1000 events each) streamed per export request
+  private static readonly MAX_EXPORT_PAGES = 100;
+  private static readonly MAX_WINDOW_DAYS = 366;
+  // Rollups must outlive the longest window we can be asked to summarize
+  private static readonly ROLLUP_TTL_SECONDS = 400 * 24 * 60 * 60;
 
   constructor(private env: Env) {}
 
@@ -47,6 +96,7 @@ export class MonitoringService {
     const now = Date.now();
     const ip = this.getClientIP(request);
     const url = new URL(request.url);
+    const scheduler = SubrequestScheduler.current();
     
     const event: UsageEvent = {
       timestamp: now,
@@ -57,7 +107,10 @@ export class MonitoringService {
       origin: request.headers.get('Origin') || undefined,
       success,
       responseTime,
-      errorCode
+      errorCode,
+      tool: toolName,
+      subrequests: scheduler?.consumed('subrequest'),
+      kvOperations: scheduler?.consumed('kv')
     };
 
     // Track the event asynchronously (don't block response)
@@ -70,7 +123,7 @@ export class MonitoringService {
 
   private async processUsageEvent(event: UsageEvent, toolName?: string): Promise<void> {
     try {
-      // Update daily statistics
+      // Weekly and monthly rollups are folded from these by the cron job
       await this.updateDailyStats(event, toolName);
       
       // Only store detailed events for a sample (to save KV storage costs)
@@ -80,13 +133,17 @@ export class MonitoringService {
       
       // Check for alerts
       await this.checkForAlerts(event);
+      
+      // Write this isolate's counters to its /metrics shard, at most every few seconds
+      await new MetricsService(this.env).flushIfDue();
     } catch (error) {
       console.error('Failed to process usage event:', error);
     }
   }
 
   private async updateDailyStats(event: UsageEvent, toolName?: string): Promise<void> {
-    const today = new Date().toISOString().split('T')[0]; // YYYY-MM-DD
+    // The event's own clock, so a request straddling midnight counts once, on one day
+    const today = isoDate(event.timestamp);
     const statsKey = `${MonitoringService.DAILY_STATS_PREFIX}${today}`;
     
     const existing = await this.env.CACHE.get(statsKey);
@@ -102,6 +159,7 @@ export class MonitoringService {
         toolCalls: {
           search_extensions: 0,
           get_extension_details: 0,
+          find_similar_extensions: 0,
           get_extension_categories: 0
         },
         errors: 0,
@@ -137,15 +195,165 @@ export class MonitoringService {
       await this.env.CACHE.put(ipsKey, JSON.stringify([...ipSet]), { expirationTtl: 90000 });
     }
 
-    // Store updated stats (with 25-hour TTL)
-    await this.env.CACHE.put(statsKey, JSON.stringify(stats), { expirationTtl: 90000 });
+    // Daily stats double as the finest rollup level, so keep them as long as the coarser ones
+    await this.env.CACHE.put(statsKey, JSON.stringify(stats), { expirationTtl: MonitoringService.ROLLUP_TTL_SECONDS });
+  }
+
+  /**
+   * Fold the last completed ISO week and calendar month from their daily
+   * records, once each. Called from the cron job, so the rollup keys are
+   * written once per period instead of on every request. Returns the
+   * number of rollups written.
+   */
+  async foldRollups(now: number = Date.now()): Promise<number> {
+    const today = Date.parse(isoDate(now));
+    const weekStart = today - (((new Date(today).getUTCDay() + 6) % 7) + 7) * DAY_MS;
+    const date = new Date(today);
+    const monthStart = Date.UTC(date.getUTCFullYear(), date.getUTCMonth() - 1, 1);
+    const targets = [periodOf('week', weekStart), periodOf('month', monthStart)];
+
+    let written = 0;
+    for (const target of targets) {
+      if (await this.env.CACHE.get(this.rollupKey(target)) !== null) {
+        continue;
+      }
+      const rollup = await this.foldDailyStats(target);
+      await this.env.CACHE.put(this.rollupKey(target), JSON.stringify(rollup), { expirationTtl: MonitoringService.ROLLUP_TTL_SECONDS });
+      written++;
+    }
+    return written;
+  }
+
+  private async foldDailyStats(target: RollupPeriod): Promise<UsageRollup> {
+    const dates = Array.from({ length: target.days }, (_, i) => isoDate(target.start + i * DAY_MS));
+    const days = await Promise.all(dates.map(date => this.getDailyStats(date)));
+    const rollup: UsageRollup = {
+      period: target.period,
+      granularity: target.granularity,
+      totalRequests: 0,
+      errors: 0,
+      responseTimeTotal: 0,
+      toolCalls: {}
+    };
+
+    for (const day of days) {
+      if (!day) {
+        continue;
+      }
+      rollup.totalRequests += day.totalRequests;
+      rollup.errors += day.errors;
+      rollup.responseTimeTotal += day.avgResponseTime * day.totalRequests;
+      for (const [tool, count] of Object.entries(day.toolCalls)) {
+        rollup.toolCalls[tool] = (rollup.toolCalls[tool] || 0) + count;
+      }
+    }
+    return rollup;
+  }
+
+  private rollupKey(target: RollupPeriod): string {
+    return `${MonitoringService.ROLLUP_PREFIX}${target.granularity}:${target.period}`;
   }
 
   private async storeEvent(event: UsageEvent): Promise<void> {
     const eventKey = `${MonitoringService.USAGE_PREFIX}${event.timestamp}:${Math.random().toString(36).substr(2, 9)}`;
     
-    // Store event with 7-day TTL
-    await this.env.CACHE.put(eventKey, JSON.stringify(event), { expirationTtl: 604800 });
+    // Store event with 7-day TTL. A copy rides along as metadata, so an
+    // export reads a thousand events per list call instead of one per get.
+    await this.env.CACHE.put(eventKey, JSON.stringify(event), {
+      expirationTtl: MonitoringService.EVENT_TTL_SECONDS,
+      metadata: this.eventMetadata(event)
+    });
+  }
+
+  private eventMetadata(event: UsageEvent): UsageEvent {
+    const metadata: UsageEvent = {
+      ...event,
+      userAgent: event.userAgent?.slice(0, MonitoringService.MAX_HEADER_CHARS),
+      origin: event.origin?.slice(0, MonitoringService.MAX_HEADER_CHARS)
+    };
+    if (JSON.stringify(metadata).length > MonitoringService.MAX_EVENT_METADATA_BYTES) {
+      // Headers are the only open-ended fields
+      delete metadata.userAgent;
+      delete metadata.origin;
+    }
+    return metadata;
+  }
+
+  /**
+   * Stream stored events, oldest first, as JSONL (one event per line) or
+   * as columnar chunks (one JSON object of arrays per list page). The
+   * stream always ends with an `{"_export": {...}}` line. When the export
+   * stopped early, at the page cap or the KV budget, `complete` is false
+   * and passing its `cursor` back with the same range resumes it.
+   */
+  exportEvents(options: EventExportOptions = {}): ReadableStream<Uint8Array> {
+    const format = options.format ?? 'jsonl';
+    const since = options.since ?? 0;
+    const until = options.until ?? Date.now();
+    const prefix = `${MonitoringService.USAGE_PREFIX}${sharedTimestampPrefix(since, until)}`;
+    // Pulls run as the client reads, which may be after the handler returned
+    const scheduler = SubrequestScheduler.current();
+    const encoder = new TextEncoder();
+    let cursor = options.cursor;
+    let pages = 0;
+    let exported = 0;
+    let skipped = 0;
+
+    const finish = (controller: ReadableStreamDefaultController<Uint8Array>, complete: boolean) => {
+      const summary = { complete, cursor: complete ? null : cursor ?? null, exported, skipped };
+      controller.enqueue(encoder.encode(`${JSON.stringify({ _export: summary })}\n`));
+      controller.close();
+    };
+
+    const nextPage = async (controller: ReadableStreamDefaultController<Uint8Array>) => {
+      const budget = scheduler?.available('kv', 'normal') ?? Infinity;
+      if (pages >= MonitoringService.MAX_EXPORT_PAGES || budget < 1) {
+        finish(controller, false);
+        return;
+      }
+
+      const page = await this.env.CACHE.list<UsageEvent>({ prefix, cursor });
+      pages++;
+
+      const events: UsageEvent[] = [];
+      let pastRange = false;
+      for (const key of page.keys) {
+        const timestamp = parseInt(key.name.slice(MonitoringService.USAGE_PREFIX.length), 10);
+        if (timestamp > until) {
+          // Keys list in timestamp order, so nothing after this is in range
+          pastRange = true;
+          break;
+        }
+        if (timestamp < since) {
+          continue;
+        }
+        if (key.metadata) {
+          events.push(key.metadata);
+        } else {
+          // Stored before events carried metadata
+          skipped++;
+        }
+      }
+      exported += events.length;
+
+      if (events.length > 0) {
+        const body = format === 'columns'
+          ? `${JSON.stringify({ count: events.length, columns: toColumns(events) })}\n`
+          : events.map(event => `${JSON.stringify(event)}\n`).join('');
+        controller.enqueue(encoder.encode(body));
+      }
+
+      if (pastRange || page.list_complete) {
+        finish(controller, true);
+        return;
+      }
+      cursor = page.cursor;
+    };
+
+    return new ReadableStream<Uint8Array>({
+      // One list page per pull, so a slow reader holds back the KV reads
+      pull: controller => scheduler ? scheduler.run(() => nextPage(controller)) : nextPage(controller)
+    });
   }
 
   private async checkForAlerts(event: UsageEvent): Promise<void> {
@@ -176,26 +384,79 @@ export class MonitoringService {
   }
 
   async getRecentStats(days: number = 7): Promise<DailyStats[]> {
-    const stats: DailyStats[] = [];
-    const today = new Date();
+    const now = Date.now();
+    const dates: string[] = [];
     
-    for (let i = 0; i < days; i++) {
-      const date = new Date(today);
-      date.setDate(date.getDate() - i);
-      const dateStr = date.toISOString().split('T')[0];
+    for (let i = days - 1; i >= 0; i--) {
+      dates.push(isoDate(now - i * DAY_MS));
+    }
+    
+    // Fan the reads out concurrently instead of awaiting each day in turn
+    const stats = await Promise.all(dates.map(date => this.getDailyStats(date)));
+    return stats.filter((day): day is DailyStats => day !== null); // Oldest first
+  }
+
+  /**
+   * Summarize an arbitrary trailing window of days.
+   * The window is covered by whole months and ISO weeks where possible,
+   * falling back to daily records only at the edges, so a 90-day window
+   * costs roughly 20 concurrent KV reads instead of 90. A period the cron
+   * job hasn't folded yet is read from its daily records instead.
+   */
+  async getWindowSummary(days: number): Promise<WindowSummary> {
+    const windowDays = Math.min(Math.max(Math.floor(days), 1), MonitoringService.MAX_WINDOW_DAYS);
+    const end = Date.now();
+    const start = end - (windowDays - 1) * DAY_MS;
+    const periods = decomposeWindow(start, end);
+    let kvReads = periods.length;
+
+    const rollups = await Promise.all(periods.map(async (target): Promise<UsageRollup | null> => {
+      if (target.granularity === 'day') {
+        return await this.foldDailyStats(target);
+      }
       
-      const dayStats = await this.getDailyStats(dateStr);
-      if (dayStats) {
-        stats.push(dayStats);
+      const stored = await this.env.CACHE.get(this.rollupKey(target));
+      if (stored) {
+        return JSON.parse(stored);
       }
-    }
+      kvReads += target.days;
+      return await this.foldDailyStats(target);
+    }));
+
+    const toolCalls: Record<string, number> = {};
+    let totalRequests = 0;
+    let totalErrors = 0;
+    let responseTimeTotal = 0;
     
-    return stats.reverse(); // Oldest first
+    for (const rollup of rollups) {
+      if (!rollup) {
+        continue;
+      }
+      totalRequests += rollup.totalRequests;
+      totalErrors += rollup.errors;
+      responseTimeTotal += rollup.responseTimeTotal;
+      for (const [tool, count] of Object.entries(rollup.toolCalls)) {
+        toolCalls[tool] = (toolCalls[tool] || 0) + count;
+      }
+    }
+
+    return {
+      days: windowDays,
+      from: isoDate(start),
+      to: isoDate(end),
+      totalRequests,
+      totalErrors,
+      errorRate: totalRequests > 0 ? (totalErrors / totalRequests) * 100 : 0,
+      avgResponseTime: totalRequests > 0 ? responseTimeTotal / totalRequests : 0,
+      toolCalls,
+      kvReads
+    };
   }
 
   async getUsageSummary(): Promise<UsageSummary> {
-    const today = await this.getDailyStats();
     const recent = await this.getRecentStats(7);
+    const todayDate = isoDate(Date.now());
+    const today = recent.find(day => day.date === todayDate) || null;
     
     const totalRequests = recent.reduce((sum, day) => sum + day.totalRequests, 0);
     const totalErrors = recent.reduce((sum, day) => sum + day.errors, 0);
@@ -213,7 +474,7 @@ export class MonitoringService {
         date: new Date().toISOString().split('T')[0],
         totalRequests: 0,
         uniqueIPs: 0,
-        toolCalls: { search_extensions: 0, get_extension_details: 0, get_extension_categories: 0 },
+        toolCalls: { search_extensions: 0, get_extension_details: 0, find_similar_extensions: 0, get_extension_categories: 0 },
         errors: 0,
         avgResponseTime: 0
       },
@@ -282,6 +543,113 @@ export class MonitoringService {
   }
 }
 
+/**
+ * Leading digits shared by every timestamp from since to until, so an
+ * export lists only the part of the keyspace that can be in range
+ */
+function sharedTimestampPrefix(since: number, until: number): string {
+  const from = String(Math.max(0, since));
+  const to = String(Math.max(0, until));
+  let shared = 0;
+  if (from.length === to.length) {
+    while (shared < from.length && from[shared] === to[shared]) {
+      shared++;
+    }
+  }
+  return from.slice(0, shared);
+}
+
+const EVENT_COLUMNS: Array<keyof UsageEvent> = [
+  'timestamp', 'ip', 'method', 'endpoint', 'userAgent', 'origin', 'success',
+  'responseTime', 'errorCode', 'tool', 'subrequests', 'kvOperations'
+];
+
+/**
+ * One array per field, with null where an event lacks it
+ */
+function toColumns(events: UsageEvent[]): Record<string, unknown[]> {
+  const columns: Record<string, unknown[]> = {};
+  for (const column of EVENT_COLUMNS) {
+    columns[column] = events.map(event => event[column] ?? null);
+  }
+  return columns;
+}
+
+function isoDate(timestamp: number): string {
+  return new Date(timestamp).toISOString().split('T')[0]; // YYYY-MM-DD
+}
+
+function isoMonth(timestamp: number): string {
+  return new Date(timestamp).toISOString().slice(0, 7); // YYYY-MM
+}
+
+function isoWeek(timestamp: number): string {
+  // ISO-8601 week: the week belongs to the year that contains its Thursday
+  const date = new Date(timestamp);
+  const thursday = new Date(Date.UTC(date.getUTCFullYear(), date.getUTCMonth(), date.getUTCDate()));
+  thursday.setUTCDate(thursday.getUTCDate() + 3 - ((thursday.getUTCDay() + 6) % 7));
+  const yearStart = Date.UTC(thursday.getUTCFullYear(), 0, 1);
+  const week = Math.floor((thursday.getTime() - yearStart) / DAY_MS / 7) + 1;
+  return `${thursday.getUTCFullYear()}-W${String(week).padStart(2, '0')}`;
+}
+
+/**
+ * The period of the given granularity starting at `start` (a UTC midnight
+ * that is the first day of a month, a Monday, or any day)
+ */
+function periodOf(granularity: RollupGranularity, start: number): RollupPeriod {
+  if (granularity === 'month') {
+    const date = new Date(start);
+    const days = new Date(Date.UTC(date.getUTCFullYear(), date.getUTCMonth() + 1, 0)).getUTCDate();
+    return { granularity, period: isoMonth(start), start, days };
+  }
+  if (granularity === 'week') {
+    return { granularity, period: isoWeek(start), start, days: 7 };
+  }
+  return { granularity, period: isoDate(start), start, days: 1 };
+}
+
+/**
+ * Cover the days from start to end (inclusive) with the fewest rollup records,
+ * greedily preferring whole months, then whole ISO weeks, then single days.
+ * Only periods that ended before today are rolled up; today is still counting.
+ */
+function decomposeWindow(start: number, end: number): RollupPeriod[] {
+  const periods: RollupPeriod[] = [];
+  const last = Date.parse(isoDate(end));
+  const sealed = Date.parse(isoDate(Date.now())) - DAY_MS;
+  let cursor = Date.parse(isoDate(start));
+
+  while (cursor <= last) {
+    const date = new Date(cursor);
+    const monthEnd = Date.UTC(date.getUTCFullYear(), date.getUTCMonth() + 1, 0);
+    const isMonday = date.getUTCDay() === 1;
+
+    if (date.getUTCDate() === 1 && monthEnd <= Math.min(last, sealed)) {
+      periods.push(periodOf('month', cursor));
+    } else if (isMonday && cursor + 6 * DAY_MS <= Math.min(last, sealed)) {
+      periods.push(periodOf('week', cursor));
+    } else {
+      periods.push(periodOf('day', cursor));
+    }
+    cursor += periods[periods.length - 1].days * DAY_MS;
+  }
+
+  return periods;
+}
+
+export interface WindowSummary {
+  days: number;
+  from: string;
+  to: string;
+  totalRequests: number;
+  totalErrors: number;
+  errorRate: number;
+  avgResponseTime: number;
+  toolCalls: Record<string, number>;
+  kvReads: number;
+}
+
 export interface UsageSummary {
   today: DailyStats;
   last7Days: {
@@ -4,6 +4,8 @@
  */
 
 import type { Env } from '../types/worker.js';
+import { LruCache } from '../utils/lru.js';
+import { BloomFilter } from '../utils/bloom.js';
 
 interface RateLimitEntry {
   count: number;
@@ -11,10 +13,41 @@ interface RateLimitEntry {
   firstRequest: number;
 }
 
+export type BlockReason = 'hourly_limit_exceeded' | 'daily_limit_exceeded';
+
+interface BlockedClient {
+  reason: BlockReason;
+  resetTime: number;
+  limit: number;
+}
+
+/**
+ * Blocked clients that no longer fit in the exact blocklist. Members are
+ * refused until the generation expires; only clients whose own window
+ * outlasts the generation are added, so nobody is held past their reset.
+ */
+interface OverflowGeneration {
+  filter: BloomFilter;
+  expiresAt: number;
+  limit: number;
+}
+
 export class RateLimiterService {
   private static readonly RATE_LIMIT_PREFIX = 'ratelimit:';
   private static readonly HOUR_MS = 60 * 60 * 1000;
   private static readonly DAY_MS = 24 * 60 * 60 * 1000;
+  private static readonly MAX_BLOCKED_CLIENTS = 10_000;
+  private static readonly OVERFLOW_WINDOW_MS = 10 * 60 * 1000;
+  private static readonly OVERFLOW_CAPACITY = 50_000;
+  private static readonly OVERFLOW_FALSE_POSITIVE_RATE = 0.001;
+
+  // Isolate-local negative cache: clients known to be over a limit are
+  // refused without touching KV until their window resets
+  private static blocked = new LruCache<string, BlockedClient>(
+    RateLimiterService.MAX_BLOCKED_CLIENTS,
+    (clientIP, client) => RateLimiterService.addToOverflow(clientIP, client)
+  );
+  private static overflow = new Map<BlockReason, OverflowGeneration>();
 
   constructor(private env: Env) {}
 
@@ -63,6 +96,12 @@ export class RateLimiterService {
         limit: Infinity
       };
     }
+
+    // Repeat offenders are answered from memory
+    const blocked = RateLimiterService.lookupBlocked(clientIP, now);
+    if (blocked) {
+      return blocked;
+    }
     
     // Check hourly limit
     const hourlyKey = `${RateLimiterService.RATE_LIMIT_PREFIX}hourly:${clientIP}`;
@@ -74,13 +113,11 @@ export class RateLimiterService {
     );
     
     if (!hourlyResult.allowed) {
-      return {
-        allowed: false,
+      return RateLimiterService.block(clientIP, {
         reason: 'hourly_limit_exceeded',
         resetTime: hourlyResult.resetTime,
-        remaining: 0,
         limit: hourlyLimit
-      };
+      });
     }
 
     // Check daily limit
@@ -93,13 +130,11 @@ export class RateLimiterService {
     );
     
     if (!dailyResult.allowed) {
-      return {
-        allowed: false,
+      return RateLimiterService.block(clientIP, {
         reason: 'daily_limit_exceeded',
         resetTime: dailyResult.resetTime,
-        remaining: 0,
         limit: dailyLimit
-      };
+      });
     }
 
     // Both limits passed, increment counters
@@ -115,6 +150,62 @@ export class RateLimiterService {
     };
   }
 
+  private static block(clientIP: string, client: BlockedClient): RateLimitResult {
+    RateLimiterService.blocked.set(clientIP, client);
+    return RateLimiterService.refusal(client);
+  }
+
+  private static lookupBlocked(clientIP: string, now: number): RateLimitResult | null {
+    const client = RateLimiterService.blocked.get(clientIP);
+    if (client) {
+      if (now < client.resetTime) {
+        return RateLimiterService.refusal(client);
+      }
+      RateLimiterService.blocked.delete(clientIP);
+      return null;
+    }
+
+    // Only populated once the exact blocklist overflows, so ordinary
+    // traffic never pays for the filter's false positives
+    for (const [reason, generation] of RateLimiterService.overflow) {
+      if (now >= generation.expiresAt) {
+        RateLimiterService.overflow.delete(reason);
+      } else if (generation.filter.has(clientIP)) {
+        return RateLimiterService.refusal({ reason, resetTime: generation.expiresAt, limit: generation.limit });
+      }
+    }
+    return null;
+  }
+
+  private static addToOverflow(clientIP: string, client: BlockedClient): void {
+    const now = Date.now();
+    let generation = RateLimiterService.overflow.get(client.reason);
+    if (!generation || now >= generation.expiresAt) {
+      generation = {
+        filter: BloomFilter.forCapacity(
+          RateLimiterService.OVERFLOW_CAPACITY,
+          RateLimiterService.OVERFLOW_FALSE_POSITIVE_RATE
+        ),
+        expiresAt: now + RateLimiterService.OVERFLOW_WINDOW_MS,
+        limit: client.limit
+      };
+      RateLimiterService.overflow.set(client.reason, generation);
+    }
+    if (client.resetTime >= generation.expiresAt) {
+      generation.filter.add(clientIP);
+    }
+  }
+
+  private static refusal(client: BlockedClient): RateLimitResult {
+    return {
+      allowed: false,
+      reason: client.reason,
+      resetTime: client.resetTime,
+      remaining: 0,
+      limit: client.limit
+    };
+  }
+
   private async checkLimit(
     key: string,
     limit: number,
@@ -228,7 +319,7 @@ export class RateLimiterService {
 
 export interface RateLimitResult {
   allowed: boolean;
-  reason: 'hourly_limit_exceeded' | 'daily_limit_exceeded' | null;
+  reason: BlockReason | null;
   resetTime: number;
   remaining: number;
   limit: number;
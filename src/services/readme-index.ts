@@ -0,0 +1,442 @@
+/**
+ * README Index Service
+ * Full-text search over extension READMEs. Each README is split into
+ * chunks that are gzipped and stored together under one KV key per
+ * package; a separate term index, sharded by term hash, maps terms to
+ * (package, chunk) postings. Queries read only the shards for their
+ * terms and decompress only the chunks of the hits they show.
+ *
+ * A README touches most shards, so fetched READMEs are first staged as
+ * their stored chunks and the shards are rewritten in bulk once enough
+ * are waiting, or the oldest has waited long enough. Only shards whose
+ * contents changed are written.
+ */
+
+import type { Env } from '../types/worker.js';
+import type { DirectusExtension } from '../types/directus.js';
+import { CatalogService } from './catalog.js';
+import { UpstreamClient } from './upstream.js';
+import { SubrequestScheduler } from './scheduler.js';
+import { gunzipText, gzipText } from '../utils/compression.js';
+import { chunkReadme, cleanReadme, highlightSnippet, readmeTerms } from '../utils/readme.js';
+
+// [package name, chunk number, term frequency in the chunk]
+type Posting = [string, number, number];
+type TermShard = Record<string, Posting[]>;
+
+interface IndexedReadme {
+  // Package version the README was taken from
+  version: string;
+  chunks: number;
+  // Term shards holding this README's postings, so re-indexing can clear them
+  shards: number[];
+  // Set while the README is waiting for the next flush: its chunks are
+  // stored but its postings (if any) are from an older version, or, when
+  // the package left the catalog, still to be removed
+  staged?: number;
+}
+
+interface ChunkMetadata {
+  // Byte offset of each gzipped chunk in the stored value, plus the end offset
+  offsets: number[];
+}
+
+export interface ReadmeHit {
+  extension: DirectusExtension;
+  score: number;
+  // Best-matching chunk, used for the snippet
+  chunk: number;
+}
+
+export interface ReadmeRefreshResult {
+  // READMEs fetched and staged this run
+  fetched: number;
+  // READMEs added to and removed from the term index by this run's flush
+  indexed: number;
+  removed: number;
+  // Staged READMEs waiting for the next flush
+  staged: number;
+  // Catalog entries still waiting to be fetched
+  remaining: number;
+}
+
+interface ReadmeUpdate {
+  name: string;
+  version: string;
+  readme: string;
+}
+
+const PACKUMENT_CONCURRENCY = 6;
+// Enough that a query's shards stay small to parse, few enough that one
+// README's terms don't mean a write per shard on every update
+const SHARD_COUNT = 64;
+
+export class ReadmeIndexService {
+  private static readonly DOCS_KEY = 'readme:docs';
+  private static readonly SHARD_PREFIX = 'readme:terms:';
+  private static readonly CHUNKS_PREFIX = 'readme:chunks:';
+  // READMEs fetched per cron run; the initial backfill takes many runs
+  private static readonly REFRESH_BATCH = 20;
+  // Staged READMEs that trigger a flush into the term shards, and the
+  // longest one may wait for it
+  private static readonly FLUSH_SIZE = 100;
+  private static readonly FLUSH_AGE_MS = 6 * 60 * 60 * 1000;
+  private static readonly MEMO_TTL_MS = 60_000;
+
+  // Isolate-local copies so repeated queries don't re-read KV
+  private static docsMemo: { docs: Record<string, IndexedReadme>; loadedAt: number } | null = null;
+  private static shardMemo = new Map<number, { shard: TermShard; loadedAt: number }>();
+  private catalog: CatalogService;
+
+  constructor(private env: Env) {
+    this.catalog = new CatalogService(env);
+  }
+
+  /**
+   * Catalog extensions whose READMEs contain every query term, best
+   * first. `allowed` restricts hits to the given package names.
+   */
+  async search(query: string, allowed: Set<string> | null = null): Promise<ReadmeHit[]> {
+    const terms = [...new Set(readmeTerms(query))];
+    const [docs, catalog] = await Promise.all([this.loadDocs(), this.catalog.load()]);
+    const documentCount = Object.values(docs).filter(doc => doc.staged === undefined).length;
+    if (documentCount === 0) {
+      throw new Error('README search needs the README index, which has not been built yet');
+    }
+    if (terms.length === 0) {
+      return [];
+    }
+
+    const shards = await Promise.all(terms.map(term => this.loadShard(shardOf(term))));
+    // Per package: chunk scores and how many query terms it contains
+    const chunkScores = new Map<string, Map<number, number>>();
+    const termCounts = new Map<string, number>();
+
+    terms.forEach((term, i) => {
+      // A staged README's postings belong to chunks that have been replaced
+      const postings = (shards[i][term] ?? []).filter(([name]) => docs[name]?.staged === undefined);
+      const names = new Set(postings.map(([name]) => name));
+      const idf = Math.log(1 + documentCount / Math.max(1, names.size));
+
+      for (const [name, chunk, frequency] of postings) {
+        if (allowed && !allowed.has(name)) {
+          continue;
+        }
+        let scores = chunkScores.get(name);
+        if (!scores) {
+          scores = new Map();
+          chunkScores.set(name, scores);
+        }
+        scores.set(chunk, (scores.get(chunk) ?? 0) + (1 + Math.log(frequency)) * idf);
+      }
+      for (const name of names) {
+        termCounts.set(name, (termCounts.get(name) ?? 0) + 1);
+      }
+    });
+
+    const hits: ReadmeHit[] = [];
+    for (const [name, scores] of chunkScores) {
+      const extension = catalog.entries[name];
+      if (!extension || termCounts.get(name) !== terms.length) {
+        continue;
+      }
+      let best = { chunk: 0, score: -1 };
+      for (const [chunk, score] of scores) {
+        if (score > best.score) {
+          best = { chunk, score };
+        }
+      }
+      hits.push({ extension, score: Math.round(best.score * 1000) / 1000, chunk: best.chunk });
+    }
+
+    return hits.sort((a, b) => b.score - a.score || a.extension.name.localeCompare(b.extension.name));
+  }
+
+  /**
+   * Highlighted excerpt from each hit's best chunk. Only these chunks are
+   * read and decompressed.
+   */
+  async snippets(hits: ReadmeHit[], query: string): Promise<Map<string, string>> {
+    const terms = [...new Set(readmeTerms(query))];
+    const snippets = new Map<string, string>();
+
+    await Promise.all(hits.map(async hit => {
+      const name = hit.extension.name;
+      const stored = await this.env.CACHE.getWithMetadata<ChunkMetadata>(
+        `${ReadmeIndexService.CHUNKS_PREFIX}${name}`,
+        'arrayBuffer'
+      );
+      const offsets = stored.metadata?.offsets;
+      if (!stored.value || !offsets || hit.chunk + 1 >= offsets.length) {
+        return;
+      }
+      const bytes = new Uint8Array(stored.value, offsets[hit.chunk], offsets[hit.chunk + 1] - offsets[hit.chunk]);
+      snippets.set(name, highlightSnippet(await gunzipText(bytes), terms));
+    }));
+
+    return snippets;
+  }
+
+  /**
+   * Bring the index in line with the catalog: fetch and stage a batch of
+   * new or updated READMEs, mark READMEs of removed packages, and flush
+   * the staged ones into the term index when enough have built up
+   */
+  async refresh(): Promise<ReadmeRefreshResult> {
+    const [catalog, docs] = await Promise.all([this.catalog.load({ fresh: true }), this.loadDocs({ fresh: true })]);
+    const now = Date.now();
+
+    let changed = false;
+    for (const [name, doc] of Object.entries(docs)) {
+      if (!catalog.entries[name] && doc.staged === undefined) {
+        doc.staged = now;
+        changed = true;
+      }
+    }
+    // Newest releases first, so fresh READMEs don't wait behind the backfill
+    const stale = Object.values(catalog.entries)
+      .filter(extension => docs[extension.name]?.version !== extension.version)
+      .sort((a, b) => b.date.localeCompare(a.date));
+    // Runs after catalog sync in the same invocation, so take only what its budget left over
+    const spare = SubrequestScheduler.current()?.available('subrequest', 'background') ?? Infinity;
+    const batch = stale.slice(0, Math.min(ReadmeIndexService.REFRESH_BATCH, spare));
+
+    const updates = await this.fetchReadmes(batch);
+    await this.stage(docs, updates, now);
+    changed ||= updates.length > 0;
+
+    const staged = Object.values(docs).filter(doc => doc.staged !== undefined);
+    const due = staged.length >= ReadmeIndexService.FLUSH_SIZE ||
+      staged.some(doc => now - doc.staged! >= ReadmeIndexService.FLUSH_AGE_MS);
+    let flushed = { indexed: 0, removed: 0 };
+    if (due) {
+      flushed = await this.flush(docs, catalog.entries);
+    } else if (changed) {
+      await this.saveDocs(docs);
+    }
+
+    return {
+      fetched: updates.length,
+      ...flushed,
+      staged: due ? 0 : staged.length,
+      remaining: stale.length - batch.length
+    };
+  }
+
+  private async fetchReadmes(extensions: DirectusExtension[]): Promise<ReadmeUpdate[]> {
+    const registry = UpstreamClient.forRegistry(this.env);
+    const updates: ReadmeUpdate[] = [];
+
+    for (let i = 0; i < extensions.length; i += PACKUMENT_CONCURRENCY) {
+      const chunk = extensions.slice(i, i + PACKUMENT_CONCURRENCY);
+      const results = await Promise.all(chunk.map(async extension => {
+        // Background work: no hedging, the extra subrequest isn't worth it here
+        const response = await registry.fetch(`/${encodeURIComponent(extension.name)}`, {
+          hedge: false,
+          priority: 'background'
+        });
+        if (response.status === 404) {
+          // Catalog sync will drop it; index it as empty so it isn't refetched meanwhile
+          return { name: extension.name, version: extension.version, readme: '' };
+        }
+        if (!response.ok) {
+          throw new Error(`npm registry API error: ${response.status} ${response.statusText}`);
+        }
+        const packument: any = await response.json();
+        return { name: extension.name, version: extension.version, readme: String(packument.readme ?? '') };
+      }));
+      updates.push(...results);
+    }
+
+    return updates;
+  }
+
+  /**
+   * Store each fetched README's compressed chunks and mark it staged. Its
+   * old postings stay in the shards, ignored by search, until the flush.
+   */
+  private async stage(docs: Record<string, IndexedReadme>, updates: ReadmeUpdate[], now: number): Promise<void> {
+    await Promise.all(updates.map(async update => {
+      const chunks = chunkReadme(cleanReadme(update.readme));
+      const compressed = await Promise.all(chunks.map(chunk => gzipText(chunk)));
+      const chunksKey = `${ReadmeIndexService.CHUNKS_PREFIX}${update.name}`;
+      if (compressed.length > 0) {
+        const offsets = [0];
+        for (const bytes of compressed) {
+          offsets.push(offsets[offsets.length - 1] + bytes.byteLength);
+        }
+        const value = new Uint8Array(offsets[offsets.length - 1]);
+        compressed.forEach((bytes, i) => value.set(bytes, offsets[i]));
+        const metadata: ChunkMetadata = { offsets };
+        await this.env.CACHE.put(chunksKey, value.buffer, { metadata });
+      } else if (docs[update.name]?.chunks) {
+        await this.env.CACHE.delete(chunksKey);
+      }
+
+      docs[update.name] = {
+        version: update.version,
+        chunks: chunks.length,
+        shards: docs[update.name]?.shards ?? [],
+        staged: now
+      };
+    }));
+  }
+
+  /**
+   * Move every staged README into the term index: clear its old postings,
+   * add postings from its stored chunks, and drop packages that left the
+   * catalog. Each touched shard is read once and written only if it changed.
+   */
+  private async flush(
+    docs: Record<string, IndexedReadme>,
+    catalog: Record<string, DirectusExtension>
+  ): Promise<{ indexed: number; removed: number }> {
+    const affected = Object.keys(docs).filter(name => docs[name].staged !== undefined);
+    const removed = affected.filter(name => !catalog[name]);
+    const indexed = affected.filter(name => catalog[name]);
+
+    const touched = new Set<number>();
+    for (const name of affected) {
+      for (const shard of docs[name].shards) {
+        touched.add(shard);
+      }
+    }
+    const postings = await Promise.all(indexed.map(name => this.chunkPostings(name, docs[name].chunks)));
+    for (const byShard of postings) {
+      for (const shard of byShard.keys()) {
+        touched.add(shard);
+      }
+    }
+
+    const shardNumbers = [...touched];
+    const stored = await Promise.all(shardNumbers.map(shard =>
+      this.env.CACHE.get(`${ReadmeIndexService.SHARD_PREFIX}${shard}`)
+    ));
+    const shardsByNumber = new Map<number, TermShard>(
+      shardNumbers.map((shard, i) => [shard, stored[i] ? JSON.parse(stored[i]!) : {}])
+    );
+
+    const affectedNames = new Set(affected);
+    const changedTerms = new Map<number, Set<string>>(shardNumbers.map(shard => [shard, new Set()]));
+    for (const [number, shard] of shardsByNumber) {
+      for (const term of Object.keys(shard)) {
+        const kept = shard[term].filter(([name]) => !affectedNames.has(name));
+        if (kept.length === shard[term].length) {
+          continue;
+        }
+        changedTerms.get(number)!.add(term);
+        if (kept.length > 0) {
+          shard[term] = kept;
+        } else {
+          delete shard[term];
+        }
+      }
+    }
+    indexed.forEach((name, i) => {
+      for (const [number, entries] of postings[i]) {
+        const shard = shardsByNumber.get(number)!;
+        for (const [term, posting] of entries) {
+          (shard[term] ??= []).push(posting);
+          changedTerms.get(number)!.add(term);
+        }
+      }
+      docs[name] = { version: docs[name].version, chunks: docs[name].chunks, shards: [...postings[i].keys()] };
+    });
+    // Canonical order, so re-indexing an unchanged README leaves its shards byte-identical
+    for (const [number, terms] of changedTerms) {
+      const shard = shardsByNumber.get(number)!;
+      for (const term of terms) {
+        shard[term]?.sort((a, b) => a[0] < b[0] ? -1 : a[0] > b[0] ? 1 : a[1] - b[1]);
+      }
+    }
+
+    await Promise.all(shardNumbers.map((number, i) => {
+      const contents = JSON.stringify(shardsByNumber.get(number));
+      return contents === (stored[i] ?? '{}')
+        ? Promise.resolve()
+        : this.env.CACHE.put(`${ReadmeIndexService.SHARD_PREFIX}${number}`, contents);
+    }));
+    await Promise.all(removed.map(name => this.env.CACHE.delete(`${ReadmeIndexService.CHUNKS_PREFIX}${name}`)));
+    for (const name of removed) {
+      delete docs[name];
+    }
+    // The docs list goes last: if a run dies midway, the next one redoes this flush
+    await this.saveDocs(docs);
+
+    const now = Date.now();
+    for (const [shard, contents] of shardsByNumber) {
+      ReadmeIndexService.shardMemo.set(shard, { shard: contents, loadedAt: now });
+    }
+    return { indexed: indexed.length, removed: removed.length };
+  }
+
+  /**
+   * Postings for a staged README, grouped by shard, rebuilt from its stored chunks
+   */
+  private async chunkPostings(name: string, chunkCount: number): Promise<Map<number, Array<[string, Posting]>>> {
+    const postings = new Map<number, Array<[string, Posting]>>();
+    if (chunkCount === 0) {
+      return postings;
+    }
+    const stored = await this.env.CACHE.getWithMetadata<ChunkMetadata>(
+      `${ReadmeIndexService.CHUNKS_PREFIX}${name}`,
+      'arrayBuffer'
+    );
+    const offsets = stored.metadata?.offsets;
+    if (!stored.value || !offsets) {
+      return postings;
+    }
+
+    for (let number = 0; number + 1 < offsets.length; number++) {
+      const bytes = new Uint8Array(stored.value, offsets[number], offsets[number + 1] - offsets[number]);
+      const frequencies = new Map<string, number>();
+      for (const term of readmeTerms(await gunzipText(bytes))) {
+        frequencies.set(term, (frequencies.get(term) ?? 0) + 1);
+      }
+      for (const [term, frequency] of frequencies) {
+        const shard = shardOf(term);
+        const list = postings.get(shard) ?? [];
+        list.push([term, [name, number, frequency]]);
+        postings.set(shard, list);
+      }
+    }
+    return postings;
+  }
+
+  private async saveDocs(docs: Record<string, IndexedReadme>): Promise<void> {
+    await this.env.CACHE.put(ReadmeIndexService.DOCS_KEY, JSON.stringify(docs));
+    ReadmeIndexService.docsMemo = { docs, loadedAt: Date.now() };
+  }
+
+  private async loadDocs(options: { fresh?: boolean } = {}): Promise<Record<string, IndexedReadme>> {
+    const memo = ReadmeIndexService.docsMemo;
+    if (!options.fresh && memo && Date.now() - memo.loadedAt < ReadmeIndexService.MEMO_TTL_MS) {
+      return memo.docs;
+    }
+    const stored = await this.env.CACHE.get(ReadmeIndexService.DOCS_KEY);
+    const docs: Record<string, IndexedReadme> = stored ? JSON.parse(stored) : {};
+    ReadmeIndexService.docsMemo = { docs, loadedAt: Date.now() };
+    return docs;
+  }
+
+  private async loadShard(shard: number, options: { fresh?: boolean } = {}): Promise<TermShard> {
+    const memo = ReadmeIndexService.shardMemo.get(shard);
+    if (!options.fresh && memo && Date.now() - memo.loadedAt < ReadmeIndexService.MEMO_TTL_MS) {
+      return memo.shard;
+    }
+    const stored = await this.env.CACHE.get(`${ReadmeIndexService.SHARD_PREFIX}${shard}`);
+    const contents: TermShard = stored ? JSON.parse(stored) : {};
+    ReadmeIndexService.shardMemo.set(shard, { shard: contents, loadedAt: Date.now() });
+    return contents;
+  }
+}
+
+function shardOf(term: string): number {
+  // FNV-1a
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < term.length; i++) {
+    hash ^= term.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193);
+  }
+  return (hash >>> 0) % SHARD_COUNT;
+}
@@ -0,0 +1,185 @@
+/**
+ * Subrequest Scheduler
+ * Workers cap the subrequests (50 on the free plan, 1000 on paid) and KV
+ * operations (1000) a single invocation may make, and allow six
+ * connections open at once. Each invocation gets a scheduler that counts
+ * both budgets and runs npm and KV calls through priority queues with
+ * bounded concurrency. Calls are refused before they would cross the
+ * limit, so fan-out degrades to cached or partial results instead of
+ * failing partway through, and background work yields to the request.
+ *
+ * A slot is held until the call's promise settles. For fetch that is
+ * when the response headers arrive, so reading the body afterwards is
+ * not counted against the six connections.
+ */
+
+import { AsyncLocalStorage } from 'node:async_hooks';
+import type { Env } from '../types/worker.js';
+import { MetricsService } from './metrics.js';
+
+export type Priority = 'critical' | 'normal' | 'background';
+export type BudgetKind = 'subrequest' | 'kv';
+
+export class BudgetExhaustedError extends Error {
+  constructor(message: string) {
+    super(message);
+    this.name = 'BudgetExhaustedError';
+  }
+}
+
+// Dispatch order when a connection slot frees up
+const PRIORITIES: Priority[] = ['critical', 'normal', 'background'];
+
+export class SubrequestScheduler {
+  static readonly DEFAULT_SUBREQUEST_LIMIT = 50;
+  static readonly DEFAULT_KV_LIMIT = 1000;
+  // Simultaneous open connections the runtime allows per invocation
+  static readonly MAX_CONCURRENCY = 6;
+  // Share of each budget held back from normal work, and twice that from
+  // background work, so the calls a response depends on can still run
+  private static readonly RESERVE_SHARE = 0.1;
+
+  private static readonly storage = new AsyncLocalStorage<SubrequestScheduler>();
+
+  private used: Record<BudgetKind, number> = { subrequest: 0, kv: 0 };
+  private active = 0;
+  private queues: Record<Priority, Array<() => void>> = { critical: [], normal: [], background: [] };
+
+  constructor(
+    private limits: Record<BudgetKind, number>,
+    private concurrency: number = SubrequestScheduler.MAX_CONCURRENCY
+  ) {}
+
+  /**
+   * Scheduler with the limits of the plan the Worker runs on. Paid plans
+   * set SUBREQUEST_LIMIT to 1000.
+   */
+  static forEnv(env: Env): SubrequestScheduler {
+    return new SubrequestScheduler({
+      subrequest: parseInt(env.SUBREQUEST_LIMIT || '', 10) || SubrequestScheduler.DEFAULT_SUBREQUEST_LIMIT,
+      kv: parseInt(env.KV_OPERATION_LIMIT || '', 10) || SubrequestScheduler.DEFAULT_KV_LIMIT
+    });
+  }
+
+  /**
+   * The scheduler of the invocation this code is running in, if any
+   */
+  static current(): SubrequestScheduler | undefined {
+    return SubrequestScheduler.storage.getStore();
+  }
+
+  /**
+   * Run an invocation with this scheduler as current. Everything it
+   * awaits, including waitUntil work it starts, shares the budget.
+   */
+  run<R>(callback: () => R): R {
+    return SubrequestScheduler.storage.run(this, callback);
+  }
+
+  consumed(kind: BudgetKind): number {
+    return this.used[kind];
+  }
+
+  remaining(kind: BudgetKind): number {
+    return this.limits[kind] - this.used[kind];
+  }
+
+  /**
+   * How many more calls of a kind work at this priority may make
+   */
+  available(kind: BudgetKind, priority: Priority = 'normal'): number {
+    const reserve = Math.ceil(this.limits[kind] * SubrequestScheduler.RESERVE_SHARE);
+    const held = priority === 'critical' ? 0 : priority === 'normal' ? reserve : reserve * 2;
+    return Math.max(0, this.remaining(kind) - held);
+  }
+
+  /**
+   * Run a call once a connection slot is free, charging `cost` against
+   * the budget up front. Throws BudgetExhaustedError, without running the
+   * call, when the budget for its priority is spent. The slot is freed
+   * when the call settles, not when a returned response body is consumed;
+   * holding it longer would leak slots on bodies nobody reads.
+   */
+  async schedule<T>(kind: BudgetKind, priority: Priority, call: () => Promise<T>, cost: number = 1): Promise<T> {
+    if (this.available(kind, priority) < cost) {
+      MetricsService.recordUpstreamEvent('budget_exhausted');
+      throw new BudgetExhaustedError(
+        `${kind} budget exhausted for ${priority} work (${this.remaining(kind)} of ${this.limits[kind]} left)`
+      );
+    }
+    this.used[kind] += cost;
+
+    await this.acquire(priority);
+    try {
+      return await call();
+    } finally {
+      this.release();
+    }
+  }
+
+  private acquire(priority: Priority): Promise<void> {
+    if (this.active < this.concurrency) {
+      this.active++;
+      return Promise.resolve();
+    }
+    return new Promise(resolve => this.queues[priority].push(resolve));
+  }
+
+  private release(): void {
+    for (const priority of PRIORITIES) {
+      const next = this.queues[priority].shift();
+      if (next) {
+        // Hand the slot straight to the next call
+        next();
+        return;
+      }
+    }
+    this.active--;
+  }
+}
+
+/**
+ * Run a call through the current invocation's scheduler, or directly
+ * outside of one (scripts, tests)
+ */
+export function scheduled<T>(
+  kind: BudgetKind,
+  priority: Priority,
+  call: () => Promise<T>,
+  cost: number = 1
+): Promise<T> {
+  const scheduler = SubrequestScheduler.current();
+  return scheduler ? scheduler.schedule(kind, priority, call, cost) : call();
+}
+
+const budgetedEnvs = new WeakMap<Env, Env>();
+
+/**
+ * The env with its KV namespace routed through the current scheduler.
+ * Reads run at critical priority, since responses depend on them; writes
+ * run at normal priority. CacheService already treats KV errors as cache
+ * misses and skipped writes, which is how cached data degrades when the
+ * budget runs low. Cached per env so the isolate's service container is
+ * reused.
+ */
+export function budgetedEnv(env: Env): Env {
+  let wrapped = budgetedEnvs.get(env);
+  if (!wrapped) {
+    wrapped = { ...env, CACHE: budgetedKv(env.CACHE) };
+    budgetedEnvs.set(env, wrapped);
+  }
+  return wrapped;
+}
+
+function budgetedKv(kv: KVNamespace): KVNamespace {
+  const through = (method: 'get' | 'getWithMetadata' | 'list' | 'put' | 'delete', priority: Priority) =>
+    (...args: unknown[]) => scheduled('kv', priority, () => (kv[method] as (...args: unknown[]) => Promise<unknown>)(...args));
+
+  return {
+    get: through('get', 'critical'),
+    getWithMetadata: through('getWithMetadata', 'critical'),
+    list: through('list', 'critical'),
+    put: through('put', 'normal'),
+    delete: through('delete', 'normal')
+  } as unknown as KVNamespace;
+}
@@ -0,0 +1,366 @@
+/**
+ * MCP Session Store
+ * An optional SESSIONS Durable Object, one instance per Mcp-Session-Id,
+ * that keeps the session's negotiated protocol version and its recent
+ * search result sets. A search stores a few pages beyond the one asked
+ * for, so follow-up pages and "result #3" lookups are answered from the
+ * session instead of the edge cache, KV or npm. Only initialize creates a
+ * session; other calls for an unknown or expired id are refused, and so
+ * are calls whose MCP-Protocol-Version differs from the negotiated one.
+ * Without the binding the server stays stateless.
+ */
+
+import type { Env } from '../types/worker.js';
+import type { DirectusExtension, ExtensionSearchResult, FacetCounts, NPMSearchResponse, SearchParams } from '../types/directus.js';
+import { scheduled } from './scheduler.js';
+
+interface StoredResultSet {
+  id: number;
+  // Search parameters other than offset and limit
+  key: string;
+  // Result position of the first stored object
+  offset: number;
+  count: number;
+  total: number;
+  time: string;
+  facets?: FacetCounts;
+}
+
+interface SessionMeta {
+  // Version agreed in initialize; later requests must not claim another
+  protocolVersion: string;
+  nextSetId: number;
+  // Most recently used first
+  sets: StoredResultSet[];
+}
+
+// Every op after initialize carries the request's MCP-Protocol-Version header, if any
+interface SessionRequest {
+  protocolVersion?: string;
+}
+
+interface RangeRequest extends SessionRequest {
+  key: string;
+  offset: number;
+  limit: number;
+}
+
+interface StoreRequest extends SessionRequest {
+  key: string;
+  offset: number;
+  response: NPMSearchResponse;
+}
+
+const META_KEY = 'meta';
+// Results per storage value; keeps each value well under the 128 KiB limit
+const CHUNK_SIZE = 25;
+// Results kept per search
+const MAX_RESULTS_PER_SET = 100;
+// Pages a search fetches on a session miss: the one asked for and the next two
+const WINDOW_PAGES = 3;
+
+/**
+ * A request the session refused, answered with an HTTP status rather
+ * than a JSON-RPC error
+ */
+export class SessionRejectedError extends Error {
+  constructor(message: string, readonly status: number) {
+    super(message);
+    this.name = 'SessionRejectedError';
+  }
+}
+
+export class UnknownSessionError extends SessionRejectedError {
+  constructor(sessionId: string) {
+    super(`Unknown or expired session: ${sessionId}`, 404);
+    this.name = 'UnknownSessionError';
+  }
+}
+
+export class ProtocolVersionMismatchError extends SessionRejectedError {
+  constructor(requested: string, negotiated: string) {
+    super(`MCP-Protocol-Version ${requested} does not match the version negotiated for this session (${negotiated})`, 400);
+    this.name = 'ProtocolVersionMismatchError';
+  }
+}
+
+/**
+ * Durable Object holding one MCP session. State is kept in memory while
+ * the object is warm and written through to storage; an alarm deletes it
+ * once the session has been idle for IDLE_TTL_MS.
+ */
+export class SessionManager implements DurableObject {
+  private static readonly IDLE_TTL_MS = 24 * 60 * 60 * 1000;
+  private static readonly MAX_RESULT_SETS = 4;
+
+  private meta: SessionMeta | null = null;
+  private results = new Map<number, ExtensionSearchResult[]>();
+
+  constructor(private state: DurableObjectState, env: Env) {}
+
+  async fetch(request: Request): Promise<Response> {
+    const op = new URL(request.url).pathname.slice(1);
+    const body: any = request.method === 'POST' ? await request.json() : {};
+
+    if (op === 'initialize') {
+      const meta = await this.loadMeta() ?? { protocolVersion: body.protocolVersion, nextSetId: 0, sets: [] };
+      meta.protocolVersion = body.protocolVersion;
+      await this.saveMeta(meta);
+      return Response.json({ ok: true });
+    }
+
+    // Every other call needs a session opened by initialize; nothing is stored for unknown ids
+    const meta = await this.loadMeta();
+    if (!meta) {
+      return new Response('Unknown session', { status: 404 });
+    }
+    if (body.protocolVersion && meta.protocolVersion && body.protocolVersion !== meta.protocolVersion) {
+      return Response.json({ negotiated: meta.protocolVersion }, { status: 409 });
+    }
+    switch (op) {
+      case 'results':
+        return Response.json({ response: await this.getResults(meta, body) });
+      case 'store':
+        await this.storeResults(meta, body);
+        return Response.json({ ok: true });
+      case 'result':
+        return Response.json({ extension: await this.getResult(meta, Number(body.position)) });
+      case 'end':
+        await this.clear();
+        return Response.json({ ok: true });
+      default:
+        return new Response('Not Found', { status: 400 });
+    }
+  }
+
+  async alarm(): Promise<void> {
+    await this.clear();
+  }
+
+  /**
+   * Results for a page of a search, if a stored set covers it
+   */
+  private async getResults(meta: SessionMeta, request: RangeRequest): Promise<NPMSearchResponse | null> {
+    const set = meta.sets.find(candidate => candidate.key === request.key);
+    if (!set || request.offset < set.offset) {
+      return null;
+    }
+    const end = Math.min(request.offset + request.limit, set.total);
+    if (end > set.offset + set.count) {
+      return null;
+    }
+
+    const objects = await this.loadResults(set);
+    this.promote(meta, set);
+    await this.saveMeta(meta);
+    return {
+      objects: objects.slice(request.offset - set.offset, end - set.offset),
+      total: set.total,
+      time: set.time,
+      ...(set.facets && { facets: set.facets })
+    };
+  }
+
+  /**
+   * Remember a page of results, extending the stored set for the same
+   * search when the page overlaps or follows it
+   */
+  private async storeResults(meta: SessionMeta, request: StoreRequest): Promise<void> {
+    const existing = meta.sets.find(candidate => candidate.key === request.key);
+
+    let offset = request.offset;
+    let objects = request.response.objects;
+    if (existing && request.offset >= existing.offset && request.offset <= existing.offset + existing.count) {
+      const kept = await this.loadResults(existing);
+      offset = existing.offset;
+      objects = kept.slice(0, request.offset - existing.offset).concat(objects);
+    }
+    // Keep the newest results when the set outgrows its cap
+    const overflow = Math.max(0, objects.length - MAX_RESULTS_PER_SET);
+    offset += overflow;
+    objects = objects.slice(overflow);
+
+    const set: StoredResultSet = {
+      id: meta.nextSetId++,
+      key: request.key,
+      offset,
+      count: objects.length,
+      total: request.response.total,
+      time: request.response.time,
+      ...(request.response.facets && { facets: request.response.facets })
+    };
+
+    const dropped = meta.sets.filter(candidate => candidate.key === request.key);
+    meta.sets = [set, ...meta.sets.filter(candidate => candidate.key !== request.key)];
+    dropped.push(...meta.sets.splice(SessionManager.MAX_RESULT_SETS));
+
+    const chunks: Record<string, ExtensionSearchResult[]> = {};
+    for (let i = 0; i < objects.length; i += CHUNK_SIZE) {
+      chunks[chunkKey(set.id, i / CHUNK_SIZE)] = objects.slice(i, i + CHUNK_SIZE);
+    }
+    this.results.set(set.id, objects);
+    await this.state.storage.put(chunks);
+    await this.saveMeta(meta);
+    await this.deleteSets(dropped);
+  }
+
+  /**
+   * The extension at a 1-based position in the most recent result set
+   */
+  private async getResult(
+    meta: SessionMeta,
+    position: number
+  ): Promise<DirectusExtension | null> {
+    const set = meta.sets[0];
+    const index = position - 1 - (set?.offset ?? 0);
+    if (!set || index < 0 || index >= set.count) {
+      return null;
+    }
+    const item = (await this.loadResults(set))[index];
+    // Results fetched ahead were stored without their download count
+    return item.pending ? item.package : { ...item.package, downloads: { monthly: item.downloads.monthly } };
+  }
+
+  private promote(meta: SessionMeta, set: StoredResultSet): void {
+    meta.sets = [set, ...meta.sets.filter(candidate => candidate !== set)];
+  }
+
+  private async loadMeta(): Promise<SessionMeta | null> {
+    if (!this.meta) {
+      this.meta = await this.state.storage.get<SessionMeta>(META_KEY) ?? null;
+    }
+    return this.meta;
+  }
+
+  private async saveMeta(meta: SessionMeta): Promise<void> {
+    this.meta = meta;
+    await this.state.storage.put(META_KEY, meta);
+    await this.state.storage.setAlarm(Date.now() + SessionManager.IDLE_TTL_MS);
+  }
+
+  private async loadResults(set: StoredResultSet): Promise<ExtensionSearchResult[]> {
+    const warm = this.results.get(set.id);
+    if (warm) {
+      return warm;
+    }
+    const keys = Array.from({ length: Math.ceil(set.count / CHUNK_SIZE) }, (_, chunk) => chunkKey(set.id, chunk));
+    const chunks = await this.state.storage.get<ExtensionSearchResult[]>(keys);
+    const objects = keys.flatMap(key => chunks.get(key) ?? []);
+    this.results.set(set.id, objects);
+    return objects;
+  }
+
+  private async deleteSets(sets: StoredResultSet[]): Promise<void> {
+    const keys = sets.flatMap(set => {
+      this.results.delete(set.id);
+      return Array.from({ length: Math.ceil(set.count / CHUNK_SIZE) }, (_, chunk) => chunkKey(set.id, chunk));
+    });
+    if (keys.length > 0) {
+      await this.state.storage.delete(keys);
+    }
+  }
+
+  private async clear(): Promise<void> {
+    this.meta = null;
+    this.results.clear();
+    await this.state.storage.deleteAlarm();
+    await this.state.storage.deleteAll();
+  }
+}
+
+function chunkKey(setId: number, chunk: number): string {
+  return `results:${setId}:${chunk}`;
+}
+
+/**
+ * Worker-side client for the SESSIONS namespace. Session calls are an
+ * optimization, so failures are logged and treated as a miss; only an
+ * unknown session id or a protocol version mismatch is reported, as a
+ * SessionRejectedError.
+ */
+export class SessionService {
+  constructor(private namespace: DurableObjectNamespace) {}
+
+  static forEnv(env: Env): SessionService | null {
+    return env.SESSIONS ? new SessionService(env.SESSIONS) : null;
+  }
+
+  async initialize(sessionId: string, protocolVersion: string): Promise<void> {
+    await this.call(sessionId, 'initialize', { protocolVersion });
+  }
+
+  /**
+   * The search to fetch on a session miss: the requested page plus the
+   * next few, which the session keeps for the following pages
+   */
+  window(params: SearchParams): SearchParams {
+    return { ...params, limit: Math.min((params.limit || 10) * WINDOW_PAGES, MAX_RESULTS_PER_SET) };
+  }
+
+  async getResults(sessionId: string, params: SearchParams, protocolVersion?: string): Promise<NPMSearchResponse | null> {
+    const reply = await this.call<{ response: NPMSearchResponse | null }>(sessionId, 'results', {
+      key: resultSetKey(params),
+      offset: params.offset || 0,
+      limit: params.limit || 10,
+      protocolVersion
+    });
+    return reply?.response ?? null;
+  }
+
+  async storeResults(
+    sessionId: string,
+    params: SearchParams,
+    response: NPMSearchResponse,
+    protocolVersion?: string
+  ): Promise<void> {
+    await this.call(sessionId, 'store', { key: resultSetKey(params), offset: params.offset || 0, response, protocolVersion });
+  }
+
+  /**
+   * The extension shown at a 1-based position in the session's latest search
+   */
+  async getResult(sessionId: string, position: number, protocolVersion?: string): Promise<DirectusExtension | null> {
+    const reply = await this.call<{ extension: DirectusExtension | null }>(sessionId, 'result', { position, protocolVersion });
+    return reply?.extension ?? null;
+  }
+
+  async end(sessionId: string): Promise<void> {
+    await this.call(sessionId, 'end', {});
+  }
+
+  private async call<T>(sessionId: string, op: string, body: unknown): Promise<T | null> {
+    try {
+      const stub = this.namespace.get(this.namespace.idFromName(sessionId));
+      const response = await scheduled('subrequest', 'critical', () => stub.fetch(`https://session/${op}`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(body)
+      }));
+      if (response.status === 404) {
+        throw new UnknownSessionError(sessionId);
+      }
+      if (response.status === 409) {
+        const { negotiated } = await response.json() as { negotiated: string };
+        throw new ProtocolVersionMismatchError(String((body as SessionRequest).protocolVersion), negotiated);
+      }
+      if (!response.ok) {
+        throw new Error(`session store error: ${response.status}`);
+      }
+      return await response.json() as T;
+    } catch (error) {
+      if (error instanceof SessionRejectedError) {
+        throw error;
+      }
+      console.error(`Session ${op} failed:`, error);
+      return null;
+    }
+  }
+}
+
+/**
+ * Identifies a search independent of the page requested
+ */
+function resultSetKey(params: SearchParams): string {
+  const { offset, limit, ...search } = params;
+  return JSON.stringify(Object.entries(search).filter(([, value]) => value !== undefined).sort(([a], [b]) => a.localeCompare(b)));
+}
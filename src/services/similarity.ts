@@ -0,0 +1,218 @@
+/**
+ * Similarity Service
+ * Finds extensions similar to a given one from a precomputed MinHash/LSH
+ * index over keywords, description shingles and dependencies. The cron
+ * sync rebuilds the index whenever the catalog revision changes and
+ * stores the signatures in KV, so lookups never touch npm.
+ */
+
+import type { Env } from '../types/worker.js';
+import type { DirectusExtension } from '../types/directus.js';
+import { CatalogService, type CatalogDocument } from './catalog.js';
+import { bandKeys, estimateSimilarity, isEmptySignature, minhashSignature } from '../utils/minhash.js';
+
+export interface SimilarExtension {
+  extension: DirectusExtension;
+  // Estimated Jaccard similarity of the two token sets, 0-1
+  similarity: number;
+}
+
+interface SimilarityIndex {
+  revision: number;
+  updatedAt: string;
+  // Catalog entries in name order; signature i belongs to entries[i]
+  entries: DirectusExtension[];
+  positions: Map<string, number>;
+  signatures: Uint32Array;
+  buckets: Map<string, number[]>;
+}
+
+interface StoredIndexMetadata {
+  revision: number;
+  updatedAt: string;
+  hashCount: number;
+}
+
+// Tags every extension carries; they say nothing about what it does
+const GENERIC_KEYWORDS = new Set(['directus', 'directus-extension', 'directus-extensions', 'extension', 'plugin']);
+
+// 32 bands of 2 rows: pairs at Jaccard 0.3 share a bucket ~95% of the time
+const HASH_COUNT = 64;
+const BANDS = 32;
+const ROWS = 2;
+
+const STOP_WORDS = new Set([
+  'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'into', 'is', 'it', 'of', 'on',
+  'or', 'that', 'the', 'this', 'to', 'with', 'your', 'you', 'directus', 'extension'
+]);
+
+export class SimilarityService {
+  private static readonly INDEX_KEY = 'similarity:signatures';
+  // Below this, shared tokens are mostly coincidence
+  private static readonly MIN_SIMILARITY = 0.1;
+
+  // Isolate-local index for the catalog revision it was built from
+  private static memo: SimilarityIndex | null = null;
+  private catalog: CatalogService;
+
+  constructor(private env: Env) {
+    this.catalog = new CatalogService(env);
+  }
+
+  /**
+   * Extensions most similar to the named one, best first. Returns null
+   * when the extension isn't in the catalog, and an empty list when it has
+   * no informative tokens to compare.
+   */
+  async findSimilar(name: string, limit: number): Promise<SimilarExtension[] | null> {
+    const index = await this.load();
+    const position = index.positions.get(name);
+    if (position === undefined) {
+      return null;
+    }
+
+    const signature = signatureAt(index.signatures, position);
+    if (isEmptySignature(signature)) {
+      return [];
+    }
+    const candidates = new Set<number>();
+    for (const key of bandKeys(signature, BANDS, ROWS)) {
+      for (const candidate of index.buckets.get(key) ?? []) {
+        if (candidate !== position) {
+          candidates.add(candidate);
+        }
+      }
+    }
+
+    const similar: SimilarExtension[] = [];
+    for (const candidate of candidates) {
+      const similarity = estimateSimilarity(signature, signatureAt(index.signatures, candidate));
+      if (similarity >= SimilarityService.MIN_SIMILARITY) {
+        similar.push({ extension: index.entries[candidate], similarity });
+      }
+    }
+
+    return similar
+      .sort((a, b) => b.similarity - a.similarity || a.extension.name.localeCompare(b.extension.name))
+      .slice(0, limit);
+  }
+
+  /**
+   * Rebuild and store the signatures if the catalog has changed since
+   * they were last built. Returns true when a new index was written.
+   */
+  async refresh(): Promise<boolean> {
+    const document = await this.catalog.load({ fresh: true });
+    // Listing returns the metadata without downloading the signatures
+    const { keys } = await this.env.CACHE.list<StoredIndexMetadata>({ prefix: SimilarityService.INDEX_KEY });
+    const stored = keys.find(key => key.name === SimilarityService.INDEX_KEY)?.metadata;
+    if (stored && isCurrent(stored, document) && stored.hashCount === HASH_COUNT) {
+      return false;
+    }
+
+    const index = buildIndex(document, null);
+    const metadata: StoredIndexMetadata = {
+      revision: document.revision,
+      updatedAt: document.updatedAt,
+      hashCount: HASH_COUNT
+    };
+    await this.env.CACHE.put(SimilarityService.INDEX_KEY, index.signatures.buffer as ArrayBuffer, { metadata });
+    SimilarityService.memo = index;
+    return true;
+  }
+
+  private async load(): Promise<SimilarityIndex> {
+    const document = await this.catalog.load();
+    const memo = SimilarityService.memo;
+    if (memo && isCurrent(memo, document)) {
+      return memo;
+    }
+
+    // Signatures are stored in catalog name order, so a matching revision
+    // means they line up with this document's entries
+    const stored = await this.env.CACHE.getWithMetadata<StoredIndexMetadata>(SimilarityService.INDEX_KEY, 'arrayBuffer');
+    const usable = stored.value && stored.metadata && isCurrent(stored.metadata, document) &&
+      stored.metadata.hashCount === HASH_COUNT;
+    if (!usable) {
+      // The cron hasn't caught up with this revision yet; build in memory until it does
+      console.error(`Similarity index is stale for catalog revision ${document.revision}, rebuilding in memory`);
+    }
+
+    SimilarityService.memo = buildIndex(document, usable ? new Uint32Array(stored.value!) : null);
+    return SimilarityService.memo;
+  }
+}
+
+function signatureAt(signatures: Uint32Array, position: number): Uint32Array {
+  return signatures.subarray(position * HASH_COUNT, (position + 1) * HASH_COUNT);
+}
+
+function isCurrent(built: { revision: number; updatedAt: string }, document: CatalogDocument): boolean {
+  return built.revision === document.revision && built.updatedAt === document.updatedAt;
+}
+
+function buildIndex(document: CatalogDocument, storedSignatures: Uint32Array | null): SimilarityIndex {
+  const entries = Object.values(document.entries).sort((a, b) => a.name < b.name ? -1 : a.name > b.name ? 1 : 0);
+
+  let signatures = storedSignatures;
+  if (!signatures || signatures.length !== entries.length * HASH_COUNT) {
+    signatures = new Uint32Array(entries.length * HASH_COUNT);
+    entries.forEach((extension, position) => {
+      signatures!.set(minhashSignature(similarityTokens(extension), HASH_COUNT), position * HASH_COUNT);
+    });
+  }
+
+  const positions = new Map<string, number>();
+  const buckets = new Map<string, number[]>();
+  entries.forEach((extension, position) => {
+    positions.set(extension.name, position);
+    const signature = signatureAt(signatures!, position);
+    // Extensions with no informative tokens would all share every bucket
+    if (isEmptySignature(signature)) {
+      return;
+    }
+    for (const key of bandKeys(signature, BANDS, ROWS)) {
+      const bucket = buckets.get(key);
+      if (bucket) {
+        bucket.push(position);
+      } else {
+        buckets.set(key, [position]);
+      }
+    }
+  });
+
+  return { revision: document.revision, updatedAt: document.updatedAt, entries, positions, signatures, buckets };
+}
+
+/**
+ * Tokens describing what an extension does: its keywords, two-word
+ * shingles of its description and its runtime dependencies. Prefixes
+ * keep a keyword from matching an identically-named dependency.
+ */
+export function similarityTokens(extension: DirectusExtension): string[] {
+  const tokens: string[] = [];
+
+  for (const keyword of extension.keywords) {
+    const normalized = keyword.trim().toLowerCase();
+    if (normalized && !GENERIC_KEYWORDS.has(normalized)) {
+      tokens.push(`k:${normalized}`);
+    }
+  }
+
+  const words = extension.description
+    .toLowerCase()
+    .split(/[^a-z0-9]+/)
+    .filter(word => word.length > 1 && !STOP_WORDS.has(word));
+  if (words.length === 1) {
+    tokens.push(`d:${words[0]}`);
+  }
+  for (let i = 0; i + 1 < words.length; i++) {
+    tokens.push(`d:${words[i]} ${words[i + 1]}`);
+  }
+
+  for (const dependency of extension.dependencies ?? []) {
+    tokens.push(`p:${dependency}`);
+  }
+
+  return tokens;
+}
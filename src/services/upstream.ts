@@ -0,0 +1,337 @@
+/**
+ * Upstream Client for npm registry calls
+ * Adds per-call deadlines, hedged requests, a circuit breaker per
+ * registry and failover to an optional mirror. Every attempt runs through
+ * the invocation's subrequest scheduler.
+ */
+
+import type { Env } from '../types/worker.js';
+import { MetricsService } from './metrics.js';
+import { BudgetExhaustedError, SubrequestScheduler, scheduled, type Priority } from './scheduler.js';
+
+export class CircuitOpenError extends Error {
+  constructor(message: string) {
+    super(message);
+    this.name = 'CircuitOpenError';
+  }
+}
+
+export class UpstreamTimeoutError extends Error {
+  constructor(message: string) {
+    super(message);
+    this.name = 'UpstreamTimeoutError';
+  }
+}
+
+export interface UpstreamRequestOptions {
+  headers?: Record<string, string>;
+  // Give up (and abort every attempt) after this long
+  deadlineMs?: number;
+  // Send a second request if the first is slower than the recent p95
+  hedge?: boolean;
+  // Scheduling priority against the subrequest budget (default: critical)
+  priority?: Priority;
+}
+
+interface BreakerState {
+  consecutiveFailures: number;
+  openUntil: number;
+  // Half-open: a single trial request is in flight
+  probing: boolean;
+}
+
+// How a request was let through the breaker
+type Admission = 'closed' | 'probe';
+
+interface Attempt {
+  base: string;
+  controller: AbortController;
+  admission: Admission;
+  // When the attempt left the scheduler's queue for the network; queue
+  // wait is local backpressure and says nothing about the registry
+  dispatchedAt: number | null;
+  // Set once the attempt's success or failure has been recorded
+  recorded: boolean;
+}
+
+export class UpstreamClient {
+  private static readonly DEFAULT_DEADLINE_MS = 8000;
+  private static readonly DEFAULT_HEDGE_DELAY_MS = 300;
+  private static readonly MIN_HEDGE_DELAY_MS = 50;
+  private static readonly MAX_HEDGE_DELAY_MS = 2000;
+  private static readonly LATENCY_WINDOW = 100;
+  private static readonly MIN_LATENCY_SAMPLES = 20;
+  private static readonly FAILURE_THRESHOLD = 5;
+  private static readonly OPEN_DURATION_MS = 30_000;
+
+  // Isolate-local health state, keyed by base URL
+  private static latencies = new Map<string, number[]>();
+  private static breakers = new Map<string, BreakerState>();
+
+  /**
+   * @param baseUrls Primary base URL first, then fallbacks in preference order
+   */
+  constructor(private baseUrls: string[]) {}
+
+  static forRegistry(env: Env): UpstreamClient {
+    const baseUrls = ['https://registry.npmjs.org'];
+    if (env.NPM_MIRROR_REGISTRY) {
+      baseUrls.push(env.NPM_MIRROR_REGISTRY.replace(/\/+$/, ''));
+    }
+    return new UpstreamClient(baseUrls);
+  }
+
+  /**
+   * True when every configured upstream is currently failing
+   */
+  get circuitOpen(): boolean {
+    return this.baseUrls.every(base => UpstreamClient.isOpen(base));
+  }
+
+  async fetch(path: string, options: UpstreamRequestOptions = {}): Promise<Response> {
+    let admitted: { base: string; admission: Admission } | null = null;
+    for (const base of this.baseUrls) {
+      const admission = UpstreamClient.admit(base);
+      if (admission) {
+        admitted = { base, admission };
+        break;
+      }
+    }
+    if (!admitted) {
+      MetricsService.recordUpstreamEvent('circuit_open');
+      throw new CircuitOpenError(`Circuit open for ${this.baseUrls[0]}, serving from cache only`);
+    }
+    const { base: primary, admission: primaryAdmission } = admitted;
+    if (primary !== this.baseUrls[0]) {
+      MetricsService.recordUpstreamEvent('failover');
+    }
+
+    // Hedge against a mirror when we have one, otherwise retry the same registry
+    const secondary = this.baseUrls.find(base => base !== primary && !UpstreamClient.isOpen(base)) ?? primary;
+    const deadlineMs = options.deadlineMs ?? UpstreamClient.DEFAULT_DEADLINE_MS;
+    const hedge = options.hedge ?? true;
+    const priority = options.priority ?? 'critical';
+    const headers = {
+      'User-Agent': 'directus-marketplace-search-mcp/1.0.0',
+      'Accept': 'application/json',
+      ...options.headers
+    };
+
+    return await new Promise<Response>((resolve, reject) => {
+      const attempts: Attempt[] = [];
+      let settled = false;
+      let pending = 0;
+      let lastError: unknown = null;
+      let lastFailedResponse: Response | null = null;
+      let hedgeTimer: ReturnType<typeof setTimeout> | undefined;
+
+      const finish = (winner: AbortController | null, response: Response | null, error?: unknown) => {
+        if (settled) {
+          return;
+        }
+        settled = true;
+        clearTimeout(deadlineTimer);
+        if (hedgeTimer) {
+          clearTimeout(hedgeTimer);
+        }
+        for (const attempt of attempts) {
+          if (attempt.controller !== winner) {
+            attempt.controller.abort();
+            // An abandoned trial request frees the half-open slot for the next one
+            UpstreamClient.releaseProbe(attempt);
+          }
+        }
+        if (response) {
+          resolve(response);
+        } else {
+          reject(error);
+        }
+      };
+
+      const attemptFailed = () => {
+        if (settled) {
+          return;
+        }
+        if (attempts.length < 2 && secondary !== primary && launchSecondary()) {
+          // Failed over right away instead of waiting for the hedge timer
+          MetricsService.recordUpstreamEvent('failover');
+        } else if (pending === 0) {
+          finish(null, lastFailedResponse, lastError);
+        }
+      };
+
+      const launch = (base: string, admission: Admission) => {
+        const controller = new AbortController();
+        const attempt: Attempt = { base, controller, admission, dispatchedAt: null, recorded: false };
+        attempts.push(attempt);
+        pending++;
+
+        scheduled('subrequest', priority, () => {
+          // Settled while waiting for a connection slot; don't go to the network at all
+          controller.signal.throwIfAborted();
+          attempt.dispatchedAt = Date.now();
+          return fetch(`${base}${path}`, { headers, signal: controller.signal });
+        })
+          .then(response => {
+            pending--;
+            const elapsed = Date.now() - attempt.dispatchedAt!;
+            MetricsService.recordUpstreamLatency(elapsed);
+
+            if (response.status >= 500 || response.status === 429) {
+              UpstreamClient.recordFailure(attempt);
+              lastFailedResponse = response;
+              lastError = new Error(`npm registry API error: ${response.status} ${response.statusText}`);
+              attemptFailed();
+              return;
+            }
+
+            UpstreamClient.recordSuccess(attempt, elapsed);
+            if (settled) {
+              // Lost the race; release the connection
+              response.body?.cancel();
+              return;
+            }
+            finish(controller, response);
+          })
+          .catch(error => {
+            pending--;
+            if (controller.signal.aborted) {
+              return;
+            }
+            if (error instanceof BudgetExhaustedError) {
+              // Not the registry's fault; give up unless another attempt is still running
+              UpstreamClient.releaseProbe(attempt);
+              lastError = error;
+              if (pending === 0) {
+                finish(null, lastFailedResponse, error);
+              }
+              return;
+            }
+            UpstreamClient.recordFailure(attempt);
+            lastError = error;
+            attemptFailed();
+          });
+      };
+
+      const deadlineTimer = setTimeout(() => {
+        MetricsService.recordUpstreamEvent('timeout');
+        // Attempts still queued behind local work never reached the registry;
+        // finish() aborts them and gives back a trial request's slot
+        for (const attempt of attempts) {
+          if (attempt.dispatchedAt !== null) {
+            UpstreamClient.recordFailure(attempt);
+          }
+        }
+        finish(null, null, new UpstreamTimeoutError(`npm registry did not respond within ${deadlineMs}ms`));
+      }, deadlineMs);
+
+      // The second attempt goes through the breaker too; a half-open
+      // registry gets no more than its one trial request
+      const launchSecondary = (): boolean => {
+        const admission = UpstreamClient.admit(secondary);
+        if (!admission) {
+          return false;
+        }
+        launch(secondary, admission);
+        return true;
+      };
+
+      launch(primary, primaryAdmission);
+
+      if (hedge) {
+        hedgeTimer = setTimeout(() => {
+          // A hedge is a luxury: only send it while background work could still afford one
+          const spare = SubrequestScheduler.current()?.available('subrequest', 'background') ?? 1;
+          if (!settled && attempts.length < 2 && spare >= 1 && launchSecondary()) {
+            MetricsService.recordUpstreamEvent('hedge');
+          }
+        }, UpstreamClient.hedgeDelay(primary));
+      }
+    });
+  }
+
+  private static hedgeDelay(base: string): number {
+    const samples = UpstreamClient.latencies.get(base);
+    if (!samples || samples.length < UpstreamClient.MIN_LATENCY_SAMPLES) {
+      return UpstreamClient.DEFAULT_HEDGE_DELAY_MS;
+    }
+    const sorted = [...samples].sort((a, b) => a - b);
+    const p95 = sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * 0.95))];
+    return Math.min(Math.max(p95, UpstreamClient.MIN_HEDGE_DELAY_MS), UpstreamClient.MAX_HEDGE_DELAY_MS);
+  }
+
+  /**
+   * True while requests to `base` are refused: the breaker is open, or
+   * half-open with its trial request in flight
+   */
+  private static isOpen(base: string): boolean {
+    const breaker = UpstreamClient.breakers.get(base);
+    return breaker !== undefined && (Date.now() < breaker.openUntil || breaker.probing);
+  }
+
+  /**
+   * Let a request through the breaker for `base`, or refuse it. Once the
+   * open period is over the breaker is half-open and admits exactly one
+   * trial request; its outcome closes or re-opens the breaker.
+   */
+  private static admit(base: string): Admission | null {
+    const breaker = UpstreamClient.breakers.get(base);
+    if (!breaker || breaker.openUntil === 0) {
+      return 'closed';
+    }
+    if (UpstreamClient.isOpen(base)) {
+      return null;
+    }
+    breaker.probing = true;
+    return 'probe';
+  }
+
+  /**
+   * Give back the half-open slot of a trial request that ended without an outcome
+   */
+  private static releaseProbe(attempt: Attempt): void {
+    if (attempt.admission !== 'probe' || attempt.recorded) {
+      return;
+    }
+    attempt.recorded = true;
+    const breaker = UpstreamClient.breakers.get(attempt.base);
+    if (breaker) {
+      breaker.probing = false;
+    }
+  }
+
+  private static recordSuccess(attempt: Attempt, latencyMs: number): void {
+    if (attempt.recorded) {
+      return;
+    }
+    attempt.recorded = true;
+    const base = attempt.base;
+    UpstreamClient.breakers.delete(base);
+
+    const samples = UpstreamClient.latencies.get(base) || [];
+    samples.push(latencyMs);
+    if (samples.length > UpstreamClient.LATENCY_WINDOW) {
+      samples.shift();
+    }
+    UpstreamClient.latencies.set(base, samples);
+  }
+
+  /**
+   * Count a failed attempt, at most once per attempt: the deadline and the
+   * attempt's own rejection can both report it
+   */
+  private static recordFailure(attempt: Attempt): void {
+    if (attempt.recorded) {
+      return;
+    }
+    attempt.recorded = true;
+    const breaker = UpstreamClient.breakers.get(attempt.base) || { consecutiveFailures: 0, openUntil: 0, probing: false };
+    breaker.consecutiveFailures++;
+    if (attempt.admission === 'probe' || breaker.consecutiveFailures >= UpstreamClient.FAILURE_THRESHOLD) {
+      // A failed trial request re-opens the breaker straight away
+      breaker.openUntil = Date.now() + UpstreamClient.OPEN_DURATION_MS;
+      breaker.probing = false;
+    }
+    UpstreamClient.breakers.set(attempt.base, breaker);
+  }
+}
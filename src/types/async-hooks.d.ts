@@ -0,0 +1,8 @@
+// The part of node:async_hooks that nodejs_compat provides and we use.
+// Node's own typings aren't loaded, since they clash with the Workers globals.
+declare module 'node:async_hooks' {
+  export class AsyncLocalStorage<T> {
+    getStore(): T | undefined;
+    run<R>(store: T, callback: () => R): R;
+  }
+}
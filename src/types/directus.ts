@@ -21,6 +21,22 @@ export interface DirectusExtension {
     bugs?: string;
     npm: string;
   };
+  // Attached from the npm downloads API when available
+  downloads?: {
+    monthly: number;
+  };
+  // From the "directus:extension" block of the latest version's package.json
+  extension?: DirectusExtensionMeta;
+  // Runtime dependency names of the latest version
+  dependencies?: string[];
+}
+
+export interface DirectusExtensionMeta {
+  // Extension type as declared by the package: interface, display, bundle, ...
+  type?: string;
+  // Semver range of Directus versions the extension supports
+  host?: string;
+  sandbox?: boolean;
 }
 
 export interface ExtensionSearchResult {
@@ -32,20 +48,41 @@ export interface ExtensionSearchResult {
   updated: string;
   searchScore: number;
   package: DirectusExtension;
+  // Highlighted README excerpt, for README searches
+  highlight?: string;
+  // Fetched ahead for a session without its download count or snippet;
+  // chunk is the README chunk the snippet comes from
+  pending?: { chunk?: number };
 }
 
 export interface NPMSearchResponse {
   objects: ExtensionSearchResult[];
   total: number;
   time: string;
+  // Only for catalog searches that asked for facet counts
+  facets?: FacetCounts;
 }
 
+export type FacetName = 'type' | 'sandbox' | 'license' | 'host_major' | 'publisher';
+
+// Facet value -> number of matching extensions, most common first
+export type FacetCounts = Partial<Record<FacetName, Record<string, number>>>;
+
 export interface SearchParams {
   query: string;
   category?: ExtensionCategory;
   limit?: number;
   offset?: number;
   sort?: SortOption;
+  // Directus version (e.g. "11" or "10.8.3") the extension's host range must accept
+  compatibleWith?: string;
+  sandbox?: boolean;
+  license?: string;
+  publisher?: string;
+  // Return per-facet counts alongside the hits
+  facets?: boolean;
+  // Match the query against README text instead of name, description and keywords
+  readme?: boolean;
 }
 
 export type ExtensionCategory = 
@@ -61,10 +98,40 @@ export type ExtensionCategory =
 
 export type SortOption = 'relevance' | 'downloads' | 'updated' | 'created';
 
+export type OutputFormat = 'markdown' | 'json';
+
+export type ExtensionField =
+  | 'name'
+  | 'version'
+  | 'description'
+  | 'keywords'
+  | 'publisher'
+  | 'license'
+  | 'date'
+  | 'homepage'
+  | 'repository'
+  | 'npm'
+  | 'downloads'
+  | 'type'
+  | 'host'
+  | 'sandbox';
+
+export interface OutputOptions {
+  output: OutputFormat;
+  fields: ExtensionField[];
+}
+
 export interface CacheEntry<T> {
   data: T;
   timestamp: number;
   ttl: number;
+  // Upstream validators used to revalidate the entry once it expires
+  validators?: UpstreamValidators;
+}
+
+export interface UpstreamValidators {
+  etag?: string;
+  lastModified?: string;
 }
 
 export interface SearchCacheKey {
@@ -73,4 +140,10 @@ export interface SearchCacheKey {
   limit: number;
   offset: number;
   sort: SortOption;
+  compatibleWith?: string;
+  sandbox?: boolean;
+  license?: string;
+  publisher?: string;
+  facets?: boolean;
+  readme?: boolean;
 }
\ No newline at end of file
@@ -7,9 +7,29 @@ export interface Env {
   ENVIRONMENT: string;
   DIRECTUS_API_TOKEN?: string;
   DISABLE_RATE_LIMITING?: string;
+  // Byte budget for a single tool result before it is truncated and paginated
+  MAX_RESPONSE_BYTES?: string;
+  
+  // Fallback npm registry used when registry.npmjs.org is slow or failing (optional)
+  NPM_MIRROR_REGISTRY?: string;
+  
+  // Catalog sync (optional) - point at a CouchDB-style stand-in for local runs
+  NPM_REPLICATE_URL?: string;
+  NPM_CHANGES_INCLUDE_DOCS?: string;
+  
+  // Per-invocation budgets (optional) - defaults match the free plan; set
+  // SUBREQUEST_LIMIT to 1000 on paid plans
+  SUBREQUEST_LIMIT?: string;
+  KV_OPERATION_LIMIT?: string;
   
   // Analytics (optional)
   ANALYTICS?: AnalyticsEngineDataset;
+  // Bearer token for /admin/events, which exports client IPs; the
+  // endpoint refuses every request while this is unset
+  ADMIN_TOKEN?: string;
+  
+  // MCP session store (optional) - SessionManager Durable Object namespace
+  SESSIONS?: DurableObjectNamespace;
 }
 
 // Extension binding for Cloudflare Workers
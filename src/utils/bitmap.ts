@@ -0,0 +1,179 @@
+/**
+ * Immutable bitmap over a fixed universe [0, size)
+ * Sets are stored either as a sorted index array (sparse) or as packed
+ * 32-bit words (dense), whichever is smaller, so thousands of rarely-used
+ * facet values (publishers, licenses) stay cheap while common ones get
+ * word-at-a-time intersections and popcounts.
+ */
+
+export class Bitmap {
+  private constructor(
+    readonly size: number,
+    // Exactly one of these is set
+    private words: Uint32Array | null,
+    private indices: Uint32Array | null
+  ) {}
+
+  /**
+   * @param indices Member positions; need not be sorted or unique
+   */
+  static fromIndices(indices: Iterable<number>, size: number): Bitmap {
+    const sorted = Uint32Array.from(new Set(indices)).sort();
+    if (isSparse(sorted.length, size)) {
+      return new Bitmap(size, null, sorted);
+    }
+    const words = new Uint32Array(wordCount(size));
+    for (const index of sorted) {
+      words[index >>> 5] |= 1 << (index & 31);
+    }
+    return new Bitmap(size, words, null);
+  }
+
+  static full(size: number): Bitmap {
+    const words = new Uint32Array(wordCount(size)).fill(0xffffffff);
+    // Clear the bits past the end of the universe
+    if (size % 32 !== 0) {
+      words[words.length - 1] = (1 << (size % 32)) - 1;
+    }
+    return new Bitmap(size, words, null);
+  }
+
+  has(index: number): boolean {
+    if (this.words) {
+      return (this.words[index >>> 5] & (1 << (index & 31))) !== 0;
+    }
+    return binarySearch(this.indices!, index);
+  }
+
+  get cardinality(): number {
+    return this.words ? popcountWords(this.words) : this.indices!.length;
+  }
+
+  and(other: Bitmap): Bitmap {
+    if (this.words && other.words) {
+      const words = new Uint32Array(this.words.length);
+      for (let i = 0; i < words.length; i++) {
+        words[i] = this.words[i] & other.words[i];
+      }
+      return Bitmap.compact(this.size, words);
+    }
+    // At least one side is sparse: keep its members that the other side has
+    const [sparse, rest] = this.indices ? [this, other] : [other, this];
+    return new Bitmap(this.size, null, sparse.indices!.filter(index => rest.has(index)));
+  }
+
+  or(other: Bitmap): Bitmap {
+    if (this.indices && other.indices) {
+      return Bitmap.fromIndices([...this.indices, ...other.indices], this.size);
+    }
+    const words = new Uint32Array(wordCount(this.size));
+    for (const bitmap of [this, other]) {
+      if (bitmap.words) {
+        for (let i = 0; i < words.length; i++) {
+          words[i] |= bitmap.words[i];
+        }
+      } else {
+        for (const index of bitmap.indices!) {
+          words[index >>> 5] |= 1 << (index & 31);
+        }
+      }
+    }
+    return new Bitmap(this.size, words, null);
+  }
+
+  /**
+   * Size of the intersection, without building it
+   */
+  andCardinality(other: Bitmap): number {
+    if (this.words && other.words) {
+      let count = 0;
+      for (let i = 0; i < this.words.length; i++) {
+        count += popcount(this.words[i] & other.words[i]);
+      }
+      return count;
+    }
+    const [sparse, rest] = this.indices ? [this, other] : [other, this];
+    let count = 0;
+    for (const index of sparse.indices!) {
+      if (rest.has(index)) {
+        count++;
+      }
+    }
+    return count;
+  }
+
+  /**
+   * Member positions in ascending order
+   */
+  toArray(): number[] {
+    if (this.indices) {
+      return Array.from(this.indices);
+    }
+    const result: number[] = [];
+    this.words!.forEach((word, wordIndex) => {
+      while (word !== 0) {
+        const bit = 31 - Math.clz32(word & -word);
+        result.push(wordIndex * 32 + bit);
+        word &= word - 1;
+      }
+    });
+    return result;
+  }
+
+  // Switch an intersection result to the sparse form once it gets small
+  private static compact(size: number, words: Uint32Array): Bitmap {
+    const count = popcountWords(words);
+    if (!isSparse(count, size)) {
+      return new Bitmap(size, words, null);
+    }
+    const indices = new Uint32Array(count);
+    let next = 0;
+    words.forEach((word, wordIndex) => {
+      while (word !== 0) {
+        indices[next++] = wordIndex * 32 + (31 - Math.clz32(word & -word));
+        word &= word - 1;
+      }
+    });
+    return new Bitmap(size, null, indices);
+  }
+}
+
+function wordCount(size: number): number {
+  return Math.ceil(size / 32);
+}
+
+// An index array costs 4 bytes per member; packed words cost size / 8 bytes
+function isSparse(members: number, size: number): boolean {
+  return members * 32 < size;
+}
+
+function popcount(word: number): number {
+  word = word - ((word >>> 1) & 0x55555555);
+  word = (word & 0x33333333) + ((word >>> 2) & 0x33333333);
+  return (Math.imul((word + (word >>> 4)) & 0x0f0f0f0f, 0x01010101) >>> 24);
+}
+
+function popcountWords(words: Uint32Array): number {
+  let count = 0;
+  for (let i = 0; i < words.length; i++) {
+    count += popcount(words[i]);
+  }
+  return count;
+}
+
+function binarySearch(sorted: Uint32Array, value: number): boolean {
+  let low = 0;
+  let high = sorted.length - 1;
+  while (low <= high) {
+    const middle = (low + high) >>> 1;
+    if (sorted[middle] === value) {
+      return true;
+    }
+    if (sorted[middle] < value) {
+      low = middle + 1;
+    } else {
+      high = middle - 1;
+    }
+  }
+  return false;
+}
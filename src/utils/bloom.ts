@@ -0,0 +1,63 @@
+/**
+ * Fixed-size Bloom filter over strings
+ * Answers "definitely not added" or "probably added" in constant memory
+ */
+
+export class BloomFilter {
+  private bits: Uint32Array;
+  private readonly bitCount: number;
+
+  /**
+   * @param bitCount Filter size in bits (rounded up to a multiple of 32)
+   * @param hashCount Number of bit positions set per item
+   */
+  constructor(bitCount: number, private hashCount: number) {
+    this.bits = new Uint32Array(Math.ceil(bitCount / 32));
+    this.bitCount = this.bits.length * 32;
+  }
+
+  /**
+   * Size a filter for an expected item count and false-positive rate
+   */
+  static forCapacity(expectedItems: number, falsePositiveRate: number): BloomFilter {
+    const bitCount = Math.ceil(-expectedItems * Math.log(falsePositiveRate) / (Math.LN2 * Math.LN2));
+    const hashCount = Math.max(1, Math.round(bitCount / expectedItems * Math.LN2));
+    return new BloomFilter(bitCount, hashCount);
+  }
+
+  add(item: string): void {
+    const [h1, h2] = hashPair(item);
+    for (let i = 0; i < this.hashCount; i++) {
+      const bit = ((h1 + Math.imul(i, h2)) >>> 0) % this.bitCount;
+      this.bits[bit >>> 5] |= 1 << (bit & 31);
+    }
+  }
+
+  has(item: string): boolean {
+    const [h1, h2] = hashPair(item);
+    for (let i = 0; i < this.hashCount; i++) {
+      const bit = ((h1 + Math.imul(i, h2)) >>> 0) % this.bitCount;
+      if ((this.bits[bit >>> 5] & (1 << (bit & 31))) === 0) {
+        return false;
+      }
+    }
+    return true;
+  }
+}
+
+/**
+ * Two independent 32-bit FNV-1a hashes, combined by the caller
+ * (Kirsch-Mitzenmacher double hashing) into k bit positions
+ */
+function hashPair(item: string): [number, number] {
+  let h1 = 0x811c9dc5;
+  let h2 = 0x01000193 ^ 0x5bd1e995;
+  for (let i = 0; i < item.length; i++) {
+    const code = item.charCodeAt(i);
+    h1 = Math.imul(h1 ^ code, 0x01000193);
+    h2 = Math.imul(h2 ^ code, 0x5bd1e995);
+    h2 ^= h2 >>> 15;
+  }
+  // An odd step keeps the probe sequence from collapsing onto one bit
+  return [h1 >>> 0, (h2 | 1) >>> 0];
+}
@@ -0,0 +1,149 @@
+/**
+ * Response compression negotiated from Accept-Encoding, plus gzip helpers
+ * for compressed KV storage
+ */
+
+import { LruCache } from './lru.js';
+
+export type ContentEncoding = 'br' | 'gzip' | 'deflate';
+
+// Small payloads grow or barely shrink when compressed
+const MIN_COMPRESS_BYTES = 1024;
+
+// Preference order when the client weights encodings equally
+const SUPPORTED_ENCODINGS: ContentEncoding[] = ['br', 'gzip', 'deflate'];
+// Encodings we can produce bytes for ourselves; brotli is left to the runtime
+const STREAM_ENCODINGS: ContentEncoding[] = ['gzip', 'deflate'];
+
+// Compressed copies of fixed bodies, keyed by encoding and caller key
+const precompressed = new LruCache<string, Promise<Uint8Array>>(128);
+
+/**
+ * Pick the best encoding the client accepts, honouring q-values
+ */
+export function negotiateEncoding(
+  acceptEncoding: string | null,
+  supported: ContentEncoding[] = SUPPORTED_ENCODINGS
+): ContentEncoding | null {
+  if (!acceptEncoding) {
+    return null;
+  }
+
+  const weights = new Map<string, number>();
+  for (const part of acceptEncoding.split(',')) {
+    const [token, ...params] = part.trim().toLowerCase().split(';');
+    if (!token) {
+      continue;
+    }
+    const qParam = params.map(param => param.trim()).find(param => param.startsWith('q='));
+    const q = qParam ? parseFloat(qParam.slice(2)) : 1;
+    weights.set(token, Number.isNaN(q) ? 0 : q);
+  }
+
+  let best: ContentEncoding | null = null;
+  let bestWeight = 0;
+  for (const encoding of supported) {
+    const weight = weights.get(encoding) ?? weights.get('*') ?? 0;
+    if (weight > bestWeight) {
+      best = encoding;
+      bestWeight = weight;
+    }
+  }
+
+  return best;
+}
+
+/**
+ * Build a response whose body is compressed for the requesting client
+ */
+export function compressedResponse(
+  request: Request,
+  body: string | Uint8Array,
+  init: { status?: number; headers: Record<string, string> }
+): Response {
+  const bytes = typeof body === 'string' ? new TextEncoder().encode(body) : body;
+  const headers: Record<string, string> = { ...init.headers };
+  headers['Vary'] = headers['Vary'] ? `${headers['Vary']}, Accept-Encoding` : 'Accept-Encoding';
+
+  const encoding = bytes.byteLength >= MIN_COMPRESS_BYTES
+    ? negotiateEncoding(request.headers.get('Accept-Encoding'))
+    : null;
+
+  if (!encoding) {
+    return new Response(bytes, { status: init.status, headers });
+  }
+
+  headers['Content-Encoding'] = encoding;
+
+  if (encoding === 'br') {
+    // CompressionStream has no brotli; the runtime encodes the body itself
+    // from the Content-Encoding header (encodeBody: 'automatic')
+    return new Response(bytes, { status: init.status, headers });
+  }
+
+  const stream = new Blob([bytes]).stream().pipeThrough(new CompressionStream(encoding));
+  return new Response(stream, {
+    status: init.status,
+    headers,
+    encodeBody: 'manual'
+  });
+}
+
+/**
+ * Like compressedResponse, for a body that is the same for every request
+ * with the same key: it is compressed once per isolate and the bytes are
+ * reused. Gzip is preferred over brotli here, since only the runtime can
+ * encode brotli and it would do so on every response; clients that accept
+ * neither gzip nor deflate get the usual compressedResponse.
+ */
+export async function precompressedResponse(
+  request: Request,
+  key: string,
+  body: Uint8Array,
+  init: { status?: number; headers: Record<string, string> }
+): Promise<Response> {
+  const encoding = body.byteLength >= MIN_COMPRESS_BYTES
+    ? negotiateEncoding(request.headers.get('Accept-Encoding'), STREAM_ENCODINGS)
+    : null;
+  if (!encoding || encoding === 'br') {
+    return compressedResponse(request, body, init);
+  }
+
+  const cacheKey = `${encoding}:${key}`;
+  let compressed = precompressed.get(cacheKey);
+  if (!compressed) {
+    compressed = compressBytes(body, encoding);
+    precompressed.set(cacheKey, compressed);
+    compressed.catch(() => precompressed.delete(cacheKey));
+  }
+
+  const headers: Record<string, string> = { ...init.headers };
+  headers['Vary'] = headers['Vary'] ? `${headers['Vary']}, Accept-Encoding` : 'Accept-Encoding';
+  headers['Content-Encoding'] = encoding;
+  return new Response(await compressed, {
+    status: init.status,
+    headers,
+    encodeBody: 'manual'
+  });
+}
+
+async function compressBytes(bytes: Uint8Array, encoding: 'gzip' | 'deflate'): Promise<Uint8Array> {
+  const stream = new Blob([bytes]).stream().pipeThrough(new CompressionStream(encoding));
+  return new Uint8Array(await new Response(stream).arrayBuffer());
+}
+
+/**
+ * Gzip text for storage
+ */
+export async function gzipText(text: string): Promise<Uint8Array> {
+  const stream = new Blob([text]).stream().pipeThrough(new CompressionStream('gzip'));
+  return new Uint8Array(await new Response(stream).arrayBuffer());
+}
+
+/**
+ * Inverse of gzipText
+ */
+export async function gunzipText(bytes: Uint8Array): Promise<string> {
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+  return await new Response(stream).text();
+}
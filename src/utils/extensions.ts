@@ -0,0 +1,97 @@
+/**
+ * Directus extension helpers shared by search, details and catalog sync
+ */
+
+import type { DirectusExtension, DirectusExtensionMeta } from '../types/directus.js';
+
+/**
+ * Decide whether an npm package is a Directus extension, based on its
+ * keywords or, failing that, its name
+ */
+export function isDirectusExtension(pkg: { name: string; keywords?: string[] }): boolean {
+  // Check if package has directus-extension keyword
+  const hasDirectusKeyword = pkg.keywords?.some(keyword =>
+    keyword.includes('directus-extension') ||
+    keyword.includes('directus-custom') ||
+    keyword.includes('directus-theme')
+  );
+
+  // Check if package name indicates it's a Directus extension
+  const hasDirectusName = pkg.name.includes('directus') &&
+    (pkg.name.includes('extension') ||
+     pkg.name.includes('interface') ||
+     pkg.name.includes('display') ||
+     pkg.name.includes('layout') ||
+     pkg.name.includes('panel') ||
+     pkg.name.includes('module') ||
+     pkg.name.includes('hook') ||
+     pkg.name.includes('theme'));
+
+  return Boolean(hasDirectusKeyword || hasDirectusName);
+}
+
+/**
+ * Map an npm packument to the extension shape, using its latest version.
+ * Returns null when the packument has no usable latest version.
+ */
+export function packumentToExtension(data: any): DirectusExtension | null {
+  const latestVersion = data?.['dist-tags']?.latest;
+  if (!latestVersion || !data.versions?.[latestVersion]) {
+    return null;
+  }
+
+  const versionData = data.versions[latestVersion];
+  const extension = extensionMeta(versionData['directus:extension']);
+  const dependencies = Object.keys(versionData.dependencies || {});
+
+  return {
+    name: data.name,
+    version: latestVersion,
+    description: versionData.description || data.description || '',
+    keywords: versionData.keywords || [],
+    sanitized_name: data.name,
+    publisher: {
+      email: data.maintainers?.[0]?.email || '',
+      username: data.maintainers?.[0]?.name || ''
+    },
+    maintainers: data.maintainers?.map((m: any) => ({
+      email: m.email,
+      username: m.name
+    })) || [],
+    license: versionData.license || data.license || '',
+    date: data.time?.[latestVersion] || data.time?.created || '',
+    links: {
+      homepage: versionData.homepage || data.homepage,
+      repository: versionData.repository?.url || data.repository?.url,
+      bugs: versionData.bugs?.url || data.bugs?.url,
+      npm: `https://www.npmjs.com/package/${data.name}`
+    },
+    ...(extension && { extension }),
+    ...(dependencies.length > 0 && { dependencies })
+  };
+}
+
+/**
+ * Pull type, host range and sandbox flag out of a "directus:extension"
+ * manifest block. Directus 10.7+ declares sandboxing as
+ * { sandbox: { enabled } }; a bare boolean is accepted too.
+ */
+export function extensionMeta(manifest: any): DirectusExtensionMeta | undefined {
+  if (!manifest || typeof manifest !== 'object') {
+    return undefined;
+  }
+
+  const meta: DirectusExtensionMeta = {};
+  if (typeof manifest.type === 'string') {
+    meta.type = manifest.type;
+  }
+  if (typeof manifest.host === 'string' && manifest.host.trim()) {
+    meta.host = manifest.host.trim();
+  }
+  const sandbox = typeof manifest.sandbox === 'object' ? manifest.sandbox?.enabled : manifest.sandbox;
+  if (typeof sandbox === 'boolean') {
+    meta.sandbox = sandbox;
+  }
+
+  return Object.keys(meta).length > 0 ? meta : undefined;
+}
@@ -0,0 +1,44 @@
+/**
+ * Small isolate-local LRU cache built on Map insertion order
+ */
+
+export class LruCache<K, V> {
+  private entries = new Map<K, V>();
+
+  /**
+   * @param onEvict Called with entries pushed out by capacity (not by delete or clear)
+   */
+  constructor(private maxEntries: number, private onEvict?: (key: K, value: V) => void) {}
+
+  get size(): number {
+    return this.entries.size;
+  }
+
+  get(key: K): V | undefined {
+    const value = this.entries.get(key);
+    if (value !== undefined) {
+      // Re-insert to mark as most recently used
+      this.entries.delete(key);
+      this.entries.set(key, value);
+    }
+    return value;
+  }
+
+  set(key: K, value: V): void {
+    this.entries.delete(key);
+    this.entries.set(key, value);
+    if (this.entries.size > this.maxEntries) {
+      const [oldestKey, oldestValue] = this.entries.entries().next().value as [K, V];
+      this.entries.delete(oldestKey);
+      this.onEvict?.(oldestKey, oldestValue);
+    }
+  }
+
+  delete(key: K): void {
+    this.entries.delete(key);
+  }
+
+  clear(): void {
+    this.entries.clear();
+  }
+}
@@ -0,0 +1,104 @@
+/**
+ * MinHash signatures and LSH banding
+ * A signature keeps, for each of k hash functions, the smallest hash over
+ * a token set. The share of positions two signatures agree on estimates
+ * the Jaccard similarity of the sets, and hashing bands of rows into
+ * buckets finds likely-similar pairs without comparing every pair.
+ */
+
+const FNV_OFFSET = 0x811c9dc5;
+const FNV_PRIME = 0x01000193;
+
+function fnv1a(token: string): number {
+  let hash = FNV_OFFSET;
+  for (let i = 0; i < token.length; i++) {
+    hash ^= token.charCodeAt(i);
+    hash = Math.imul(hash, FNV_PRIME);
+  }
+  return hash >>> 0;
+}
+
+// Murmur3 finalizer: spreads a 32-bit value so seeded variants are independent
+function mix(value: number): number {
+  value ^= value >>> 16;
+  value = Math.imul(value, 0x85ebca6b);
+  value ^= value >>> 13;
+  value = Math.imul(value, 0xc2b2ae35);
+  value ^= value >>> 16;
+  return value >>> 0;
+}
+
+const seedCache = new Map<number, Uint32Array>();
+
+function seeds(hashCount: number): Uint32Array {
+  let cached = seedCache.get(hashCount);
+  if (!cached) {
+    cached = new Uint32Array(hashCount);
+    for (let i = 0; i < hashCount; i++) {
+      cached[i] = mix(Math.imul(i + 1, 0x9e3779b9));
+    }
+    seedCache.set(hashCount, cached);
+  }
+  return cached;
+}
+
+// Every position of an empty set's signature
+const EMPTY = 0xffffffff;
+
+/**
+ * MinHash signature of a token set. An empty set gets an all-ones
+ * signature (see isEmptySignature), which would match every other empty
+ * set perfectly.
+ */
+export function minhashSignature(tokens: Iterable<string>, hashCount: number): Uint32Array {
+  const signature = new Uint32Array(hashCount).fill(EMPTY);
+  const hashSeeds = seeds(hashCount);
+  for (const token of new Set(tokens)) {
+    const base = fnv1a(token);
+    for (let i = 0; i < hashCount; i++) {
+      const hash = mix(base ^ hashSeeds[i]);
+      if (hash < signature[i]) {
+        signature[i] = hash;
+      }
+    }
+  }
+  return signature;
+}
+
+/**
+ * True for the signature of an empty token set. Such sets have nothing to
+ * compare, so they should be left out of buckets and similarity results.
+ */
+export function isEmptySignature(signature: Uint32Array): boolean {
+  return signature.every(value => value === EMPTY);
+}
+
+/**
+ * Estimated Jaccard similarity: the fraction of positions that agree
+ */
+export function estimateSimilarity(a: Uint32Array, b: Uint32Array): number {
+  let agree = 0;
+  for (let i = 0; i < a.length; i++) {
+    if (a[i] === b[i]) {
+      agree++;
+    }
+  }
+  return agree / a.length;
+}
+
+/**
+ * One bucket key per band of `rows` consecutive signature positions.
+ * Two sets with Jaccard similarity s share at least one bucket with
+ * probability 1 - (1 - s^rows)^bands.
+ */
+export function bandKeys(signature: Uint32Array, bands: number, rows: number): string[] {
+  const keys: string[] = [];
+  for (let band = 0; band < bands; band++) {
+    let hash = FNV_OFFSET ^ band;
+    for (let row = band * rows; row < (band + 1) * rows; row++) {
+      hash = mix(hash ^ signature[row]);
+    }
+    keys.push(`${band}:${hash.toString(36)}`);
+  }
+  return keys;
+}
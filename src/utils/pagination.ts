@@ -0,0 +1,133 @@
+/**
+ * Response size budgets and continuation tokens for paginated tool results
+ */
+
+import type { SearchParams } from '../types/directus.js';
+import { ValidationError } from './validation.js';
+
+export const DEFAULT_RESPONSE_BUDGET_BYTES = 24 * 1024;
+export const TRUNCATED_DESCRIPTION_CHARS = 160;
+
+interface CursorPayload {
+  q: string;
+  c?: string;
+  s?: string;
+  l?: number;
+  o: number;
+  v?: string;
+  b?: boolean;
+  li?: string;
+  p?: string;
+  f?: boolean;
+  r?: boolean;
+}
+
+export interface BudgetFit {
+  parts: string[];
+  // Items that did not fit and should be fetched with the continuation token
+  omitted: number;
+  descriptionsTruncated: boolean;
+}
+
+/**
+ * Fit rendered items into a byte budget. Items are first rendered in full;
+ * if that overflows, descriptions are shortened, and if it still overflows
+ * the list is cut at the last item that fits (always keeping the first).
+ * The outcome depends only on the items and the budget.
+ */
+export function fitToBudget<T>(
+  items: T[],
+  render: (item: T, truncateDescriptions: boolean) => string,
+  budgetBytes: number
+): BudgetFit {
+  let descriptionsTruncated = false;
+  let parts = items.map(item => render(item, false));
+
+  if (totalBytes(parts) > budgetBytes) {
+    descriptionsTruncated = true;
+    parts = items.map(item => render(item, true));
+  }
+
+  let used = 0;
+  let count = 0;
+  for (const part of parts) {
+    const size = byteLength(part);
+    if (count > 0 && used + size > budgetBytes) {
+      break;
+    }
+    used += size;
+    count++;
+  }
+
+  return {
+    parts: parts.slice(0, count),
+    omitted: parts.length - count,
+    descriptionsTruncated
+  };
+}
+
+/**
+ * Shorten text to at most maxChars at a word boundary
+ */
+export function truncateDescription(text: string, maxChars: number = TRUNCATED_DESCRIPTION_CHARS): string {
+  if (!text || text.length <= maxChars) {
+    return text;
+  }
+  const cut = text.slice(0, maxChars - 1);
+  const lastSpace = cut.lastIndexOf(' ');
+  return `${(lastSpace > maxChars / 2 ? cut.slice(0, lastSpace) : cut).trimEnd()}…`;
+}
+
+export function encodeCursor(params: SearchParams, nextOffset: number): string {
+  const payload: CursorPayload = {
+    q: params.query,
+    c: params.category,
+    s: params.sort,
+    l: params.limit,
+    o: nextOffset,
+    v: params.compatibleWith,
+    b: params.sandbox,
+    li: params.license,
+    p: params.publisher,
+    f: params.facets,
+    r: params.readme
+  };
+  // Encode as UTF-8 first: btoa only accepts Latin-1 and queries may not be
+  const binary = String.fromCharCode(...new TextEncoder().encode(JSON.stringify(payload)));
+  return btoa(binary).replace(/\+/g, '-').replace(/\//g, '_').replace(/=+$/, '');
+}
+
+/**
+ * Decode a continuation token back into search arguments
+ */
+export function decodeCursor(cursor: string): Record<string, unknown> {
+  try {
+    const base64 = cursor.replace(/-/g, '+').replace(/_/g, '/');
+    const binary = atob(base64);
+    const bytes = Uint8Array.from(binary, char => char.charCodeAt(0));
+    const payload: CursorPayload = JSON.parse(new TextDecoder().decode(bytes));
+    return {
+      query: payload.q,
+      category: payload.c,
+      sort: payload.s,
+      limit: payload.l,
+      offset: payload.o,
+      compatibleWith: payload.v,
+      sandbox: payload.b,
+      license: payload.li,
+      publisher: payload.p,
+      facets: payload.f,
+      readme: payload.r
+    };
+  } catch {
+    throw new ValidationError('Invalid cursor');
+  }
+}
+
+export function byteLength(text: string): number {
+  return new TextEncoder().encode(text).byteLength;
+}
+
+function totalBytes(parts: string[]): number {
+  return parts.reduce((sum, part) => sum + byteLength(part), 0);
+}
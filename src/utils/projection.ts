@@ -0,0 +1,99 @@
+/**
+ * Structured output helpers: field projection and memoized serialization
+ * for the JSON output mode of the MCP tools
+ */
+
+import type { DirectusExtension, ExtensionField } from '../types/directus.js';
+import type { EdgeCacheEntry } from '../services/edge-cache.js';
+import { LruCache } from './lru.js';
+
+export const EXTENSION_FIELDS: ExtensionField[] = [
+  'name',
+  'version',
+  'description',
+  'keywords',
+  'publisher',
+  'license',
+  'date',
+  'homepage',
+  'repository',
+  'npm',
+  'downloads',
+  'type',
+  'host',
+  'sandbox'
+];
+
+export const DEFAULT_JSON_FIELDS: ExtensionField[] = ['name', 'version', 'description', 'downloads', 'repository', 'npm'];
+
+// Serialized projections keyed by content ETag + field list
+const projectionCache = new LruCache<string, string>(500);
+
+/**
+ * Reduce an extension to the requested fields, dropping empty values
+ */
+export function projectExtension(
+  pkg: DirectusExtension,
+  fields: ExtensionField[],
+  monthlyDownloads?: number
+): Record<string, unknown> {
+  const projected: Record<string, unknown> = {};
+
+  for (const field of fields) {
+    let value: unknown;
+    switch (field) {
+      case 'publisher':
+        value = pkg.publisher?.username;
+        break;
+      case 'homepage':
+        value = pkg.links?.homepage;
+        break;
+      case 'repository':
+        value = pkg.links?.repository ? cleanRepositoryUrl(pkg.links.repository) : undefined;
+        break;
+      case 'npm':
+        value = pkg.links?.npm;
+        break;
+      case 'downloads':
+        value = monthlyDownloads ?? pkg.downloads?.monthly;
+        break;
+      case 'type':
+      case 'host':
+      case 'sandbox':
+        value = pkg.extension?.[field];
+        break;
+      default:
+        value = pkg[field];
+    }
+
+    if (value !== undefined && value !== '' && !(Array.isArray(value) && value.length === 0)) {
+      projected[field] = value;
+    }
+  }
+
+  return projected;
+}
+
+/**
+ * Serialize a projection of a cached document, reusing the previous
+ * serialization when the same content was projected the same way
+ */
+export function serializeProjection<T>(
+  entry: EdgeCacheEntry<T>,
+  variant: string,
+  serialize: (data: T) => string
+): string {
+  const key = `${entry.etag}|${variant}`;
+  const cached = projectionCache.get(key);
+  if (cached !== undefined) {
+    return cached;
+  }
+
+  const serialized = serialize(entry.data);
+  projectionCache.set(key, serialized);
+  return serialized;
+}
+
+export function cleanRepositoryUrl(url: string): string {
+  return url.replace('git+', '').replace('.git', '');
+}
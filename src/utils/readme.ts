@@ -0,0 +1,117 @@
+/**
+ * README text handling for full-text search: cleanup, chunking,
+ * tokenization and snippet highlighting
+ */
+
+// Roughly a screenful of prose; small enough that a hit's chunk is a useful excerpt
+const CHUNK_CHARS = 1200;
+// Longer READMEs are mostly changelogs and API tables
+const MAX_README_CHARS = 48_000;
+const SNIPPET_CHARS = 240;
+
+const STOP_WORDS = new Set([
+  'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'for', 'from', 'has', 'have', 'if', 'in', 'into',
+  'is', 'it', 'its', 'of', 'on', 'or', 'so', 'that', 'the', 'this', 'to', 'was', 'we', 'will', 'with',
+  'you', 'your'
+]);
+
+/**
+ * Strip markup that carries no searchable text: images, badges, HTML
+ * tags and link targets (link text is kept)
+ */
+export function cleanReadme(readme: string): string {
+  return readme
+    .slice(0, MAX_README_CHARS)
+    .replace(/!\[[^\]]*\]\([^)]*\)/g, '')
+    .replace(/<[^>]+>/g, '')
+    .replace(/\[([^\]]*)\]\([^)]*\)/g, '$1')
+    .replace(/\r\n?/g, '\n')
+    .replace(/\n{3,}/g, '\n\n')
+    .trim();
+}
+
+/**
+ * Split a cleaned README into chunks of about CHUNK_CHARS, breaking
+ * between paragraphs where possible
+ */
+export function chunkReadme(text: string): string[] {
+  const chunks: string[] = [];
+  let current = '';
+
+  const flush = () => {
+    if (current.trim()) {
+      chunks.push(current.trim());
+    }
+    current = '';
+  };
+
+  for (const paragraph of text.split(/\n\s*\n/)) {
+    if (current && current.length + paragraph.length > CHUNK_CHARS) {
+      flush();
+    }
+    if (paragraph.length <= CHUNK_CHARS) {
+      current += `${paragraph}\n\n`;
+      continue;
+    }
+    // A paragraph (usually a code block or table) too long for one chunk
+    let rest = paragraph;
+    while (rest.length > CHUNK_CHARS) {
+      const cut = rest.lastIndexOf(' ', CHUNK_CHARS);
+      const at = cut > CHUNK_CHARS / 2 ? cut : CHUNK_CHARS;
+      current = rest.slice(0, at);
+      flush();
+      rest = rest.slice(at);
+    }
+    current = `${rest}\n\n`;
+  }
+  flush();
+
+  return chunks;
+}
+
+/**
+ * Searchable terms in a piece of text, lowercased, stop words removed
+ */
+export function readmeTerms(text: string): string[] {
+  return text
+    .toLowerCase()
+    .split(/[^a-z0-9]+/)
+    .filter(term => term.length >= 2 && term.length <= 32 && !STOP_WORDS.has(term));
+}
+
+/**
+ * Excerpt of about SNIPPET_CHARS around the first query term in the
+ * chunk, with term occurrences in bold
+ */
+export function highlightSnippet(chunk: string, terms: string[]): string {
+  // Drop heading and emphasis markers so they don't collide with the highlighting
+  const text = chunk
+    .replace(/^#+\s*/gm, '')
+    .replace(/\*+/g, '')
+    .replace(/\s+/g, ' ')
+    .trim();
+  if (terms.length === 0) {
+    return text.length > SNIPPET_CHARS ? `${text.slice(0, SNIPPET_CHARS)}…` : text;
+  }
+  const pattern = new RegExp(`\\b(${terms.map(escapeRegExp).join('|')})`, 'gi');
+
+  const first = text.search(pattern);
+  let start = Math.max(0, (first === -1 ? 0 : first) - SNIPPET_CHARS / 3);
+  let end = Math.min(text.length, start + SNIPPET_CHARS);
+  // Don't cut words in half
+  if (start > 0) {
+    const space = text.indexOf(' ', start);
+    start = space === -1 || space > first ? start : space + 1;
+  }
+  if (end < text.length) {
+    const space = text.lastIndexOf(' ', end);
+    end = space > start ? space : end;
+  }
+
+  const excerpt = text.slice(start, end).replace(pattern, '**$1**');
+  return `${start > 0 ? '…' : ''}${excerpt}${end < text.length ? '…' : ''}`;
+}
+
+function escapeRegExp(value: string): string {
+  return value.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+}
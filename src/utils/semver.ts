@@ -0,0 +1,196 @@
+/**
+ * Minimal semver range handling for Directus host compatibility
+ * Ranges are reduced to unions of version intervals, which is enough to
+ * answer "does this range accept version X" and "do these ranges overlap"
+ * without pulling in a full semver implementation.
+ * Prerelease tags are ignored: 11.0.0-rc.1 is treated as 11.0.0.
+ */
+
+export type Version = [number, number, number];
+
+interface Bound {
+  version: Version;
+  inclusive: boolean;
+}
+
+export interface VersionInterval {
+  // null means unbounded
+  lower: Bound | null;
+  upper: Bound | null;
+}
+
+const PARTIAL_VERSION = /^v?(\d+|[xX*])(?:\.(\d+|[xX*]))?(?:\.(\d+|[xX*]))?(?:[-+].*)?$/;
+const OPERATOR = /^(\^|~>?|>=|<=|>|<|=)?\s*(.*)$/;
+const EMPTY_INTERVAL: VersionInterval = {
+  lower: { version: [0, 0, 0], inclusive: true },
+  upper: { version: [0, 0, 0], inclusive: false }
+};
+
+/**
+ * Parse a possibly partial version ("11", "11.2", "11.x") into its numeric
+ * parts; wildcard or missing parts are null
+ */
+function parsePartial(input: string): [number | null, number | null, number | null] | null {
+  const match = PARTIAL_VERSION.exec(input.trim());
+  if (!match) {
+    return null;
+  }
+  const part = (value: string | undefined) => value === undefined || /^[xX*]$/.test(value) ? null : Number(value);
+  const major = part(match[1]);
+  const minor = major === null ? null : part(match[2]);
+  const patch = minor === null ? null : part(match[3]);
+  return [major, minor, patch];
+}
+
+export function compareVersions(a: Version, b: Version): number {
+  return a[0] - b[0] || a[1] - b[1] || a[2] - b[2];
+}
+
+function lowerBound(version: Version, inclusive = true): Bound {
+  return { version, inclusive };
+}
+
+function upperBound(version: Version, inclusive = false): Bound {
+  return { version, inclusive };
+}
+
+/**
+ * The interval a single comparator such as "^10.2" or ">=11" accepts
+ */
+function comparatorInterval(comparator: string): VersionInterval | null {
+  const [, operator = '', rest] = OPERATOR.exec(comparator)!;
+  const partial = parsePartial(rest);
+  if (!partial) {
+    return null;
+  }
+  const [major, minor, patch] = partial;
+  const floor: Version = [major ?? 0, minor ?? 0, patch ?? 0];
+
+  if (major === null) {
+    // "*" accepts everything, and nothing lies below or above it
+    if (operator === '<' || operator === '>') {
+      return EMPTY_INTERVAL;
+    }
+    return { lower: null, upper: null };
+  }
+
+  // First version past the partial: "10" -> 11.0.0, "10.2" -> 10.3.0
+  const next: Version = minor === null
+    ? [major + 1, 0, 0]
+    : patch === null
+      ? [major, minor + 1, 0]
+      : [major, minor, patch + 1];
+
+  switch (operator) {
+    case '^': {
+      let ceiling: Version;
+      if (major > 0 || minor === null) {
+        ceiling = [major + 1, 0, 0];
+      } else if (minor > 0 || patch === null) {
+        ceiling = [0, minor + 1, 0];
+      } else {
+        ceiling = [0, 0, patch + 1];
+      }
+      return { lower: lowerBound(floor), upper: upperBound(ceiling) };
+    }
+    case '~':
+    case '~>':
+      return {
+        lower: lowerBound(floor),
+        upper: upperBound(minor === null ? [major + 1, 0, 0] : [major, minor + 1, 0])
+      };
+    case '>=':
+      return { lower: lowerBound(floor), upper: null };
+    case '>':
+      return patch === null
+        ? { lower: lowerBound(next), upper: null }
+        : { lower: lowerBound(floor, false), upper: null };
+    case '<':
+      return { lower: null, upper: upperBound(floor) };
+    case '<=':
+      return patch === null
+        ? { lower: null, upper: upperBound(next) }
+        : { lower: null, upper: upperBound(floor, true) };
+    default:
+      // Bare or "=" versions: a partial is an x-range, a full version is exact
+      return patch === null
+        ? { lower: lowerBound(floor), upper: upperBound(next) }
+        : { lower: lowerBound(floor), upper: upperBound(floor, true) };
+  }
+}
+
+// The more restrictive of two bounds on the same side; at equal versions
+// the exclusive one wins
+function tighterBound(a: Bound | null, b: Bound | null, side: 'lower' | 'upper'): Bound | null {
+  if (!a || !b) {
+    return a || b;
+  }
+  const order = compareVersions(a.version, b.version);
+  if (order !== 0) {
+    return (side === 'lower' ? order > 0 : order < 0) ? a : b;
+  }
+  return a.inclusive ? b : a;
+}
+
+function intersect(a: VersionInterval, b: VersionInterval): VersionInterval | null {
+  const interval = { lower: tighterBound(a.lower, b.lower, 'lower'), upper: tighterBound(a.upper, b.upper, 'upper') };
+  if (interval.lower && interval.upper) {
+    const order = compareVersions(interval.lower.version, interval.upper.version);
+    if (order > 0 || (order === 0 && !(interval.lower.inclusive && interval.upper.inclusive))) {
+      return null;
+    }
+  }
+  return interval;
+}
+
+/**
+ * Parse a range ("^10.0.0 || ^11.0.0", ">=10.2 <12", "10.x - 11") into the
+ * intervals it accepts. Returns null when the range can't be understood.
+ */
+export function parseRange(range: string): VersionInterval[] | null {
+  const intervals: VersionInterval[] = [];
+
+  for (const set of range.split('||')) {
+    let comparators: string[];
+    const hyphen = /^\s*(\S+)\s+-\s+(\S+)\s*$/.exec(set);
+    if (hyphen) {
+      comparators = [`>=${hyphen[1]}`, `<=${hyphen[2]}`];
+    } else {
+      // Join operators to their versions (">= 10" -> ">=10") before splitting
+      comparators = set.trim().replace(/(\^|~>?|>=|<=|>|<|=)\s+/g, '$1').split(/\s+/).filter(Boolean);
+    }
+    if (comparators.length === 0) {
+      comparators = ['*'];
+    }
+
+    let interval: VersionInterval | null = { lower: null, upper: null };
+    for (const comparator of comparators) {
+      const next = comparatorInterval(comparator);
+      if (!next) {
+        return null;
+      }
+      interval = interval && intersect(interval, next);
+    }
+    if (interval) {
+      intervals.push(interval);
+    }
+  }
+
+  return intervals;
+}
+
+/**
+ * True when some version accepted by one range is accepted by the other
+ */
+export function rangesOverlap(a: VersionInterval[], b: VersionInterval[]): boolean {
+  return a.some(left => b.some(right => intersect(left, right) !== null));
+}
+
+/**
+ * True when the version (or partial version) satisfies the range
+ */
+export function satisfies(version: string, range: string): boolean {
+  const versionIntervals = parseRange(version);
+  const rangeIntervals = parseRange(range);
+  return Boolean(versionIntervals && rangeIntervals && rangesOverlap(versionIntervals, rangeIntervals));
+}
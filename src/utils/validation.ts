@@ -1,73 +1,206 @@
 /**
- * Input validation utilities using Zod
- * Ensures all user inputs are properly validated and sanitized
+ * Input validation utilities
+ * Hand-written checks for the few shapes we accept, so validating a
+ * request costs a handful of comparisons and no schema library at startup
  */
 
-import { z } from 'zod';
-import type { SearchParams, ExtensionCategory, SortOption } from '../types/directus.js';
-
-// Schema for search parameters
-const searchParamsSchema = z.object({
-  query: z.string()
-    .min(1, 'Query cannot be empty')
-    .max(100, 'Query too long')
-    .transform(sanitizeQuery),
-  category: z.enum([
-    'interfaces', 
-    'displays', 
-    'layouts', 
-    'panels', 
-    'modules', 
-    'hooks', 
-    'endpoints', 
-    'operations', 
-    'themes'
-  ]).optional(),
-  limit: z.number()
-    .min(1, 'Limit must be at least 1')
-    .max(50, 'Limit cannot exceed 50')
-    .default(10),
-  offset: z.number()
-    .min(0, 'Offset cannot be negative')
-    .default(0),
-  sort: z.enum(['relevance', 'downloads', 'updated', 'created'])
-    .default('relevance')
-});
-
-// Schema for extension name
-const extensionNameSchema = z.string()
-  .min(1, 'Extension name cannot be empty')
-  .max(100, 'Extension name too long')
-  .regex(/^[a-zA-Z0-9\-_.@\/]+$/, 'Invalid extension name format');
+import type { SearchParams, ExtensionCategory, SortOption, OutputOptions, OutputFormat, ExtensionField } from '../types/directus.js';
+import { EXTENSION_FIELDS, DEFAULT_JSON_FIELDS } from './projection.js';
+
+/**
+ * Bad client input; the HTTP API answers these with 400
+ */
+export class ValidationError extends Error {
+  constructor(message: string) {
+    super(message);
+    this.name = 'ValidationError';
+  }
+}
+
+const CATEGORIES: ReadonlySet<string> = new Set<ExtensionCategory>([
+  'interfaces', 
+  'displays', 
+  'layouts', 
+  'panels', 
+  'modules', 
+  'hooks', 
+  'endpoints', 
+  'operations', 
+  'themes'
+]);
+const SORT_OPTIONS: ReadonlySet<string> = new Set<SortOption>(['relevance', 'downloads', 'updated', 'created']);
+const OUTPUT_FORMATS: ReadonlySet<string> = new Set<OutputFormat>(['markdown', 'json']);
+const FIELD_NAMES: ReadonlySet<string> = new Set<string>(EXTENSION_FIELDS);
+const EXTENSION_NAME_PATTERN = /^[a-zA-Z0-9\-_.@\/]+$/;
+// A Directus version, possibly partial: "11", "10.8", "v10.8.3", "11.x"
+const DIRECTUS_VERSION_PATTERN = /^v?\d+(\.(\d+|x|\*)){0,2}$/i;
 
 /**
  * Validate and sanitize search parameters
  */
 export function validateSearchParams(input: any): SearchParams {
-  try {
-    return searchParamsSchema.parse(input);
-  } catch (error) {
-    if (error instanceof z.ZodError) {
-      const issues = error.issues.map(issue => issue.message).join(', ');
-      throw new Error(`Invalid search parameters: ${issues}`);
-    }
-    throw new Error('Failed to validate search parameters');
+  const issues: string[] = [];
+  const { query, category, limit = 10, offset = 0, sort = 'relevance', sandbox, license, publisher, facets, readme } = input ?? {};
+  // Tool arguments use snake_case; cursors and internal callers use camelCase
+  const compatibleWith = input?.compatibleWith ?? input?.compatible_with;
+
+  if (typeof query !== 'string') {
+    issues.push('Query must be a string');
+  } else if (query.length < 1) {
+    issues.push('Query cannot be empty');
+  } else if (query.length > 100) {
+    issues.push('Query too long');
+  }
+  if (category !== undefined && !CATEGORIES.has(category)) {
+    issues.push(`Invalid category: ${category}`);
+  }
+  if (!isFiniteNumber(limit)) {
+    issues.push('Limit must be a number');
+  } else if (limit < 1) {
+    issues.push('Limit must be at least 1');
+  } else if (limit > 50) {
+    issues.push('Limit cannot exceed 50');
+  }
+  if (!isFiniteNumber(offset)) {
+    issues.push('Offset must be a number');
+  } else if (offset < 0) {
+    issues.push('Offset cannot be negative');
+  }
+  if (!SORT_OPTIONS.has(sort)) {
+    issues.push(`Invalid sort option: ${sort}`);
+  }
+  if (compatibleWith !== undefined && (typeof compatibleWith !== 'string' || !DIRECTUS_VERSION_PATTERN.test(compatibleWith))) {
+    issues.push('compatible_with must be a Directus version such as "11" or "10.8.3"');
+  }
+  if (sandbox !== undefined && typeof sandbox !== 'boolean') {
+    issues.push('sandbox must be true or false');
+  }
+  if (license !== undefined && !isShortString(license)) {
+    issues.push('license must be a string of at most 100 characters');
+  }
+  if (publisher !== undefined && !isShortString(publisher)) {
+    issues.push('publisher must be a string of at most 100 characters');
+  }
+  if (facets !== undefined && typeof facets !== 'boolean') {
+    issues.push('facets must be true or false');
+  }
+  if (readme !== undefined && typeof readme !== 'boolean') {
+    issues.push('readme must be true or false');
+  }
+
+  if (issues.length > 0) {
+    throw new ValidationError(`Invalid search parameters: ${issues.join(', ')}`);
+  }
+
+  const sanitized = sanitizeQuery(query);
+  if (sanitized.length === 0) {
+    throw new ValidationError('Invalid search parameters: Query is empty after sanitization');
+  }
+
+  const params: SearchParams = { query: sanitized, limit, offset, sort };
+  if (category !== undefined) {
+    params.category = category;
+  }
+  if (compatibleWith !== undefined) {
+    params.compatibleWith = compatibleWith.replace(/^v/i, '').toLowerCase();
+  }
+  if (sandbox !== undefined) {
+    params.sandbox = sandbox;
+  }
+  if (license !== undefined) {
+    params.license = sanitizeInput(license);
+  }
+  if (publisher !== undefined) {
+    params.publisher = sanitizeInput(publisher);
+  }
+  if (facets === true) {
+    params.facets = true;
+  }
+  if (readme === true) {
+    params.readme = true;
   }
+  return params;
 }
 
 /**
  * Validate extension name
  */
 export function validateExtensionName(input: any): string {
-  try {
-    return extensionNameSchema.parse(input);
-  } catch (error) {
-    if (error instanceof z.ZodError) {
-      const issues = error.issues.map(issue => issue.message).join(', ');
-      throw new Error(`Invalid extension name: ${issues}`);
+  let issue: string | null = null;
+
+  if (typeof input !== 'string') {
+    issue = 'Extension name must be a string';
+  } else if (input.length < 1) {
+    issue = 'Extension name cannot be empty';
+  } else if (input.length > 100) {
+    issue = 'Extension name too long';
+  } else if (!EXTENSION_NAME_PATTERN.test(input)) {
+    issue = 'Invalid extension name format';
+  }
+
+  if (issue) {
+    throw new ValidationError(`Invalid extension name: ${issue}`);
+  }
+  return input;
+}
+
+/**
+ * Validate the result count for find_similar_extensions
+ */
+export function validateSimilarLimit(input: any): number {
+  if (input === undefined) {
+    return 5;
+  }
+  if (!isFiniteNumber(input) || !Number.isInteger(input) || input < 1 || input > 20) {
+    throw new ValidationError('Invalid limit: must be an integer from 1 to 20');
+  }
+  return input;
+}
+
+/**
+ * Validate a 1-based position in a session's search results
+ */
+export function validateResultPosition(input: any): number {
+  if (!isFiniteNumber(input) || !Number.isInteger(input) || input < 1 || input > 1000) {
+    throw new ValidationError('Invalid result: must be an integer from 1 to 1000');
+  }
+  return input;
+}
+
+/**
+ * Validate output format and field projection options
+ */
+export function validateOutputOptions(input: any): OutputOptions {
+  const output = input?.output ?? 'markdown';
+  const fields = input?.fields ?? DEFAULT_JSON_FIELDS;
+  const issues: string[] = [];
+
+  if (!OUTPUT_FORMATS.has(output)) {
+    issues.push(`Invalid output format: ${output}`);
+  }
+  if (!Array.isArray(fields)) {
+    issues.push('Fields must be an array');
+  } else if (fields.length === 0) {
+    issues.push('Fields cannot be empty');
+  } else {
+    const unknown = fields.filter(field => !FIELD_NAMES.has(field));
+    if (unknown.length > 0) {
+      issues.push(`Unknown fields: ${unknown.join(', ')}`);
     }
-    throw new Error('Failed to validate extension name');
   }
+
+  if (issues.length > 0) {
+    throw new ValidationError(`Invalid output options: ${issues.join(', ')}`);
+  }
+  return { output, fields: fields as ExtensionField[] };
+}
+
+function isShortString(value: unknown): value is string {
+  return typeof value === 'string' && value.trim().length > 0 && value.length <= 100;
+}
+
+function isFiniteNumber(value: unknown): value is number {
+  return typeof value === 'number' && Number.isFinite(value);
 }
 
 /**
@@ -75,17 +208,12 @@ export function validateExtensionName(input: any): string {
  */
 function sanitizeQuery(query: string): string {
   // Remove potentially dangerous characters
-  let sanitized = query
+  const sanitized = query
     .replace(/[<>]/g, '') // Remove HTML tags
     .replace(/[;&|`$(){}[\]\\]/g, '') // Remove shell metacharacters
     .replace(/['"]/g, '') // Remove quotes
     .trim();
 
-  // Ensure query is not empty after sanitization
-  if (sanitized.length === 0) {
-    throw new Error('Query is empty after sanitization');
-  }
-
   return sanitized;
 }
 
@@ -93,27 +221,14 @@ function sanitizeQuery(query: string): string {
  * Validate that a value is a valid extension category
  */
 export function isValidCategory(category: string): category is ExtensionCategory {
-  const validCategories: ExtensionCategory[] = [
-    'interfaces', 
-    'displays', 
-    'layouts', 
-    'panels', 
-    'modules', 
-    'hooks', 
-    'endpoints', 
-    'operations', 
-    'themes'
-  ];
-  
-  return validCategories.includes(category as ExtensionCategory);
+  return CATEGORIES.has(category);
 }
 
 /**
  * Validate that a value is a valid sort option
  */
 export function isValidSortOption(sort: string): sort is SortOption {
-  const validSorts: SortOption[] = ['relevance', 'downloads', 'updated', 'created'];
-  return validSorts.includes(sort as SortOption);
+  return SORT_OPTIONS.has(sort);
 }
 
 /**